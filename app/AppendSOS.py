@@ -1,10 +1,19 @@
 # Standard imports
+from contextlib import nullcontext
 from os import scandir
+from time import perf_counter
 
 # Local imports
-from app.GeoBAM import GeoBAM
-from app.Input import Input
-from app.Output import Output
+from app.GeoBAM import GeoBAM, get_engine
+from app.Input import Input, check_observations, validate_batch
+from app.Output import Output, append_state
+from app.Reader import Reader
+from app.Summary import Summary
+from app.Supervisor import ERROR
+from app.Timing import TRIAGED, Timer
+
+# Lock used when reads do not need to be serialized
+NULL_LOCK = nullcontext()
 
 class AppendSOS:
     """Class that represents data and operations needed to append prior data to
@@ -20,40 +29,428 @@ class AppendSOS:
             List of reaches with valid data
         invalid_list : List
             List of reaches with invalid data
+        elapsed: float
+            Wall-clock seconds spent appending reaches
+        batch_size: int
+            Number of valid reaches sent to geoBAM in a single R call
+        checkpoint: Checkpoint
+            Journal of completed reaches or None
+        resume: bool
+            Skip reaches that have already been appended
+        skipped_list: List
+            List of reaches skipped as already appended
+        failed_list: List
+            List of reaches the supervisor killed or lost, which are not 
+            written so a later run retries them
+        reasons: dict
+            Reach keys and reason values for reaches that failed in geoBAM
+        cache: PriorCache
+            Cache of extracted priors keyed by input data or None
+        single_open: bool
+            Share one SoS dataset handle between Input and Output per reach
+        compact: bool
+            Write reach-level priors as one vector variable
+        consolidated: ConsolidatedOutput
+            Shared NetCDF receiving priors for all reaches instead of each
+            reach's SoS or None
+        timer: Timer
+            Per-reach stage timer which is off unless given a path
+        supervisor: Supervisor
+            Runs geoBAM in a worker process with per-reach budgets or None to
+            run geoBAM in this process
+        reader: Reader
+            Mask-free reader for SWOT and SoS variables or None to read 
+            masked arrays
+        staging: Staging
+            Node-local scratch that reaches are read from and written to 
+            before their SoS is copied back or None to use data_dir directly
+        incremental: bool
+            Reaches are rewritten because their SWOT changed so a SoS already
+            appended by an earlier run does not count as completed
     """
 
-    def __init__(self, data_dir, logger, reach_list):
+    def __init__(self, data_dir, logger, reach_list, batch_size=1, 
+        checkpoint=None, resume=False, cache=None, single_open=False, 
+        compact=False, consolidated=None, timer=None, supervisor=None,
+        reader=None, staging=None, incremental=False):
         self.data_dir = data_dir
         self.logger = logger
         self.reach_list = reach_list
         self.valid_list = []
         self.invalid_list = []
+        self.elapsed = 0.0
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.skipped_list = []
+        self.failed_list = []
+        self.reasons = {}
+        self.cache = cache
+        self.single_open = single_open
+        self.compact = compact
+        self.consolidated = consolidated
+        self.timer = timer if timer is not None else Timer()
+        self.supervisor = supervisor
+        self.reader = reader
+        self.staging = staging
+        self.incremental = incremental
 
     def append(self):
-        """Extract priors from SWOT and SoS, extract priors via geoBAM, and 
-        append them back to the SoS."""
+        """Extract priors from SWOT and SoS, extract priors via geoBAM, and
+        append them back to the SoS for each reach in reach_list."""
+
+        self.append_reaches(self.reach_list)
+
+    def append_reaches(self, reaches):
+        """Append priors for each reach in reaches one at a time or in batches
+        depending on batch_size.
         
-        for reach in self.reach_list:
-            # Get required geoBAM input data from each file
-            self.logger.info(f"Appending data for reach: {reach}")
-            swot_path = self.data_dir / (reach + "_SWOT.nc")
-            sos_path = self.data_dir / (reach + "_SOS.nc")
-            input = Input(swot_path, sos_path)
-            input.format_data()
-
-            # Extract priors from geoBAM R functions for valid data only
-            geobam_priors = None
-            invalid_indexes = None
-            if input.data:
-                self.valid_list.append(reach)
-                geobam = GeoBAM(input.data)
-                geobam_data = geobam.bam_data()
-                geobam_priors = geobam.bam_priors(geobam_data)
-                invalid_indexes = input.data["invalid_indexes"]
+        Supervised reaches are always run one at a time so one reach over 
+        budget does not take a batch down with it.
+        """
+
+        start = perf_counter()
+        for chunk in self.staged_chunks(self.filter_completed(reaches)):
+            self.stage_in(chunk)
+            if self.batch_size > 1 and self.supervisor is None:
+                self.append_batches(chunk)
+            else:
+                for reach in chunk:
+                    self.append_reach(reach)
+            self.stage_out(chunk)
+        self.elapsed += perf_counter() - start
+
+    def triage(self, reaches):
+        """Validate reaches writing fill values for invalid reaches without 
+        running geoBAM.
+
+        Valid reaches are left for a later append_reaches call, possibly on 
+        another rank, and their read and validate times are finished with 
+        the triaged status.
+
+        Returns list of valid reaches.
+        """
+
+        start = perf_counter()
+        valid = []
+        for chunk in self.staged_chunks(self.filter_completed(reaches)):
+            self.stage_in(chunk)
+            chunk_valid = []
+            written = []
+            for reach in chunk:
+                input = self.read_input(reach)
+                if input.data:
+                    if input.sos_dataset is not None:
+                        input.sos_dataset.close()
+                    self.timer.finish(reach, TRIAGED)
+                    chunk_valid.append(reach)
+                else:
+                    self.logger.info(f"Writing invalid reach: {reach}")
+                    output, _ = self.solve(reach, input)
+                    self.write(reach, output)
+                    written.append(reach)
+            self.stage_out(chunk_valid, copy=False)
+            self.stage_out(written)
+            valid.extend(chunk_valid)
+        self.elapsed += perf_counter() - start
+        return valid
+
+    def summary(self):
+        """Returns compact Summary of valid, invalid, skipped and failed 
+        reaches."""
+
+        reaches = self.valid_list + self.invalid_list + self.skipped_list \
+            + self.failed_list
+        status = [Summary.VALID] * len(self.valid_list) \
+            + [Summary.INVALID] * len(self.invalid_list) \
+            + [Summary.SKIPPED] * len(self.skipped_list) \
+            + [Summary.FAILED] * len(self.failed_list)
+        cache_hits, cache_misses = 0, 0
+        if self.cache is not None:
+            cache_hits, cache_misses = self.cache.hits, self.cache.misses
+        staging = self.staging.report() if self.staging is not None else {}
+        return Summary(reaches, status, self.elapsed, cache_hits, cache_misses,
+            self.reasons, staging)
+
+    def filter_completed(self, reaches):
+        """Remove reaches that have already been appended when resuming.
+
+        Reaches in the checkpoint journal are skipped without opening their
+        SoS. Other reaches are skipped if their SoS has the valid attribute 
+        and partially written SoS files are logged so they are rewritten.
+        With consolidated output or in incremental runs only the journal 
+        counts as the SoS may have been appended by an earlier run.
+
+        Returns list of reaches still to append.
+        """
+
+        if not self.resume:
+            return reaches
+
+        completed = self.checkpoint.completed if self.checkpoint else set()
+        remaining = []
+        for reach in reaches:
+            if reach in completed:
+                self.skipped_list.append(reach)
+                continue
+            if self.consolidated is not None or self.incremental:
+                remaining.append(reach)
+                continue
+            state = append_state(self.data_dir / (reach + "_SOS.nc"))
+            if state == Output.COMPLETE:
+                self.logger.info(f"Skipping appended reach: {reach}")
+                self.skipped_list.append(reach)
+                if self.checkpoint is not None:
+                    self.checkpoint.record(reach)
             else:
+                if state == Output.PARTIAL:
+                    self.logger.info(f"Repairing partially appended reach: {reach}")
+                remaining.append(reach)
+        return remaining
+
+    def write(self, reach, output, key=None):
+        """Append output priors to the SoS (or the consolidated NetCDF) and
+        record reach as completed.
+        
+        Extracted priors are stored in the cache under key if one is given.
+        A reach without output failed for a reason other than its data and is
+        left unwritten.
+        """
+
+        if output is None:
+            self.timer.finish(reach, "failed")
+            return
+        with self.timer.stage("extract", reach):
+            output.get_prior_dict()
+        with self.timer.stage("write", reach):
+            if self.consolidated is not None:
+                self.record(self.consolidated.write(reach, output))
+            else:
+                output.append_priors()
+                if self.staging is None:
+                    self.record([reach])
+            if key is not None:
+                self.cache.put(key, output.prior_dict)
+        self.timer.finish(reach, "valid" if output.valid else "invalid")
+
+    def record(self, reaches):
+        """Record reaches whose priors are stored as completed."""
+
+        if self.checkpoint is not None:
+            for reach in reaches:
+                self.checkpoint.record(reach)
+
+    def staged_chunks(self, reaches):
+        """Returns list of chunks of reaches to stage in and out together.
+
+        Reaches are split into chunks of the staging chunk size so scratch 
+        stays bounded and completed reaches are recorded chunk by chunk. 
+        Without staging all reaches are one chunk.
+        """
+
+        size = self.staging.chunk_size if self.staging is not None else len(reaches)
+        size = max(size, 1)
+        return [ reaches[i:i + size] for i in range(0, len(reaches), size) ]
+
+    def stage_in(self, reaches):
+        """Copy reaches' files to scratch when staging."""
+
+        if self.staging is not None:
+            self.staging.stage_in(reaches)
+
+    def stage_out(self, reaches, copy=True):
+        """Copy reaches' SoS files back from scratch when staging and record 
+        them as completed once they are in place.
+
+        SoS files are not copied back when copy is False or priors go to the
+        consolidated NetCDF, and failed reaches are never copied back.
+        """
+
+        if self.staging is not None:
+            failed = set(self.failed_list)
+            self.staging.stage_out([ reach for reach in reaches if reach in failed ],
+                copy=False)
+            self.record(self.staging.stage_out(
+                [ reach for reach in reaches if reach not in failed ],
+                copy and self.consolidated is None))
+
+    def close_consolidated(self):
+        """Write buffered priors to the consolidated NetCDF and close it."""
+
+        if self.consolidated is not None:
+            self.record(self.consolidated.close())
+
+    def lookup(self, data):
+        """Look up cached priors for validated input data.
+
+        Returns cache key and prior dictionary which is None on a miss. The
+        key is None if there is no cache.
+        """
+
+        if self.cache is None:
+            return None, None
+        key = self.cache.key(data)
+        return key, self.cache.get(key)
+
+    def create_input(self, reach, reuse=True):
+        """Returns Input object for reach's SWOT and SoS files.
+
+        Set reuse to False when the input's observations are held while 
+        other reaches are read so they do not share reader buffers.
+        """
+
+        reader = self.reader
+        if reader is not None and not reuse:
+            reader = Reader(reader.dtype, reuse=False)
+        data_dir = self.staging.path if self.staging is not None else self.data_dir
+        return Input(data_dir / (reach + "_SWOT.nc"),
+            data_dir / (reach + "_SOS.nc"), self.single_open, reader)
+
+    def read_input(self, reach, io_lock=NULL_LOCK):
+        """Returns Input object for reach with read and validated data.
+
+        The read holds io_lock so it can be serialized with other NetCDF
+        calls while validation runs without it.
+        """
+
+        with self.timer.stage("read", reach):
+            input = self.create_input(reach)
+            with io_lock:
+                observations = input.read_data()
+        with self.timer.stage("validate", reach):
+            input.data = check_observations(*observations)
+        return input
+
+    def create_output(self, input, geobam_priors, invalid_indexes, prior_dict=None):
+        """Returns Output object to write priors to input's SoS."""
+
+        return Output(input.sos_path, geobam_priors, invalid_indexes, prior_dict,
+            input.sos_dataset, self.compact)
+
+    def append_reach(self, reach):
+        """Extract priors for a single reach and append them to its SoS."""
+
+        # Get required geoBAM input data from each file
+        self.logger.info(f"Appending data for reach: {reach}")
+        input = self.read_input(reach)
+
+        # Append data to the SWORD of Scence NetCDF file
+        output, key = self.solve(reach, input)
+        self.write(reach, output, key)
+
+    def solve(self, reach, input):
+        """Extract priors from cache or geoBAM R functions for valid data 
+        only.
+
+        Returns Output object, which is None for a supervised reach left to
+        be retried, and cache key to store its priors under, which is None if
+        they should not be stored.
+        """
+
+        if not input.data:
+            self.invalid_list.append(reach)
+            return self.create_output(input, None, []), None
+
+        invalid_indexes = input.data["invalid_indexes"]
+        with self.timer.stage("lookup", reach):
+            key, prior_dict = self.lookup(input.data)
+        if prior_dict is not None:
+            self.valid_list.append(reach)
+            return self.create_output(input, None, invalid_indexes, prior_dict), None
+
+        if self.supervisor is not None:
+            output = self.solve_supervised(reach, input)
+            return output, key if output is not None and output.valid else None
+
+        self.valid_list.append(reach)
+        geobam = GeoBAM(input.data)
+        with self.timer.stage("bam_data", reach):
+            geobam_data = geobam.bam_data()
+        with self.timer.stage("bam_priors", reach):
+            geobam_priors = geobam.bam_priors(geobam_data)
+        return self.create_output(input, geobam_priors, invalid_indexes), key
+
+    def solve_supervised(self, reach, input):
+        """Run geoBAM for valid input in the supervisor's worker process.
+
+        Reaches that fail in geoBAM are recorded as invalid with a reason
+        code. Reaches over budget or whose worker crashed are recorded as 
+        failed and not written as that says nothing about their data.
+
+        Returns Output object or None for a failed reach.
+        """
+
+        with self.timer.stage("geobam", reach):
+            prior_dict, reason, message = self.supervisor.solve(input.data)
+        if reason is not None:
+            self.logger.info(f"geoBAM {reason} for reach: {reach} ({message})")
+            self.reasons[reach] = reason
+            if reason != ERROR:
+                self.failed_list.append(reach)
+                if input.sos_dataset is not None:
+                    input.sos_dataset.close()
+                return None
+            self.invalid_list.append(reach)
+            return self.create_output(input, None, [])
+        self.valid_list.append(reach)
+        return self.create_output(input, None, input.data["invalid_indexes"], 
+            prior_dict)
+
+    def append_batches(self, reaches):
+        """Extract priors for reaches sending valid reaches to geoBAM in
+        batches of batch_size.
+
+        Reaches are validated together batch_size at a time. Invalid reaches
+        and cached reaches are left out of batches and written immediately.
+        """
+
+        batch = []
+        for i in range(0, len(reaches), self.batch_size):
+            group = reaches[i:i + self.batch_size]
+            with self.timer.stage("read", *group):
+                inputs = [ self.create_input(reach, reuse=False) for reach in group ]
+                observations = [ input.read_data() for input in inputs ]
+            with self.timer.stage("validate", *group):
+                validate_batch(inputs, observations)
+
+            for reach, input in zip(group, inputs):
+                self.logger.info(f"Appending data for reach: {reach}")
+                if not input.data:
+                    output, _ = self.solve(reach, input)
+                    self.write(reach, output)
+                    continue
+
+                with self.timer.stage("lookup", reach):
+                    key, prior_dict = self.lookup(input.data)
+                if prior_dict is None:
+                    batch.append((reach, input, key))
+                else:
+                    self.valid_list.append(reach)
+                    self.write(reach, self.create_output(input, None, 
+                        input.data["invalid_indexes"], prior_dict))
+
+            if len(batch) >= self.batch_size:
+                self.append_batch(batch[:self.batch_size])
+                batch = batch[self.batch_size:]
+
+        if batch:
+            self.append_batch(batch)
+
+    def append_batch(self, batch):
+        """Run geoBAM on a batch of (reach, Input object, cache key) tuples 
+        and append the resulting priors to each reach's SoS."""
+
+        with self.timer.stage("bam_priors", *[ reach for reach, _, _ in batch ]):
+            priors_list = get_engine().bam_priors_batch([ input.data for _, input, _ in batch ])
+        for (reach, input, key), geobam_priors in zip(batch, priors_list):
+            if geobam_priors is None:
+                self.logger.info(f"geoBAM failed for reach: {reach}")
                 self.invalid_list.append(reach)
+                self.reasons[reach] = ERROR
                 invalid_indexes = []
-            
-            # Append data to the SWORD of Scence NetCDF file
-            output = Output(sos_path, geobam_priors, invalid_indexes)
-            output.append_priors()
\ No newline at end of file
+                key = None
+            else:
+                self.valid_list.append(reach)
+                invalid_indexes = input.data["invalid_indexes"]
+            output = self.create_output(input, geobam_priors, invalid_indexes)
+            self.write(reach, output, key)
@@ -0,0 +1,61 @@
+# Standard imports
+from pathlib import Path
+
+class Checkpoint:
+    """Class that represents a per-rank journal of reaches whose priors have
+    been appended to the SoS.
+
+    Attributes
+    ----------
+        path: Path
+            Path to journal file
+        completed: set
+            Set of reaches recorded as completed
+        journal: file
+            Journal file opened for appending on first record or None
+    """
+
+    SUFFIX = "_checkpoint.txt"
+
+    def __init__(self, checkpoint_dir, rank):
+        self.path = Path(checkpoint_dir) / f"{rank}{self.SUFFIX}"
+        self.completed = read_journal(self.path)
+        self.journal = None
+
+    def record(self, reach):
+        """Record reach as completed flushing the journal immediately."""
+
+        if self.journal is None:
+            self.journal = open(self.path, 'a')
+        self.journal.write(f"{reach}\n")
+        self.journal.flush()
+        self.completed.add(reach)
+
+    def close(self):
+        """Close the journal file."""
+
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+def clear_journals(checkpoint_dir):
+    """Remove all rank journals so a fresh run starts with none completed."""
+
+    for path in Path(checkpoint_dir).glob(f"*{Checkpoint.SUFFIX}"):
+        path.unlink()
+
+def load_completed(checkpoint_dir):
+    """Returns set of reaches recorded as completed in any rank's journal."""
+
+    completed = set()
+    for path in Path(checkpoint_dir).glob(f"*{Checkpoint.SUFFIX}"):
+        completed.update(read_journal(path))
+    return completed
+
+def read_journal(path):
+    """Returns set of reaches in a journal file ignoring a partial last line."""
+
+    if not Path(path).exists():
+        return set()
+    with open(path) as journal:
+        return { line.rstrip("\n") for line in journal if line.endswith("\n") }
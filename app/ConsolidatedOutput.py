@@ -0,0 +1,173 @@
+# Standard imports
+from pathlib import Path
+
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+
+# Local imports
+from app.Output import Output, PRIOR_VARIABLES, fill_missing
+
+class ConsolidatedOutput:
+    """Class that represents a single NetCDF of priors for many reaches.
+
+    Reach-level priors are stored along an unlimited reach dimension and
+    node-level river types as a contiguous ragged array along an unlimited
+    node dimension with node_count giving the number of nodes per reach.
+    Records are buffered and written flush_size reaches at a time so callers
+    should only treat reaches returned by write and close as stored.
+
+    Attributes
+    ----------
+        path: Path
+            Path to consolidated NetCDF
+        flush_size: int
+            Number of buffered reaches that triggers a write
+        resume: bool
+            Append to an existing consolidated NetCDF instead of replacing it
+        records: List
+            Buffered (reach, valid, prior dictionary) tuples
+        dataset: netCDF4.Dataset
+            Consolidated dataset once created or None
+    """
+
+    def __init__(self, path, flush_size=1000, resume=False):
+        self.path = path
+        self.flush_size = flush_size
+        self.resume = resume
+        self.records = []
+        self.dataset = None
+
+    def write(self, reach, output):
+        """Buffer priors from an Output object for reach.
+
+        Returns list of reaches written to disk by this call.
+        """
+
+        prior_dict = output.get_prior_dict()
+        if output.dataset is not None:
+            output.dataset.close()
+        self.records.append((reach, output.valid, prior_dict))
+        if len(self.records) >= self.flush_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Write buffered records to the consolidated NetCDF.
+
+        Returns list of reaches written.
+        """
+
+        if self.dataset is None:
+            if self.resume and Path(self.path).exists():
+                self.dataset = nc.Dataset(self.path, mode='a')
+            else:
+                self.dataset = create_consolidated(self.path)
+        if not self.records:
+            return []
+
+        reach_ids, valid, prior_dicts = zip(*self.records)
+        river_types = [ np.atleast_1d(prior_dict["river_type"]) if is_valid
+            else np.empty(0) for is_valid, prior_dict in zip(valid, prior_dicts) ]
+        priors = { name : np.array([ fill_missing(prior_dict[name])
+            for prior_dict in prior_dicts ], dtype=float)
+            for name, _, _, _ in PRIOR_VARIABLES }
+        append_records(self.dataset, np.array(reach_ids, dtype=object),
+            np.array(valid, dtype=np.uint8), priors, river_types)
+        self.dataset.sync()
+        self.records = []
+        return list(reach_ids)
+
+    def close(self):
+        """Write any buffered records and close the consolidated NetCDF.
+
+        Returns list of reaches written.
+        """
+
+        reaches = self.flush()
+        self.dataset.close()
+        self.dataset = None
+        return reaches
+
+def create_consolidated(path):
+    """Create consolidated NetCDF with reach and node dimensions.
+
+    Returns netCDF4.Dataset open for writing.
+    """
+
+    dataset = nc.Dataset(path, mode='w', format="NETCDF4")
+    dataset.title = "SoS geoBAM priors for multiple reaches"
+    dataset.createDimension("reach", None)
+    dataset.createDimension("node", None)
+
+    reach_id = dataset.createVariable("reach_id", str, ("reach",))
+    reach_id.long_name = "reach_id"
+    valid = dataset.createVariable("valid", "u1", ("reach",), chunksizes=(1024,))
+    valid.long_name = "valid_priors_flag"
+    node_count = dataset.createVariable("node_count", "i4", ("reach",),
+        chunksizes=(1024,))
+    node_count.long_name = "number_of_river_type_nodes"
+    node_count.sample_dimension = "node"
+    river_type = dataset.createVariable("river_type", "f8", ("node",),
+        fill_value = Output.FILL_VALUE, chunksizes=(4096,))
+    river_type.long_name = "Brinkerhoff_class_number"
+    river_type.units = "NA"
+
+    for name, _, long_name, units in PRIOR_VARIABLES:
+        netcdf_var = dataset.createVariable(name, "f8", ("reach",),
+            fill_value = Output.FILL_VALUE, chunksizes=(1024,))
+        netcdf_var.long_name = long_name
+        netcdf_var.units = units
+    return dataset
+
+def append_records(dataset, reach_ids, valid, priors, river_types):
+    """Append arrays of reach-level records and a list of river type arrays
+    to the end of a consolidated dataset."""
+
+    start = dataset.dimensions["reach"].size
+    end = start + len(reach_ids)
+    dataset["reach_id"][start:end] = reach_ids
+    dataset["valid"][start:end] = valid
+    dataset["node_count"][start:end] = [ river_type.size for river_type in river_types ]
+    for name, values in priors.items():
+        dataset[name][start:end] = values
+
+    node_start = dataset.dimensions["node"].size
+    nodes = np.concatenate(river_types) if river_types else np.empty(0)
+    if nodes.size:
+        dataset["river_type"][node_start:node_start + nodes.size] = nodes
+
+def merge_consolidated(paths, merged_path):
+    """Merge consolidated NetCDFs (e.g. one per rank) into merged_path."""
+
+    merged = create_consolidated(merged_path)
+    for path in paths:
+        with nc.Dataset(path) as dataset:
+            dataset.set_auto_mask(False)
+            node_count = dataset["node_count"][:]
+            offsets = np.concatenate(([0], np.cumsum(node_count)))
+            nodes = dataset["river_type"][:]
+            river_types = [ nodes[offsets[i]:offsets[i + 1]]
+                for i in range(node_count.size) ]
+            priors = { name : dataset[name][:] for name, _, _, _ in PRIOR_VARIABLES }
+            append_records(merged, dataset["reach_id"][:], dataset["valid"][:],
+                priors, river_types)
+    merged.close()
+
+def read_consolidated(path, reach):
+    """Read priors for reach from a consolidated NetCDF.
+
+    Returns dictionary with the same keys as create_prior_dict.
+    """
+
+    with nc.Dataset(path) as dataset:
+        dataset.set_auto_mask(False)
+        index = list(dataset["reach_id"][:]).index(reach)
+        node_count = dataset["node_count"][:]
+        start = int(node_count[:index].sum())
+        prior_dict = { "river_type" : dataset["river_type"][start:start + node_count[index]] }
+        if not dataset["valid"][index]:
+            prior_dict["river_type"] = Output.FILL_VALUE
+        for name, _, _, _ in PRIOR_VARIABLES:
+            prior_dict[name] = float(dataset[name][index])
+    return prior_dict
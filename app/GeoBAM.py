@@ -1,24 +1,20 @@
 # Third party imports
-import rpy2.robjects as robjects
-from rpy2.robjects import numpy2ri
-from rpy2.robjects.packages import importr
+import numpy as np
 
-# Print R warnings
-robjects.r['options'](warn=1)
+# rpy2 is imported when the engine is first created so that importing this
+# module does not start R
 
 class GeoBAM:
     """Class that represents a run of geoBAM to extract priors.
 
     Serves as an API to geoBAM functions which are written in R.
-    
+
     Attributes
     ----------
         input_data: dictionary
             dictionary of formatted input data
     """
 
-    GEOBAM = importr("geoBAMr")
-
     def __init__(self, input_data):
         self.input_data = input_data
         self.geobam_data = None
@@ -26,36 +22,144 @@ class GeoBAM:
 
     def bam_data(self):
         """Runs geoBAMr::bam_data function using swot_data attribute.
-        
+
         Returns bam_data object.
         """
 
-        # Activate automatic conversion of numpy objects to rpy2 objects
-        numpy2ri.activate()
+        return get_engine().bam_data(self.input_data)
+
+    def bam_priors(self, geobam_data):
+        """Runs geoBAMr::bam_priors function using geobam_data parameter.
+
+        Returns priors object.
+        """
+
+        return get_engine().bam_priors(geobam_data)
 
-        # Format input data for geoBAM::bam_data function
-        nrows_node = self.input_data["width"].shape[0]
-        nrows_reach = self.input_data["slope2"].shape[0]
-        width_matrix = robjects.r['matrix'](self.input_data["width"], nrow = nrows_node)
-        slope_matrix = robjects.r['matrix'](self.input_data["slope2"], nrow = nrows_reach)
-        d_x_a_matrix = robjects.r['matrix'](self.input_data["d_x_area"], nrow = nrows_node)
-        qhat_vector = robjects.FloatVector(self.input_data["Qhat"])
-        
-        # Run bam_data
-        data = self.GEOBAM.bam_data(w = width_matrix, 
-            s = slope_matrix, dA = d_x_a_matrix, 
-            Qhat = qhat_vector, variant = 'manning_amhg',
-            max_xs = nrows_node)
+class GeoBAMEngine:
+    """Class that represents a long-lived geoBAMr session for a process.
 
-        # Deactivate automatic conversion
-        numpy2ri.deactivate()
+    Starts embedded R, imports geoBAMr and looks up R function handles once 
+    so that each reach only pays for copying its input data into R.
+
+    Attributes
+    ----------
+        geobam: rpy2.robjects.packages.Package
+            geoBAMr package
+        r_bam_data: rpy2.robjects.functions.Function
+            geoBAMr::bam_data function
+        r_bam_priors: rpy2.robjects.functions.Function
+            geoBAMr::bam_priors function
+        r_batch: rpy2.robjects.functions.Function
+            R function that runs bam_data and bam_priors over lists of reaches
+        version: str
+            Installed geoBAMr version
+    """
+
+    def __init__(self):
+        import rpy2.robjects as robjects
+        from rpy2.robjects.packages import importr
+
+        # Print R warnings
+        robjects.r['options'](warn=1)
+        self.geobam = importr("geoBAMr")
+        self.r_bam_data = self.geobam.bam_data
+        self.r_bam_priors = self.geobam.bam_priors
+        self.r_batch = robjects.r(BATCH_FUNCTION)
+        self.version = robjects.r('as.character(packageVersion("geoBAMr"))')[0]
+
+    def bam_data(self, input_data):
+        """Runs geoBAMr::bam_data function on formatted input data.
+
+        Returns bam_data object.
+        """
 
-        return data
+        return self.r_bam_data(w = to_r_matrix(input_data["width"]),
+            s = to_r_matrix(input_data["slope2"]),
+            dA = to_r_matrix(input_data["d_x_area"]),
+            Qhat = to_r_vector(input_data["Qhat"]), variant = 'manning_amhg',
+            max_xs = input_data["width"].shape[0])
 
     def bam_priors(self, geobam_data):
         """Runs geoBAMr::bam_priors function using geobam_data parameter.
-        
+
         Returns priors object.
         """
 
-        return self.GEOBAM.bam_priors(bamdata = geobam_data)
\ No newline at end of file
+        return self.r_bam_priors(bamdata = geobam_data)
+
+    def bam_priors_batch(self, input_list):
+        """Runs geoBAMr::bam_data and geoBAMr::bam_priors on a list of 
+        formatted input data dictionaries in a single call to R.
+
+        Returns a list of priors objects in the same order as input_list with
+        None for any reach geoBAM raised an error on.
+        """
+
+        if not input_list:
+            return []
+
+        import rpy2.rinterface as rinterface
+        import rpy2.robjects as robjects
+        results = self.r_batch(
+            w = rinterface.ListSexpVector([ to_r_matrix(data["width"]) for data in input_list ]),
+            s = rinterface.ListSexpVector([ to_r_matrix(data["slope2"]) for data in input_list ]),
+            dA = rinterface.ListSexpVector([ to_r_matrix(data["d_x_area"]) for data in input_list ]),
+            Qhat = rinterface.ListSexpVector([ to_r_vector(data["Qhat"]) for data in input_list ]),
+            max_xs = rinterface.IntSexpVector([ data["width"].shape[0] for data in input_list ]))
+        return [ priors if isinstance(priors, robjects.vectors.ListVector) else None 
+            for priors in results ]
+
+# Runs geoBAM over parallel lists of reach input, returning NULL on error
+BATCH_FUNCTION = """
+function(w, s, dA, Qhat, max_xs) {
+    lapply(seq_along(w), function(i) {
+        tryCatch(
+            geoBAMr::bam_priors(bamdata = geoBAMr::bam_data(w = w[[i]],
+                s = s[[i]], dA = dA[[i]], Qhat = Qhat[[i]],
+                variant = "manning_amhg", max_xs = max_xs[[i]])),
+            error = function(e) {
+                warning(conditionMessage(e))
+                NULL
+            })
+    })
+}
+"""
+
+ENGINE = None
+
+def get_engine():
+    """Returns the GeoBAMEngine for this process creating it on first use."""
+
+    global ENGINE
+    if ENGINE is None:
+        ENGINE = GeoBAMEngine()
+    return ENGINE
+
+def engine_started():
+    """Returns True if this process has started R for geoBAM."""
+
+    return ENGINE is not None
+
+def geobam_version():
+    """Returns installed geoBAMr version starting R if needed."""
+
+    return get_engine().version
+
+def to_r_vector(array):
+    """Copy a numpy array into an R double vector in column-major order.
+
+    The copy is a single buffer copy rather than element by element.
+    """
+
+    import rpy2.rinterface as rinterface
+    buffer = np.ravel(np.asarray(array, dtype=np.float64), order='F')
+    return rinterface.FloatSexpVector.from_memoryview(memoryview(buffer))
+
+def to_r_matrix(array):
+    """Copy a 2-D numpy array into an R double matrix with matching dims."""
+
+    import rpy2.rinterface as rinterface
+    matrix = to_r_vector(array)
+    matrix.do_slot_assign("dim", rinterface.IntSexpVector(list(np.shape(array))))
+    return matrix
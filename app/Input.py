@@ -13,12 +13,22 @@ class Input:
             Path to SWOT NetCDF
         sos_path: Path
             Path to SWORD of Science NetCDF
+        single_open: bool
+            Open the SoS once in append mode and keep it open for Output
+        sos_dataset: netCDF4.Dataset
+            SoS dataset left open by read_data when single_open is True
+        reader: Reader
+            Mask-free reader for NetCDF variables or None to read masked 
+            arrays and fill them with NaN
     """
 
-    def __init__(self, swot_path, sos_path):
+    def __init__(self, swot_path, sos_path, single_open=False, reader=None):
         self.data = {}
         self.swot_path = swot_path
         self.sos_path = sos_path
+        self.single_open = single_open
+        self.sos_dataset = None
+        self.reader = reader
 
     def format_data(self):
         """Format SWOT and SWORD OS data to match input requirments of geoBAM.
@@ -27,22 +37,59 @@ class Input:
         missing values in numpy.masked_array with NaN values.
         """
 
+        self.data = check_observations(*self.read_data())
+
+    def read_data(self):
+        """Read SWOT and SWORD of Science observations.
+
+        Returns width, d_x_area, slope2 and Qhat numpy arrays with missing 
+        values replaced by NaN. Qhat has a single value and is repeated for
+        each node by check_observations. When single_open is True the SoS is
+        left open in append mode in sos_dataset.
+        """
+
         # Node-level width, d_x_area; Reach-level slope (geoBAM requires matrices)
         swot_dataset = nc.Dataset(self.swot_path)
-        width = swot_dataset["node/width"][:].filled(np.nan)
-        d_x_area = swot_dataset["node/d_x_area"][:].filled(np.nan)
-        slope = swot_dataset["node/slope2"][:].filled(np.nan)
-
-        # Reach-level Qhat value (geoBAM requires a vector)
-        sword_dataset = nc.Dataset(self.sos_path)
-        qhat = sword_dataset["reach/Qhat"][:].filled(np.nan)
-        qhat = np.repeat(qhat, width.shape[0])
+        width = self.read_variable(swot_dataset["node/width"])
+        d_x_area = self.read_variable(swot_dataset["node/d_x_area"])
+        slope = self.read_variable(swot_dataset["node/slope2"])
 
-        # Close datasets
         swot_dataset.close()
-        sword_dataset.close()
 
-        self.data = check_observations(width, d_x_area, slope, qhat)
+        # Reach-level Qhat value
+        if self.single_open:
+            self.sos_dataset = nc.Dataset(self.sos_path, mode='a', format="NETCDF4")
+            qhat = self.read_variable(qhat_variable(self.sos_dataset["reach"]))
+        else:
+            sword_dataset = nc.Dataset(self.sos_path)
+            qhat = self.read_variable(qhat_variable(sword_dataset["reach"]))
+            sword_dataset.close()
+
+        return width, d_x_area, slope, np.array(qhat, ndmin=1)
+
+    def read_variable(self, variable):
+        """Returns numpy array of variable's values with missing values
+        replaced by NaN."""
+
+        if self.reader is None:
+            return variable[:].filled(np.nan)
+        return self.reader.read(variable)
+
+def qhat_variable(reach_grp):
+    """Returns reach group's Qhat variable or its backup if an invalid write
+    overwrote Qhat with the fill value."""
+
+    if "Qhat_original" in reach_grp.variables:
+        return reach_grp["Qhat_original"]
+    return reach_grp["Qhat"]
+
+def validate_batch(inputs, observations):
+    """Validate read_data observations for a list of Input objects together
+    setting the data attribute of each Input object."""
+
+    data_list = check_observations_batch(*zip(*observations)) if observations else []
+    for input, data in zip(inputs, data_list):
+        input.data = data
 
 def check_observations(width, d_x_area, slope2, qhat):
     """Checks for valid observation data (parameter values).
@@ -51,6 +98,8 @@ def check_observations(width, d_x_area, slope2, qhat):
         - Non-negative values for Qhat, width, and slope
         - Each time step and node has at least 5 valid floating point values
     
+    A single Qhat value is repeated for each node of valid data.
+
     Returns empty dictionary if invalid data detected.
     """
 
@@ -63,74 +112,88 @@ def check_observations(width, d_x_area, slope2, qhat):
     if np.isnan(qhat[0]):
         return {}
 
-    # slope2
-    slope_dict = is_valid(slope2)
-    if not slope_dict["valid"]:
-        return {}
-
-    # width
-    width_dict = is_valid(width)
-    if not width_dict["valid"]:
-        return {}
-
-    # d_x_area
-    dA_dict = is_valid(d_x_area)
-    if not dA_dict["valid"]:
-        return {}
-
-    # Remove invalid node (row) observations
-    invalid_node_indexes = np.unique(np.concatenate((slope_dict["invalid_nodes"][0], 
-        width_dict["invalid_nodes"][0], dA_dict["invalid_nodes"][0])))
-    slope2 = np.delete(slope2, invalid_node_indexes, axis = 0)
-    width = np.delete(width, invalid_node_indexes, axis = 0)
-    d_x_area = np.delete(d_x_area, invalid_node_indexes, axis = 0)
-    
-    # Remove invalid time (column) indexes
-    invalid_time_indexes = np.unique(np.concatenate((slope_dict["invalid_times"][0], 
-        width_dict["invalid_times"][0], dA_dict["invalid_times"][0])))
-    slope2 = np.delete(slope2, invalid_time_indexes, axis = 1)
-    width = np.delete(width, invalid_time_indexes, axis = 1)
-    d_x_area = np.delete(d_x_area, invalid_time_indexes, axis = 1)
+    # Valid nodes (rows) and time steps (columns) for slope2, width, d_x_area
+    valid_nodes = []
+    valid_times = []
+    for obs in (slope2, width, d_x_area):
+        valid = ~np.isnan(obs)
+        valid_nodes.append(np.count_nonzero(valid, axis = 1) >= 5)
+        valid_times.append(np.count_nonzero(valid, axis = 0) >= 5)
+
+        # Each observation needs at least 5 valid nodes and 5 valid time steps
+        if np.count_nonzero(valid_nodes[-1]) < 5 \
+            or np.count_nonzero(valid_times[-1]) < 5:
+            return {}
+
+    # Keep nodes and time steps that are valid for all observations
+    keep_nodes = np.logical_and.reduce(valid_nodes)
+    keep_times = np.logical_and.reduce(valid_times)
+    keep = np.ix_(keep_nodes, keep_times)
     
     # Valid data is returned
     return {
-            "slope2" : slope2,
-            "width" : width,
-            "d_x_area" : d_x_area,
-            "Qhat" : qhat,
-            "invalid_indexes" : invalid_node_indexes
+            "slope2" : slope2[keep],
+            "width" : width[keep],
+            "d_x_area" : d_x_area[keep],
+            "Qhat" : repeat_qhat(qhat, width.shape[0]),
+            "invalid_indexes" : np.flatnonzero(~keep_nodes)
         }
 
-def is_valid(obs):
-    """Checks if there are atleast 5 valid nx values for each nt.
+def check_observations_batch(width_list, d_x_area_list, slope2_list, qhat_list):
+    """Checks for valid observation data across many reaches at once.
 
-    Returns dictionary of whether the observations are valid, and if they are 
-    valid includes invalid node and time step indexes.
-    """
+    Observations are loaded into NaN padded (reach, nx, nt) arrays and the 
+    same rules as check_observations are applied to all reaches together. 
+    Each reach's width, d_x_area and slope2 must share a shape.
 
-    # Gather a count of valid values per nx (across nt) returns nt vector
-    time = np.apply_along_axis(lambda obs: np.count_nonzero(~np.isnan(obs)),
-        axis = 0, arr = obs)
+    Returns a list with the check_observations dictionary for each reach.
+    """
 
-    # Are there enough valid nx per nt
-    valid_time = time[time >= 5]
+    # Pad slope2, width and d_x_area into a (3, reach, nx, nt) array
+    shapes = np.array([ np.shape(width) for width in width_list ])
+    nx_max, nt_max = shapes.max(axis = 0)
+    obs = np.full((3, len(shapes), nx_max, nt_max), np.nan, 
+        dtype=np.result_type(np.float32, *width_list))
+    for i, (nx, nt) in enumerate(shapes):
+        obs[0, i, :nx, :nt] = slope2_list[i]
+        obs[1, i, :nx, :nt] = width_list[i]
+        obs[2, i, :nx, :nt] = d_x_area_list[i]
 
-    # Gather a count of valid values per nt (across nx) returns nx vector
-    nodes = np.apply_along_axis(lambda obs: np.count_nonzero(~np.isnan(obs)),
-        axis = 1, arr = obs)
-    
-    # Are there enough valid nt per nx
-    valid_nodes = nodes[nodes >= 5]
-
-    if valid_time.size >= 5 and valid_nodes.size >= 5:
-        return {
-            "valid" : True,
-            "invalid_nodes" : np.nonzero(nodes < 5),
-            "invalid_times" : np.nonzero(time < 5)
-            }
-    else:
-        return {
-            "valid" : False,
-            "invalid_nodes" : None,
-            "invalid_times" : None
-            }
\ No newline at end of file
+    # Test validity of data
+    for qhat in qhat_list:
+        qhat[qhat < 0] = np.NaN
+    slope_width = obs[:2]
+    slope_width[slope_width < 0] = np.NaN
+    valid_qhat = ~np.isnan([ qhat[0] for qhat in qhat_list ])
+
+    # Padding is NaN so it never counts towards valid nodes or time steps
+    valid = ~np.isnan(obs)
+    valid_nodes = np.count_nonzero(valid, axis = 3) >= 5
+    valid_times = np.count_nonzero(valid, axis = 2) >= 5
+    valid_reaches = valid_qhat \
+        & np.all(np.count_nonzero(valid_nodes, axis = 2) >= 5, axis = 0) \
+        & np.all(np.count_nonzero(valid_times, axis = 2) >= 5, axis = 0)
+    keep_nodes = np.all(valid_nodes, axis = 0)
+    keep_times = np.all(valid_times, axis = 0)
+
+    # Split valid reaches back out of padded arrays
+    data_list = []
+    for i, (nx, nt) in enumerate(shapes):
+        if not valid_reaches[i]:
+            data_list.append({})
+            continue
+        keep = np.ix_(keep_nodes[i, :nx], keep_times[i, :nt])
+        data_list.append({
+            "slope2" : obs[0, i][keep],
+            "width" : obs[1, i][keep],
+            "d_x_area" : obs[2, i][keep],
+            "Qhat" : repeat_qhat(qhat_list[i], nx),
+            "invalid_indexes" : np.flatnonzero(~keep_nodes[i, :nx])
+        })
+    return data_list
+
+def repeat_qhat(qhat, nx):
+    """Returns Qhat vector with a single Qhat value repeated nx times 
+    (geoBAM requires a vector)."""
+
+    return np.repeat(qhat, nx) if np.size(qhat) == 1 else qhat
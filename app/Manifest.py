@@ -0,0 +1,234 @@
+# Standard imports
+import hashlib
+from os import scandir, stat
+import sqlite3
+
+# Third party imports
+import netCDF4 as nc
+
+# File name suffixes of each reach's input files
+SWOT_SUFFIX = "_SWOT.nc"
+SOS_SUFFIX = "_SOS.nc"
+
+class Manifest:
+    """Class that represents a persistent index of reaches in a data directory.
+
+    The index is a SQLite database that records for each reach the size and
+    modification time of its SWOT and SoS files and the nx and nt dimensions
+    of its SWOT file. The directory is only scanned again when its own
+    modification time changes (files added, removed or renamed into place)
+    and SWOT files are only opened again when their size or modification time
+    changes.
+
+    The database also keeps a run record of the SWOT size, modification time
+    and optionally checksum each reach had when its priors were last
+    appended so incremental runs can skip reaches whose SWOT is unchanged.
+
+    Attributes
+    ----------
+        path: Path
+            Path to SQLite database
+        data_dir: Path
+            Path to directory of SWOT and SoS files
+        scanned: int
+            Number of files opened or statted by the last update
+        unchanged: int
+            Number of reaches left out by the last call to stale
+        digests: dict
+            Reach keys and SWOT checksum values computed by stale
+    """
+
+    def __init__(self, path, data_dir):
+        self.path = path
+        self.data_dir = data_dir
+        self.scanned = 0
+        self.unchanged = 0
+        self.digests = {}
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS reaches "
+            "(reach TEXT PRIMARY KEY, swot_size INTEGER, swot_mtime INTEGER, "
+            "sos_size INTEGER, sos_mtime INTEGER, nx INTEGER, nt INTEGER)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta "
+            "(key TEXT PRIMARY KEY, value TEXT)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS appended "
+            "(reach TEXT PRIMARY KEY, swot_size INTEGER, swot_mtime INTEGER, "
+            "swot_digest TEXT)")
+
+    def close(self):
+        """Close the database connection."""
+
+        self.connection.close()
+
+    def update(self, refresh=False):
+        """Bring the index up to date with data_dir.
+
+        Returns True if the directory was scanned and False if the index was
+        already current. A refresh scans even if the directory is unchanged
+        to pick up files overwritten in place.
+        """
+
+        dir_key = f"{self.data_dir}:{stat(self.data_dir).st_mtime_ns}"
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'data_dir'").fetchone()
+        if not refresh and row is not None and row[0] == dir_key:
+            self.scanned = 0
+            return False
+
+        # Indexed rows are only kept for the same data directory
+        current = {}
+        if row is not None and row[0].rsplit(':', 1)[0] == str(self.data_dir):
+            current = { row[0] : row[1:] for row in self.connection.execute(
+                "SELECT * FROM reaches") }
+
+        rows = []
+        self.scanned = 0
+        for reach, entries in scan_files(self.data_dir).items():
+            swot_size, swot_mtime = file_stat(entries.get(SWOT_SUFFIX))
+            sos_size, sos_mtime = file_stat(entries.get(SOS_SUFFIX))
+            self.scanned += len(entries)
+            nx, nt = None, None
+            if reach in current and current[reach][0:2] == (swot_size, swot_mtime):
+                nx, nt = current[reach][4:6]
+            elif swot_size is not None:
+                nx, nt = read_dims(self.data_dir / (reach + SWOT_SUFFIX))
+                self.scanned += 1
+            rows.append((reach, swot_size, swot_mtime, sos_size, sos_mtime, nx, nt))
+
+        # Replace the index in one transaction so readers never see a partial one
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("DELETE FROM reaches")
+            self.connection.executemany("INSERT INTO reaches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows)
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('data_dir', ?)",
+                (dir_key,))
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return True
+
+    def reaches(self):
+        """Returns sorted list of reaches with both SWOT and SoS files."""
+
+        return [ row[0] for row in self.connection.execute("SELECT reach FROM "
+            "reaches WHERE swot_size IS NOT NULL AND sos_size IS NOT NULL "
+            "ORDER BY reach") ]
+
+    def costs(self, reach_list, cost_model="dims"):
+        """Returns a dictionary of reach keys and estimated cost values.
+
+        Uses the same cost models as Partition.estimate_cost without opening
+        any files.
+        """
+
+        rows = { row[0] : row[1:] for row in self.connection.execute(
+            "SELECT reach, swot_size, nx, nt FROM reaches") }
+        cost_dict = {}
+        for reach in reach_list:
+            swot_size, nx, nt = rows[reach]
+            if cost_model == "dims" and nx is not None:
+                cost_dict[reach] = float(nx * nt)
+            else:
+                cost_dict[reach] = float(swot_size)
+        return cost_dict
+
+    def stale(self, reach_list, checksum=False):
+        """Returns reaches in reach_list whose SWOT file changed since their
+        priors were last appended and sets unchanged to the number left out.
+
+        A reach is unchanged if its SWOT size and modification time match the
+        run record. With checksum a reach whose size or modification time
+        differ is still unchanged if its SWOT checksum matches.
+        """
+
+        rows = { row[0] : row[1:] for row in self.connection.execute(
+            "SELECT reaches.reach, reaches.swot_size, reaches.swot_mtime, "
+            "appended.swot_size, appended.swot_mtime, appended.swot_digest "
+            "FROM reaches LEFT JOIN appended ON reaches.reach = appended.reach") }
+        stale_list = []
+        touched_list = []
+        self.digests = {}
+        for reach in reach_list:
+            swot_size, swot_mtime, size, mtime, digest = rows[reach]
+            if (swot_size, swot_mtime) == (size, mtime):
+                continue
+            if checksum:
+                self.digests[reach] = file_digest(self.data_dir / (reach + SWOT_SUFFIX))
+                if self.digests[reach] == digest:
+                    touched_list.append(reach)
+                    continue
+            stale_list.append(reach)
+
+        # Record touched but identical files so they are not hashed again
+        self.record_appended(touched_list)
+        self.unchanged = len(reach_list) - len(stale_list)
+        return stale_list
+
+    def record_appended(self, reach_list):
+        """Record current SWOT size, modification time and any checksum from
+        stale for each reach in reach_list in one transaction."""
+
+        rows = { row[0] : row[1:] for row in self.connection.execute(
+            "SELECT reach, swot_size, swot_mtime FROM reaches") }
+        records = [ (reach, *rows[reach], self.digests.get(reach))
+            for reach in reach_list if reach in rows ]
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO appended VALUES (?, ?, ?, ?)", records)
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+def scan_files(data_dir):
+    """Returns a dictionary of reach keys and dictionary values of file suffix
+    keys and os.DirEntry values for SWOT and SoS files in data_dir.
+
+    Files without a SWOT or SoS suffix are ignored.
+    """
+
+    reach_dict = {}
+    with scandir(data_dir) as entries:
+        for entry in entries:
+            for suffix in (SWOT_SUFFIX, SOS_SUFFIX):
+                if entry.name.endswith(suffix):
+                    reach = entry.name[:-len(suffix)]
+                    reach_dict.setdefault(reach, {})[suffix] = entry
+    return reach_dict
+
+def scan_reaches(data_dir):
+    """Returns sorted list of reaches with both SWOT and SoS files in
+    data_dir."""
+
+    return sorted(reach for reach, entries in scan_files(data_dir).items()
+        if len(entries) == 2)
+
+def file_stat(entry):
+    """Returns size and modification time in nanoseconds of a directory entry
+    or None values if there is no entry."""
+
+    if entry is None:
+        return None, None
+    entry_stat = entry.stat()
+    return entry_stat.st_size, entry_stat.st_mtime_ns
+
+def file_digest(path):
+    """Returns BLAKE2b checksum of a file's contents."""
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_dims(swot_path):
+    """Returns nx and nt dimension sizes of a SWOT file or None values if they
+    cannot be read."""
+
+    try:
+        with nc.Dataset(swot_path) as dataset:
+            return dataset.dimensions["nx"].size, dataset.dimensions["nt"].size
+    except (OSError, KeyError):
+        return None, None
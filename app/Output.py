@@ -1,7 +1,11 @@
+# Standard imports
+from os import replace
+from pathlib import Path
+import sys
+
 # Third party imports
 import numpy as np
 import netCDF4 as nc
-import rpy2.rinterface as rinterface
 
 class Output:
     """Class that represents SWORD of Science data obtained from geoBAM run.
@@ -10,157 +14,244 @@ class Output:
     ----------
         prior_data: rpy2.robjects.vectors.ListVector
             ListVector of prior data from geoBAMr::bam_priors function
+        prior_dict: dictionary
+            Dictionary of extracted priors, given or set by append_priors
         sos_path: Path
             Path to SWORD of Science NetCDF
+        valid: bool
+            Whether valid prior data was given
+        dataset: netCDF4.Dataset
+            SoS dataset already open in append mode or None to open sos_path
+        compact: bool
+            Write reach-level priors as one vector instead of 40 variables
     """
 
     FILL_VALUE = float(-9999)
 
-    def __init__(self, sos_path, prior_data, invalid_indexes):
+    # Append states of a SoS file
+    NEW = 0
+    PARTIAL = 1
+    COMPLETE = 2
+
+    def __init__(self, sos_path, prior_data, invalid_indexes, prior_dict=None,
+        dataset=None, compact=False):
         self.sos_path = sos_path
         self.prior_data = prior_data
         self.invalid_indexes = invalid_indexes
+        self.prior_dict = prior_dict
+        self.valid = prior_dict is not None or bool(prior_data)
+        self.dataset = dataset
+        self.compact = compact
+
+    def get_prior_dict(self):
+        """Returns prior dictionary extracting prior data on first call.
+
+        Priors already extracted in prior_dict (e.g. from a cache) are
+        returned as is.
+        """
+
+        # Extract priors if valid data could be extracted
+        if self.prior_dict is None:
+            self.prior_dict = create_prior_dict()
+            if self.valid:
+                extract_priors(self.prior_dict, self.prior_data, self.invalid_indexes)
+        return self.prior_dict
 
     def append_priors(self):
         """Append prior data to sos_path file."""
 
-        # Create prior dictionary
-        prior_dict = create_prior_dict()
-        valid = False
-
-        # Test if valid data could be extracted
-        if self.prior_data:
-            extract_priors(prior_dict, self.prior_data, self.invalid_indexes)
-            valid = True
-        
         # Write prior dictionary to SWORD of Science file
-        write_priors(self.sos_path, prior_dict, valid)
+        write_priors(self.sos_path, self.get_prior_dict(), self.valid,
+            self.dataset, self.compact)
+
+# Reach-level priors: variable name, bam_priors sublist, long name and units
+PRIOR_VARIABLES = [
+    ("lowerbound_A0", "river_type_priors", "Median_area_min", "m^2"),
+    ("upperbound_A0", "river_type_priors", "Median_area_max", "m^2"),
+    ("lowerbound_logn", "river_type_priors", "Mannings_n_min", "NA"),
+    ("upperbound_logn", "river_type_priors", "Mannings_n_max", "NA"),
+    ("lowerbound_b", "river_type_priors", "AHG_b_min", "NA"),
+    ("upperbound_b", "river_type_priors", "AHG_b_max", "NA"),
+    ("lowerbound_logWb", "river_type_priors", "Bankfull_width_min", "m"),
+    ("upperbound_logWb", "river_type_priors", "Bankfull_width_max", "m"),
+    ("lowerbound_logDb", "river_type_priors", "Bankfull_depth_min", "m"),
+    ("upperbound_logDb", "river_type_priors", "Bankfull_depth_max", "m"),
+    ("lowerbound_logr", "river_type_priors", "Dingman_shape_min", "NA"),
+    ("upperbound_logr", "river_type_priors", "Dingman_shape_max", "NA"),
+    ("logA0_hat", "river_type_priors", "Median_area_mean", "m^2"),
+    ("logn_hat", "river_type_priors", "Mannings_n_mean", "NA"),
+    ("b_hat", "river_type_priors", "AHG_b_mean", "NA"),
+    ("logWb_hat", "river_type_priors", "Bankfull_width_mean", "m"),
+    ("logDb_hat", "river_type_priors", "Bankfull_depth_mean", "m"),
+    ("logr_hat", "river_type_priors", "Dingman_shape_mean", "NA"),
+    ("logA0_sd", "river_type_priors", "Median_area_sd", "m^2"),
+    ("logn_sd", "river_type_priors", "Mannings_n_sd", "NA"),
+    ("b_sd", "river_type_priors", "AHG_b_sd", "NA"),
+    ("logWb_sd", "river_type_priors", "Bankfull_width_sd", "m"),
+    ("logDb_sd", "river_type_priors", "Bankfull_depth_sd", "m"),
+    ("logr_sd", "river_type_priors", "Dingman_shape_sd", "NA"),
+    ("lowerbound_logQ", "other_priors", "Discharge_min", "m^3/s"),
+    ("upperbound_logQ", "other_priors", "Discharge_max", "m^3/s"),
+    ("lowerbound_logWc", "other_priors", "AMHG_wc_min", "m"),
+    ("upperbound_logWc", "other_priors", "AMHG_wc_min", "m"),
+    ("lowerbound_logQc", "other_priors", "AMHG_Qc_min", "m^3/s"),
+    ("upperbound_logQc", "other_priors", "AMHG_Qc_max", "m^3/s"),
+    ("logWc_hat", "other_priors", "AMHG_wc_mean", "m"),
+    ("logQc_hat", "other_priors", "AMHG_Qc_mean", "m^3/s"),
+    ("logQ_sd", "other_priors", "Discharge_sd", "m^3/s"),
+    ("logWc_sd", "other_priors", "AMHG_wc_sd", "m"),
+    ("logQc_sd", "other_priors", "AMHG_qc_min", "m^3/s"),
+    ("Werr_sd", "other_priors", "Width_measurement_error", "m"),
+    ("Serr_sd", "other_priors", "Slope_measurement_error", "m/m"),
+    ("dAerr_sd", "other_priors", "d_Area_measurement_error", "m"),
+    ("sigma_man", "other_priors", "Manning_structural_error", "NA"),
+    ("sigma_amhg", "other_priors", "AMHG_structural_error", "NA")
+]
+
+# Qhat and Qsd are kept under these names when an invalid reach overwrites
+# them with the fill value
+BACKUP_VARIABLES = { "Qhat" : "Qhat_original", "Qsd" : "Qsd_original" }
+
+# Dimensions and variables written by write_priors by group path
+PRIOR_NAMES = {
+    "/" : { "nx" },
+    "/reach" : { name for name, _, _, _ in PRIOR_VARIABLES } \
+        | { "prior", "priors", "prior_name", "prior_long_name", "prior_units" } \
+        | set(BACKUP_VARIABLES.values()),
+    "/node" : { "river_type" }
+}
+
+# R function returning the first value of each element of a list as a
+# named numeric vector
+FIRST_VALUES_FUNCTION = "function(x) vapply(x, function(v) as.numeric(v)[1], numeric(1))"
+FIRST_VALUES = None
 
 def create_prior_dict():
-    return {
-        "river_type" : Output.FILL_VALUE,
-        "lowerbound_A0" : Output.FILL_VALUE,
-        "upperbound_A0" : Output.FILL_VALUE,
-        "lowerbound_logn" : Output.FILL_VALUE,
-        "upperbound_logn" : Output.FILL_VALUE,
-        "lowerbound_b" : Output.FILL_VALUE,
-        "upperbound_b" : Output.FILL_VALUE,
-        "lowerbound_logWb" : Output.FILL_VALUE,
-        "upperbound_logWb" : Output.FILL_VALUE,
-        "lowerbound_logDb" : Output.FILL_VALUE,
-        "upperbound_logDb" : Output.FILL_VALUE,
-        "lowerbound_logr" : Output.FILL_VALUE,
-        "upperbound_logr" : Output.FILL_VALUE,
-        "logA0_hat" : Output.FILL_VALUE,
-        "logn_hat" : Output.FILL_VALUE,
-        "b_hat" : Output.FILL_VALUE,
-        "logWb_hat" : Output.FILL_VALUE,
-        "logDb_hat" : Output.FILL_VALUE,
-        "logr_hat" : Output.FILL_VALUE,
-        "logA0_sd" : Output.FILL_VALUE,
-        "logn_sd" : Output.FILL_VALUE,
-        "b_sd" : Output.FILL_VALUE,
-        "logWb_sd" : Output.FILL_VALUE,
-        "logDb_sd" : Output.FILL_VALUE,
-        "logr_sd" : Output.FILL_VALUE,
-        "lowerbound_logQ" : Output.FILL_VALUE,
-        "upperbound_logQ" : Output.FILL_VALUE,
-        "lowerbound_logWc" : Output.FILL_VALUE,
-        "upperbound_logWc" : Output.FILL_VALUE,
-        "lowerbound_logQc" : Output.FILL_VALUE,
-        "upperbound_logQc" : Output.FILL_VALUE,
-        "logWc_hat" : Output.FILL_VALUE,
-        "logQc_hat" : Output.FILL_VALUE,
-        "logQ_sd" : Output.FILL_VALUE,
-        "logWc_sd" : Output.FILL_VALUE,
-        "logQc_sd" : Output.FILL_VALUE,
-        "Werr_sd" : Output.FILL_VALUE,
-        "Serr_sd" : Output.FILL_VALUE,
-        "dAerr_sd" : Output.FILL_VALUE,
-        "sigma_man" : Output.FILL_VALUE,
-        "sigma_amhg" : Output.FILL_VALUE
-    }
-    
+    """Returns dictionary of river type and reach-level priors set to the 
+    fill value."""
+
+    prior_dict = { "river_type" : Output.FILL_VALUE }
+    for name, _, _, _ in PRIOR_VARIABLES:
+        prior_dict[name] = Output.FILL_VALUE
+    return prior_dict
+
 def extract_priors(prior_dict, priors, invalid_indexes):
-    """Extracts and stores priors in the prior_dict parameter."""
+    """Extracts and stores priors in the prior_dict parameter.
+    
+    Each bam_priors sublist is converted to numpy in a single call to R.
+    """
 
     prior_dict["river_type"] = insert_invalid(np.array(priors.rx2("River_Type")), invalid_indexes)
-    river_priors = priors.rx2("river_type_priors")
-    prior_dict["lowerbound_A0"] = np.array(river_priors.rx2("lowerbound_A0"))[0]
-    prior_dict["upperbound_A0"] = np.array(river_priors.rx2("upperbound_A0"))[0]
-    prior_dict["lowerbound_logn"] = np.array(river_priors.rx2("lowerbound_logn"))[0]
-    prior_dict["upperbound_logn"] = np.array(river_priors.rx2("upperbound_logn"))[0]
-    prior_dict["lowerbound_b"] = np.array(river_priors.rx2("lowerbound_b"))[0]
-    prior_dict["upperbound_b"] = np.array(river_priors.rx2("upperbound_b"))[0]
-    prior_dict["lowerbound_logWb"] = np.array(river_priors.rx2("lowerbound_logWb"))[0]
-    prior_dict["upperbound_logWb"] = np.array(river_priors.rx2("upperbound_logWb"))[0]
-    prior_dict["lowerbound_logDb"] = np.array(river_priors.rx2("lowerbound_logDb"))[0]
-    prior_dict["upperbound_logDb"] = np.array(river_priors.rx2("upperbound_logDb"))[0]
-    prior_dict["lowerbound_logr"] = np.array(river_priors.rx2("lowerbound_logr"))[0]
-    prior_dict["upperbound_logr"] = np.array(river_priors.rx2("upperbound_logr"))[0]
-    prior_dict["logA0_hat"] = np.array(river_priors.rx2("logA0_hat"))[0]
-    prior_dict["logn_hat"] = np.array(river_priors.rx2("logn_hat"))[0]
-    prior_dict["b_hat"] = np.array(river_priors.rx2("b_hat"))[0]
-    prior_dict["logWb_hat"] = np.array(river_priors.rx2("logWb_hat"))[0]
-    prior_dict["logDb_hat"] = np.array(river_priors.rx2("logDb_hat"))[0]
-    prior_dict["logr_hat"] = np.array(river_priors.rx2("logr_hat"))[0]
-    prior_dict["logA0_sd"] = np.array(river_priors.rx2("logA0_sd"))[0]
-    prior_dict["logn_sd"] = np.array(river_priors.rx2("logn_sd"))[0]
-    prior_dict["b_sd"] = np.array(river_priors.rx2("b_sd"))[0]
-    prior_dict["logWb_sd"] = np.array(river_priors.rx2("logWb_sd"))[0]
-    prior_dict["logDb_sd"] = np.array(river_priors.rx2("logDb_sd"))[0]
-    prior_dict["logr_sd"] = np.array(river_priors.rx2("logr_sd"))[0]
-
-    other_priors = priors.rx2("other_priors")
-    prior_dict["lowerbound_logQ"] = np.array(other_priors.rx2("lowerbound_logQ"))[0]
-    prior_dict["upperbound_logQ"] = np.array(other_priors.rx2("upperbound_logQ"))[0]
-    prior_dict["lowerbound_logWc"] = np.array(other_priors.rx2("lowerbound_logWc"))[0]
-    prior_dict["upperbound_logWc"] = np.array(other_priors.rx2("upperbound_logWc"))[0]
-    prior_dict["lowerbound_logQc"] = np.array(other_priors.rx2("lowerbound_logQc"))[0]
-    prior_dict["upperbound_logQc"] = np.array(other_priors.rx2("upperbound_logQc"))[0]
-    prior_dict["logWc_hat"] = np.array(other_priors.rx2("logWc_hat"))[0]
-    prior_dict["logQc_hat"] = np.array(other_priors.rx2("logQc_hat"))[0]
-    prior_dict["logQ_sd"] = np.array(other_priors.rx2("logQ_sd"))[0]
-    prior_dict["logWc_sd"] = np.array(other_priors.rx2("logWc_sd"))[0]
-    prior_dict["logQc_sd"] = np.array(other_priors.rx2("logQc_sd"))[0]
-    prior_dict["Werr_sd"] = np.array(other_priors.rx2("Werr_sd"))[0]
-    prior_dict["Serr_sd"] = np.array(other_priors.rx2("Serr_sd"))[0]
-    prior_dict["dAerr_sd"] = np.array(other_priors.rx2("dAerr_sd"))[0]
-    prior_dict["sigma_man"] = np.array(other_priors.rx2("sigma_man"))[0][0]
-    prior_dict["sigma_amhg"] = np.array(other_priors.rx2("sigma_amhg"))[0][0]
+    sublist_values = {}
+    for sublist in ("river_type_priors", "other_priors"):
+        values = first_values(priors.rx2(sublist))
+        sublist_values[sublist] = dict(zip(values.names, np.asarray(values)))
+    for name, sublist, _, _ in PRIOR_VARIABLES:
+        prior_dict[name] = sublist_values[sublist][name]
+
+def first_values(r_list):
+    """Returns named R numeric vector of the first value of each element of
+    r_list."""
+
+    global FIRST_VALUES
+    if FIRST_VALUES is None:
+        import rpy2.robjects as robjects
+        FIRST_VALUES = robjects.r(FIRST_VALUES_FUNCTION)
+    return FIRST_VALUES(r_list)
 
 def insert_invalid(river_types, invalid_indexes):
-    """Insert NaN value at invalid indezes in river_priors array."""
+    """Insert fill value at invalid node indexes in river_priors array.
+
+    Valid river types are scattered through a keep mask into a full length
+    array of fill values so invalid indexes may be in any order.
+    """
+
+    river_types = np.asarray(river_types)
+    keep = np.ones(river_types.size + len(invalid_indexes), dtype=bool)
+    keep[invalid_indexes] = False
+    nodes = np.full(keep.size, Output.FILL_VALUE, dtype=river_types.dtype)
+    nodes[keep] = river_types
 
-    # Insert NaN for NA_Integer and NA_logical
-    river_types[river_types == -2147483648] = Output.FILL_VALUE
-    river_types[np.isnan(river_types)] = Output.FILL_VALUE
+    # Fill value for NA_Integer and NA_logical
+    nodes[(nodes == -2147483648) | np.isnan(nodes)] = Output.FILL_VALUE
+    return nodes
+
+
+def read_priors(sos_file):
+    """Read priors appended to a SoS file in either layout.
+
+    Returns dictionary with the same keys as create_prior_dict with missing 
+    values as Output.FILL_VALUE.
+    """
 
-    # Insert NaN for invalid nodes
-    for index in invalid_indexes:
-        river_types = np.insert(river_types, index, Output.FILL_VALUE)
+    with nc.Dataset(sos_file) as dataset:
+        dataset.set_auto_mask(False)
+        reach_grp = dataset["reach"]
+        if "priors" in reach_grp.variables:
+            names = reach_grp["prior_name"][:]
+            prior_dict = dict(zip(names, reach_grp["priors"][:].tolist()))
+        else:
+            prior_dict = { name : float(reach_grp[name][...]) 
+                for name, _, _, _ in PRIOR_VARIABLES }
+        river_type = dataset["node/river_type"][...]
+        prior_dict["river_type"] = float(river_type) if river_type.ndim == 0 else river_type
+    return prior_dict
 
-    return river_types
+def append_state(sos_file):
+    """Determine whether priors have been appended to a SoS file.
 
+    The valid global attribute is written last so a file with prior 
+    variables and no valid attribute was only partially written.
 
-def write_priors(sos_file, priors, valid):
+    Returns Output.NEW, Output.PARTIAL or Output.COMPLETE.
+    """
+
+    with nc.Dataset(sos_file) as dataset:
+        return dataset_state(dataset)
+
+def dataset_state(dataset):
+    """Returns append state of an open SoS dataset."""
+
+    if "valid" in dataset.ncattrs():
+        return Output.COMPLETE
+    if "river_type" in dataset["node"].variables \
+        or "lowerbound_A0" in dataset["reach"].variables \
+        or "priors" in dataset["reach"].variables:
+        return Output.PARTIAL
+    return Output.NEW
+
+def write_priors(sos_file, priors, valid, dataset=None, compact=False):
     """Appends priors to SWORD of Science file if valid parameter is True.
     
     Appends the fill value to priors if the valid parameters is False as prior
-    data could not be determined.
+    data could not be determined. Priors left by an earlier or partial write
+    are removed first as their layout may not match the new priors. An
+    already open dataset is written to and closed instead of opening 
+    sos_file. Reach-level priors are written as one vector if compact is True.
     """
 
     # Retrieve NetCDF4 dataset
-    dataset = nc.Dataset(sos_file, mode='a', format="NETCDF4")
+    if dataset is None:
+        dataset = nc.Dataset(sos_file, mode='a', format="NETCDF4")
+
+    # Remove priors of an earlier run (e.g. a stale reach in incremental mode)
+    if dataset_state(dataset) != Output.NEW:
+        dataset.close()
+        remove_priors(sos_file)
+        dataset = nc.Dataset(sos_file, mode='a', format="NETCDF4")
 
     # Append priors
-    append_variables(priors, dataset)
+    if compact:
+        append_compact(priors, dataset)
+    else:
+        append_variables(priors, dataset)
 
     # Append river type as NA and assign fill value to invalid reaches
     if not valid:
         create_variable(dataset["node"], "river_type", "Brinkerhoff_class_number", "NA", priors["river_type"])
-        dataset["reach/Qhat"].assignValue(Output.FILL_VALUE)
-        dataset["reach/Qsd"].assignValue(Output.FILL_VALUE)
+        for name, backup in BACKUP_VARIABLES.items():
+            backup_variable(dataset["reach"], name, backup)
+            dataset["reach"][name].assignValue(Output.FILL_VALUE)
     else:
         # Create nx dimension and coordinate variable and append vector 
         create_nx(np.shape(priors["river_type"]), dataset)
@@ -179,62 +270,86 @@ def append_variables(priors, dataset):
     reach_grp = dataset["reach"]
 
     # Create variables for each prior
-    create_variable(reach_grp, "lowerbound_A0", "Median_area_min", "m^2", priors["lowerbound_A0"])
-    create_variable(reach_grp, "upperbound_A0", "Median_area_max", "m^2", priors["upperbound_A0"])
-    create_variable(reach_grp, "lowerbound_logn", "Mannings_n_min", "NA", priors["lowerbound_logn"])
-    create_variable(reach_grp, "upperbound_logn", "Mannings_n_max", "NA", priors["upperbound_logn"])
-    create_variable(reach_grp, "lowerbound_b", "AHG_b_min", "NA", priors["lowerbound_b"])
-    create_variable(reach_grp, "upperbound_b", "AHG_b_max", "NA", priors["upperbound_b"])
-    create_variable(reach_grp, "lowerbound_logWb", "Bankfull_width_min", "m", priors["lowerbound_logWb"])
-    create_variable(reach_grp, "upperbound_logWb", "Bankfull_width_max", "m", priors["upperbound_logWb"])
-    create_variable(reach_grp, "lowerbound_logDb", "Bankfull_depth_min", "m", priors["lowerbound_logDb"])
-    create_variable(reach_grp, "upperbound_logDb", "Bankfull_depth_max", "m", priors["upperbound_logDb"])
-    create_variable(reach_grp, "lowerbound_logr", "Dingman_shape_min", "NA", priors["lowerbound_logr"])
-    create_variable(reach_grp, "upperbound_logr", "Dingman_shape_max", "NA", priors["upperbound_logr"])
-    create_variable(reach_grp, "logA0_hat", "Median_area_mean", "m^2", priors["logA0_hat"])
-    create_variable(reach_grp, "logn_hat", "Mannings_n_mean", "NA", priors["logn_hat"])
-    create_variable(reach_grp, "b_hat", "AHG_b_mean", "NA", priors["b_hat"])
-    create_variable(reach_grp, "logWb_hat", "Bankfull_width_mean", "m", priors["logWb_hat"])
-    create_variable(reach_grp, "logDb_hat", "Bankfull_depth_mean", "m", priors["logDb_hat"])
-    create_variable(reach_grp, "logr_hat", "Dingman_shape_mean", "NA", priors["logr_hat"])
-    create_variable(reach_grp, "logA0_sd", "Median_area_sd", "m^2", priors["logA0_sd"])
-    create_variable(reach_grp, "logn_sd", "Mannings_n_sd", "NA", priors["logn_sd"])
-    create_variable(reach_grp, "b_sd", "AHG_b_sd", "NA", priors["b_sd"])
-    create_variable(reach_grp, "logWb_sd", "Bankfull_width_sd", "m", priors["logWb_sd"])
-    create_variable(reach_grp, "logDb_sd", "Bankfull_depth_sd", "m", priors["logDb_sd"])
-    create_variable(reach_grp, "logr_sd", "Dingman_shape_sd", "NA", priors["logr_sd"])
-    create_variable(reach_grp, "lowerbound_logQ", "Discharge_min", "m^3/s", priors["lowerbound_logQ"])
-    create_variable(reach_grp, "upperbound_logQ", "Discharge_max", "m^3/s", priors["upperbound_logQ"])
-    create_variable(reach_grp, "lowerbound_logWc", "AMHG_wc_min", "m", priors["lowerbound_logWc"])
-    create_variable(reach_grp, "upperbound_logWc", "AMHG_wc_min", "m", priors["upperbound_logWc"])
-    create_variable(reach_grp, "lowerbound_logQc", "AMHG_Qc_min", "m^3/s", priors["lowerbound_logQc"])
-    create_variable(reach_grp, "upperbound_logQc", "AMHG_Qc_max", "m^3/s", priors["upperbound_logQc"])
-    create_variable(reach_grp, "logWc_hat", "AMHG_wc_mean", "m", priors["logWc_hat"])
-    create_variable(reach_grp, "logQc_hat", "AMHG_Qc_mean", "m^3/s", priors["logQc_hat"])
-    create_variable(reach_grp, "logQ_sd", "Discharge_sd", "m^3/s", priors["logQ_sd"])
-    create_variable(reach_grp, "logWc_sd", "AMHG_wc_sd", "m", priors["logWc_sd"])
-    create_variable(reach_grp, "logQc_sd", "AMHG_qc_min", "m^3/s", priors["logQc_sd"])
-    create_variable(reach_grp, "Werr_sd", "Width_measurement_error", "m", priors["Werr_sd"])
-    create_variable(reach_grp, "Serr_sd", "Slope_measurement_error", "m/m", priors["Serr_sd"])
-    create_variable(reach_grp, "dAerr_sd", "d_Area_measurement_error", "m", priors["dAerr_sd"])
-    create_variable(reach_grp, "sigma_man", "Manning_structural_error", "NA", priors["sigma_man"])
-    create_variable(reach_grp, "sigma_amhg", "AMHG_structural_error", "NA", priors["sigma_amhg"])
+    for name, _, long_name, units in PRIOR_VARIABLES:
+        create_variable(reach_grp, name, long_name, units, priors[name])
+
+def append_compact(priors, dataset):
+    """Appends geoBAM priors to reach group as a single vector variable 
+    indexed by a prior dimension.
+    
+    Names, long names and units are stored once in lookup variables.
+    """
+
+    # Retrieve reach group and create prior dimension
+    reach_grp = dataset["reach"]
+    if "prior" not in reach_grp.dimensions:
+        reach_grp.createDimension("prior", len(PRIOR_VARIABLES))
+
+    # Create lookup variables
+    names, _, long_names, units = zip(*PRIOR_VARIABLES)
+    create_lookup(reach_grp, "prior_name", "Prior_name", names)
+    create_lookup(reach_grp, "prior_long_name", "Prior_long_name", long_names)
+    create_lookup(reach_grp, "prior_units", "Prior_units", units)
+
+    # Create prior vector
+    if "priors" in reach_grp.variables:
+        netcdf_var = reach_grp["priors"]
+    else:
+        netcdf_var = reach_grp.createVariable("priors", "f8", ("prior",), 
+            fill_value = Output.FILL_VALUE)
+    netcdf_var.long_name = "geoBAM_priors"
+    netcdf_var.units = "see_prior_units"
+    netcdf_var[:] = [ fill_missing(priors[name]) for name in names ]
+
+def create_lookup(group, name, long_name, values):
+    """Create string variable along the prior dimension and assign values."""
+
+    if name in group.variables:
+        netcdf_var = group[name]
+    else:
+        netcdf_var = group.createVariable(name, str, ("prior",))
+    netcdf_var.long_name = long_name
+    netcdf_var[:] = np.array(values, dtype=object)
 
 def create_variable(group, name, long_name, units, value):
-    """Create NetCDF4 variable and assign data to it."""
+    """Create NetCDF4 variable (or reuse an existing one) and assign data to
+    it."""
 
-    netcdf_var = group.createVariable(name, "f8", fill_value = Output.FILL_VALUE)
+    if name in group.variables:
+        netcdf_var = group[name]
+    else:
+        netcdf_var = group.createVariable(name, "f8", fill_value = Output.FILL_VALUE)
     netcdf_var.long_name = long_name
     netcdf_var.units = units
-    if np.isnan(value) or value is rinterface.NA_Integer or value is rinterface.NA_Logical:
-        value = Output.FILL_VALUE
-    netcdf_var.assignValue(value)
+    netcdf_var.assignValue(fill_missing(value))
+
+def fill_missing(value):
+    """Returns fill value for NaN and R NA values or value otherwise."""
+
+    if is_r_na(value) or np.isnan(value):
+        return Output.FILL_VALUE
+    return value
+
+def is_r_na(value):
+    """Returns True if value is R's integer or logical NA.
+    
+    R values can only exist once rpy2 has been imported so it is not 
+    imported here.
+    """
+
+    rinterface = sys.modules.get("rpy2.rinterface")
+    return rinterface is not None \
+        and (value is rinterface.NA_Integer or value is rinterface.NA_Logical)
 
 def create_nx(length, dataset):
-    """Create node dimension and coordinate variable."""
+    """Create node dimension and coordinate variable if they do not exist."""
     
-    dataset.createDimension("nx", length[0])
-    nx = dataset.createVariable("nx", "i4", ("nx",))
+    if "nx" not in dataset.dimensions:
+        dataset.createDimension("nx", length[0])
+    if "nx" in dataset.variables:
+        nx = dataset["nx"]
+    else:
+        nx = dataset.createVariable("nx", "i4", ("nx",))
     nx.units = "node"
     nx.long_name = "nx"
     nx[:] = range(1, length[0] + 1)
@@ -242,7 +357,85 @@ def create_nx(length, dataset):
 def append_river_type(priors, dataset):
     """Append river type vector prior to node group."""
 
-    netcdf_var = dataset["node"].createVariable('river_type', "f8", ("nx"), fill_value = Output.FILL_VALUE)
+    if "river_type" in dataset["node"].variables:
+        netcdf_var = dataset["node/river_type"]
+    else:
+        netcdf_var = dataset["node"].createVariable('river_type', "f8", ("nx"), fill_value = Output.FILL_VALUE)
     netcdf_var.long_name = "Brinkerhoff_class_number"
     netcdf_var.units = "NA"
-    netcdf_var[:] = priors["river_type"]
\ No newline at end of file
+    netcdf_var[:] = priors["river_type"]
+
+def backup_variable(group, name, backup):
+    """Copy a scalar variable to a backup variable so its value survives
+    being overwritten."""
+
+    variable = group[name]
+    fill_value = variable.getncattr("_FillValue") \
+        if "_FillValue" in variable.ncattrs() else None
+    netcdf_var = group.createVariable(backup, variable.datatype, 
+        fill_value = fill_value)
+    netcdf_var.setncatts({ attr : variable.getncattr(attr) 
+        for attr in variable.ncattrs() if attr != "_FillValue" })
+    netcdf_var.assignValue(variable.getValue())
+
+def remove_priors(sos_file):
+    """Rewrite a SoS file without the priors, nx and valid flag of an earlier
+    write and with Qhat and Qsd restored from their backups.
+
+    NetCDF variables and dimensions cannot be deleted or resized so the file
+    is copied without them and the copy renamed over sos_file.
+    """
+
+    sos_file = Path(sos_file)
+    rewrite = sos_file.with_name(f".{sos_file.name}.rewrite")
+    with nc.Dataset(sos_file) as source:
+        source.set_auto_maskandscale(False)
+        source.set_auto_chartostring(False)
+        with nc.Dataset(rewrite, mode='w', format=source.data_model) as target:
+            copy_group(source, target)
+    replace(rewrite, sos_file)
+
+def copy_group(source, target):
+    """Copy attributes, dimensions, variables and subgroups of a group 
+    skipping those written by write_priors."""
+
+    skip = PRIOR_NAMES.get(source.path, set())
+    target.setncatts({ attr : source.getncattr(attr) for attr in source.ncattrs()
+        if source.path != "/" or attr != "valid" })
+    for name, dimension in source.dimensions.items():
+        if name not in skip:
+            target.createDimension(name, 
+                None if dimension.isunlimited() else dimension.size)
+    for name, variable in source.variables.items():
+        if name not in skip:
+            backup = BACKUP_VARIABLES.get(name) if source.path == "/reach" else None
+            if backup in source.variables:
+                copy_variable(variable, target, source[backup])
+            else:
+                copy_variable(variable, target, variable)
+    for name, group in source.groups.items():
+        copy_group(group, target.createGroup(name))
+
+def copy_variable(variable, target, data_variable):
+    """Create a copy of variable in target group with the data of
+    data_variable."""
+
+    attrs = variable.ncattrs()
+    fill_value = variable.getncattr("_FillValue") if "_FillValue" in attrs else None
+    chunking = variable.chunking()
+    filters = variable.filters() or {}
+    netcdf_var = target.createVariable(variable.name, variable.datatype, 
+        variable.dimensions, fill_value = fill_value,
+        zlib = filters.get("zlib", False), complevel = filters.get("complevel", 4),
+        shuffle = filters.get("shuffle", True), 
+        fletcher32 = filters.get("fletcher32", False),
+        contiguous = chunking == "contiguous" and variable.ndim > 0,
+        chunksizes = None if chunking in (None, "contiguous") else chunking)
+    netcdf_var.set_auto_maskandscale(False)
+    netcdf_var.set_auto_chartostring(False)
+    netcdf_var.setncatts({ attr : variable.getncattr(attr) for attr in attrs 
+        if attr != "_FillValue" })
+    if data_variable.ndim == 0:
+        netcdf_var.assignValue(data_variable.getValue())
+    elif data_variable.size > 0:
+        netcdf_var[...] = data_variable[...]
@@ -0,0 +1,52 @@
+# Standard imports
+import heapq
+from os import stat
+
+# Third party imports
+import netCDF4 as nc
+
+"""Functions that partition reaches over ranks using estimated geoBAM cost."""
+
+def estimate_cost(swot_path, cost_model="dims"):
+    """Estimate relative geoBAM cost of a reach from its SWOT file.
+
+    The "dims" model uses nx * nt from the SWOT NetCDF dimensions and the 
+    "size" model uses the file size in bytes. Falls back to file size if the 
+    dimensions cannot be read.
+    """
+
+    if cost_model == "dims":
+        try:
+            with nc.Dataset(swot_path) as dataset:
+                return float(dataset.dimensions["nx"].size 
+                    * dataset.dimensions["nt"].size)
+        except (OSError, KeyError):
+            pass
+    return float(stat(swot_path).st_size)
+
+def estimate_costs(data_dir, reach_list, cost_model="dims"):
+    """Returns a dictionary of reach keys and estimated cost values."""
+
+    return { reach : estimate_cost(data_dir / (reach + "_SWOT.nc"), cost_model)
+        for reach in reach_list }
+
+def partition_lpt(reach_list, cost_dict, size):
+    """Assign reaches to ranks longest-processing-time first.
+
+    Reaches are sorted by descending cost and each is given to the rank with 
+    the smallest predicted load so far.
+
+    Returns a dictionary of rank keys and reach values and a dictionary of 
+    rank keys and predicted load values.
+    """
+
+    reach_dict = { i : [] for i in range(size) }
+    load_dict = { i : 0.0 for i in range(size) }
+    heap = [ (0.0, i) for i in range(size) ]
+    for reach in sorted(reach_list, key=lambda reach: cost_dict[reach], reverse=True):
+        load, rank = heapq.heappop(heap)
+        reach_dict[rank].append(reach)
+        load += cost_dict[reach]
+        load_dict[rank] = load
+        heapq.heappush(heap, (load, rank))
+    return reach_dict, load_dict
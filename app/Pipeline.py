@@ -0,0 +1,125 @@
+# Standard imports
+from queue import Queue
+from threading import Event, Lock, Thread
+from time import perf_counter
+
+# Sentinel placed on a queue when no more items will follow
+STOP = None
+
+class Pipeline:
+    """Class that overlaps NetCDF reads and writes with geoBAM runs.
+
+    A reader thread prefetches and validates reaches, the calling thread runs
+    geoBAM (R stays on a single thread) and a writer thread appends priors to
+    the SoS. Bounded queues between the stages apply backpressure so at most
+    read_depth + write_depth reaches are held in memory. When staging, the
+    reader stages each chunk in before reading it and the writer stages it
+    out once its last reach is written.
+
+    Attributes
+    ----------
+        append_sos: AppendSOS
+            AppendSOS object to record valid and invalid reaches on
+        read_depth: int
+            Maximum number of validated reaches waiting for geoBAM
+        write_depth: int
+            Maximum number of prior results waiting to be written
+        io_lock: Lock
+            Lock serializing NetCDF library calls between reader and writer
+        errors: List
+            Exceptions raised in the reader or writer threads
+        stopped: Event
+            Set when any stage fails so the others stop early
+    """
+
+    def __init__(self, append_sos, read_depth=4, write_depth=4):
+        self.append_sos = append_sos
+        self.read_depth = read_depth
+        self.write_depth = write_depth
+        self.io_lock = Lock()
+        self.errors = []
+        self.stopped = Event()
+
+    def run(self, reaches):
+        """Append priors for each reach in reaches through the pipeline."""
+
+        start = perf_counter()
+        chunks = self.append_sos.staged_chunks(self.append_sos.filter_completed(reaches))
+        read_queue = Queue(maxsize=self.read_depth)
+        write_queue = Queue(maxsize=self.write_depth)
+        reader = Thread(target=self.read, args=(chunks, read_queue), daemon=True)
+        writer = Thread(target=self.write, args=(write_queue, chunks), daemon=True)
+        reader.start()
+        writer.start()
+
+        try:
+            self.solve(read_queue, write_queue)
+        except BaseException:
+            # Unblock the reader before waiting on it
+            self.stopped.set()
+            while read_queue.get() is not STOP:
+                pass
+            raise
+        finally:
+            write_queue.put(STOP)
+            writer.join()
+            reader.join()
+            self.append_sos.elapsed += perf_counter() - start
+
+        if self.errors:
+            raise self.errors[0]
+
+    def read(self, chunks, read_queue):
+        """Stage in each chunk of reaches then read and validate input for 
+        each reach placing it on read_queue."""
+
+        try:
+            for chunk in chunks:
+                if self.stopped.is_set():
+                    break
+                self.append_sos.stage_in(chunk)
+                for reach in chunk:
+                    if self.stopped.is_set():
+                        break
+                    input = self.append_sos.read_input(reach, self.io_lock)
+                    read_queue.put((reach, input))
+        except Exception as error:
+            self.errors.append(error)
+            self.stopped.set()
+        finally:
+            read_queue.put(STOP)
+
+    def solve(self, read_queue, write_queue):
+        """Run geoBAM on valid reaches from read_queue placing output on
+        write_queue."""
+
+        while True:
+            item = read_queue.get()
+            if item is STOP:
+                break
+            if self.stopped.is_set():
+                continue
+            reach, input = item
+            self.append_sos.logger.info(f"Appending data for reach: {reach}")
+            output, key = self.append_sos.solve(reach, input)
+            write_queue.put((reach, output, key))
+
+    def write(self, write_queue, chunks):
+        """Append priors for each (reach, Output object, cache key) on 
+        write_queue staging out each chunk after its last reach."""
+
+        last_reaches = { chunk[-1] : chunk for chunk in chunks }
+        while True:
+            item = write_queue.get()
+            if item is STOP:
+                break
+            if self.stopped.is_set():
+                continue
+            try:
+                with self.io_lock:
+                    self.append_sos.write(*item)
+                if item[0] in last_reaches:
+                    self.append_sos.stage_out(last_reaches[item[0]])
+            except Exception as error:
+                self.errors.append(error)
+                self.stopped.set()
@@ -0,0 +1,170 @@
+# Standard imports
+import hashlib
+import json
+import sqlite3
+from threading import Lock
+from time import time
+
+# Third party imports
+import numpy as np
+
+class PriorCache:
+    """Class that represents an on-disk cache of extracted geoBAM priors keyed
+    by a hash of validated input data and the geoBAMr version.
+
+    The cache is a SQLite database in WAL mode so ranks on the same node can
+    share it. It should be kept on node-local storage as SQLite locking is not
+    reliable on network file systems. The total size of stored priors is kept
+    in the meta table so a put does not scan the priors table.
+
+    Attributes
+    ----------
+        path: Path
+            Path to SQLite database
+        max_bytes: int
+            Size of stored priors above which least recently used entries are
+            evicted
+        version: str
+            geoBAMr version included in every key or a function returning it
+            that is called on the first key (so R only starts if needed)
+        hits: int
+            Number of lookups that found cached priors
+        misses: int
+            Number of lookups that did not find cached priors
+    """
+
+    def __init__(self, path, max_bytes, version):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.connect()
+
+    def __getstate__(self):
+        """Pickle settings and counters but not the database connection."""
+
+        state = self.__dict__.copy()
+        del state["connection"]
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore settings and counters without reconnecting."""
+
+        self.__dict__.update(state)
+        self.connection = None
+        self.lock = Lock()
+
+    def connect(self):
+        """Open the database creating the priors and meta tables if needed."""
+
+        self.lock = Lock()
+        self.connection = sqlite3.connect(self.path, timeout=60,
+            isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS priors "
+            "(key TEXT PRIMARY KEY, value TEXT, size INTEGER, accessed REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS priors_accessed "
+            "ON priors (accessed)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta "
+            "(name TEXT PRIMARY KEY, value INTEGER)")
+
+        # Caches written before the meta table count their priors once
+        self.connection.execute("INSERT OR IGNORE INTO meta SELECT 'total_size', "
+            "COALESCE(SUM(size), 0) FROM priors")
+
+    def close(self):
+        """Close the database connection."""
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def key(self, input_data):
+        """Returns hash of validated input data and geoBAMr version."""
+
+        if callable(self.version):
+            self.version = self.version()
+        digest = hashlib.blake2b(self.version.encode(), digest_size=20)
+        for name in ("width", "slope2", "d_x_area", "Qhat", "invalid_indexes"):
+            array = np.ascontiguousarray(input_data[name])
+            digest.update(f"{name}{array.dtype.str}{array.shape}".encode())
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns cached prior dictionary for key or None on a miss."""
+
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM priors WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.connection.execute("UPDATE priors SET accessed = ? WHERE key = ?",
+                (time(), key))
+        return decode_priors(row[0])
+
+    def put(self, key, prior_dict):
+        """Store prior dictionary under key and evict entries over max_bytes
+        in one transaction."""
+
+        value = encode_priors(prior_dict)
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute("SELECT size FROM priors WHERE key = ?",
+                    (key,)).fetchone()
+                self.connection.execute("INSERT OR REPLACE INTO priors VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time()))
+                total = self.add_size(len(value) - (row[0] if row else 0))
+                if total > self.max_bytes:
+                    self.evict(total)
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def add_size(self, size):
+        """Add size to the stored total.
+
+        Returns new total size of stored priors.
+        """
+
+        self.connection.execute("UPDATE meta SET value = value + ? "
+            "WHERE name = 'total_size'", (size,))
+        return self.connection.execute("SELECT value FROM meta "
+            "WHERE name = 'total_size'").fetchone()[0]
+
+    def evict(self, total):
+        """Delete least recently used entries until total is under max_bytes.
+
+        Must be called inside a transaction.
+        """
+
+        evict_keys = []
+        evicted = 0
+        rows = self.connection.execute("SELECT key, size FROM priors ORDER BY accessed")
+        for key, size in rows:
+            if total - evicted <= self.max_bytes:
+                break
+            evict_keys.append((key,))
+            evicted += size
+        rows.close()
+        self.connection.executemany("DELETE FROM priors WHERE key = ?", evict_keys)
+        self.add_size(-evicted)
+
+def encode_priors(prior_dict):
+    """Encode prior dictionary as JSON text."""
+
+    return json.dumps({ name : np.asarray(value, dtype=float).tolist()
+        for name, value in prior_dict.items() })
+
+def decode_priors(value):
+    """Decode JSON text to a prior dictionary."""
+
+    prior_dict = json.loads(value)
+    prior_dict["river_type"] = np.array(prior_dict["river_type"], dtype=float)
+    return prior_dict
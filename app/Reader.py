@@ -0,0 +1,87 @@
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+
+class Reader:
+    """Class that reads NetCDF variables as plain arrays with missing values
+    as NaN.
+
+    Auto-masking is turned off so netCDF4 returns the stored values without
+    building a mask or a filled copy. Values netCDF4 would have masked
+    (_FillValue, missing_value and values outside valid_min, valid_max or
+    valid_range) are replaced by NaN in place. Arrays in a dtype other than
+    the stored one are converted into buffers kept per variable name and
+    reused by the next read of the same name, so a result is only valid
+    until then unless reuse is False.
+
+    Attributes
+    ----------
+        dtype: numpy.dtype
+            Working floating point type of the arrays returned
+        reuse: bool
+            Convert into buffers reused across reads
+        buffers: dict
+            Variable name keys and flat buffer values
+    """
+
+    def __init__(self, dtype=np.float64, reuse=True):
+        self.dtype = np.dtype(dtype)
+        self.reuse = reuse
+        self.buffers = {}
+
+    def read(self, variable, name=None):
+        """Read a netCDF4 variable.
+
+        Returns numpy array of dtype with missing values as NaN.
+        """
+
+        # Packed variables are unpacked after masking so leave them to netCDF4
+        if "scale_factor" in variable.ncattrs() or "add_offset" in variable.ncattrs():
+            return np.asarray(variable[:].filled(np.nan), dtype=self.dtype)
+
+        # Restore masking so other readers of an open dataset are unaffected
+        mask = variable.mask
+        variable.set_auto_mask(False)
+        try:
+            values = np.asarray(variable[:])
+        finally:
+            variable.set_auto_mask(mask)
+        if values.dtype.kind != 'f':
+            values = values.astype(np.float64)
+        values[missing(values, variable)] = np.nan
+
+        if values.dtype == self.dtype:
+            return values
+        buffer = self.buffer(name or variable.name, values.shape)
+        np.copyto(buffer, values, casting="same_kind")
+        return buffer
+
+    def buffer(self, name, shape):
+        """Returns array of shape that is a view of name's buffer, growing
+        the buffer if it is too small."""
+
+        size = int(np.prod(shape))
+        buffer = self.buffers.get(name)
+        if not self.reuse or buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=self.dtype)
+            if self.reuse:
+                self.buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+def missing(values, variable):
+    """Returns boolean array of values netCDF4 would mask for variable."""
+
+    attributes = { name : variable.getncattr(name) for name in variable.ncattrs() }
+    fill_value = attributes.get("_FillValue",
+        nc.default_fillvals.get(variable.dtype.str[1:]))
+    missing = values == fill_value
+    for value in np.atleast_1d(attributes.get("missing_value", [])):
+        missing |= values == value
+    valid_min, valid_max = attributes.get("valid_range", (None, None))
+    valid_min = attributes.get("valid_min", valid_min)
+    valid_max = attributes.get("valid_max", valid_max)
+    if valid_min is not None:
+        missing |= values < valid_min
+    if valid_max is not None:
+        missing |= values > valid_max
+    return missing
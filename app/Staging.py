@@ -0,0 +1,90 @@
+# Standard imports
+from os import fsync, replace
+from pathlib import Path
+from shutil import copyfile, rmtree
+from tempfile import gettempdir, mkdtemp
+from time import perf_counter
+
+class Staging:
+    """Class that stages reach SWOT and SoS files on node-local scratch.
+
+    Files are copied whole in one sequential transfer each so a rank only
+    makes small random reads and writes on local disk. Finished SoS files are
+    copied back next to their original under a temporary name and renamed
+    over it so a partial copy is never seen as a finished file.
+
+    Attributes
+    ----------
+        data_dir: Path
+            Path to directory of SWOT and SoS files
+        path: Path
+            Path to the rank's scratch directory
+        chunk_size: int
+            Number of reaches staged at once so scratch holds at most this
+            many reaches' files
+        in_seconds: float
+            Seconds spent copying files to scratch
+        in_bytes: int
+            Bytes copied to scratch
+        out_seconds: float
+            Seconds spent copying SoS files back
+        out_bytes: int
+            Bytes copied back
+    """
+
+    SUFFIXES = ("_SWOT.nc", "_SOS.nc")
+
+    def __init__(self, data_dir, scratch_dir="", rank=0, chunk_size=100):
+        self.data_dir = Path(data_dir)
+        self.path = Path(mkdtemp(prefix=f"sos_stage_{rank}_",
+            dir=scratch_dir or gettempdir()))
+        self.chunk_size = chunk_size
+        self.in_seconds = 0.0
+        self.in_bytes = 0
+        self.out_seconds = 0.0
+        self.out_bytes = 0
+
+    def stage_in(self, reaches):
+        """Copy SWOT and SoS files for reaches to scratch."""
+
+        start = perf_counter()
+        for reach in reaches:
+            for suffix in self.SUFFIXES:
+                copyfile(self.data_dir / (reach + suffix), self.path / (reach + suffix))
+                self.in_bytes += (self.path / (reach + suffix)).stat().st_size
+        self.in_seconds += perf_counter() - start
+
+    def stage_out(self, reaches, copy=True):
+        """Copy SoS files for reaches back to the data directory if copy is
+        True and remove reaches' files from scratch.
+
+        Returns list of reaches copied back.
+        """
+
+        start = perf_counter()
+        copied = []
+        for reach in reaches:
+            if copy:
+                sos_file = self.path / (reach + "_SOS.nc")
+                partial = self.data_dir / f".{reach}_SOS.nc.staging"
+                copyfile(sos_file, partial)
+                with open(partial, "rb") as file:
+                    fsync(file.fileno())
+                replace(partial, self.data_dir / sos_file.name)
+                self.out_bytes += sos_file.stat().st_size
+                copied.append(reach)
+            for suffix in self.SUFFIXES:
+                (self.path / (reach + suffix)).unlink(missing_ok=True)
+        self.out_seconds += perf_counter() - start
+        return copied
+
+    def report(self):
+        """Returns dictionary of transfer seconds and bytes."""
+
+        return { "in_seconds" : self.in_seconds, "in_bytes" : self.in_bytes,
+            "out_seconds" : self.out_seconds, "out_bytes" : self.out_bytes }
+
+    def close(self):
+        """Remove the scratch directory."""
+
+        rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,86 @@
+# Third party imports
+import numpy as np
+
+class Summary:
+    """Class that represents a compact record of a rank's results that is
+    cheap to gather on rank 0.
+
+    Reach identifiers are pickled as one newline separated string and their
+    statuses as a numpy array of status codes.
+
+    Attributes
+    ----------
+        reaches: List
+            List of reaches processed or skipped by the rank
+        status: numpy.ndarray
+            Status code of each reach
+        elapsed: float
+            Wall-clock seconds the rank spent appending reaches
+        cache_hits: int
+            Number of prior cache hits
+        cache_misses: int
+            Number of prior cache misses
+        reasons: dict
+            Reach keys and reason values for reaches that failed in geoBAM
+        staging: dict
+            Seconds and bytes copied to and from node-local scratch or empty
+            if the rank did not stage files
+    """
+
+    # Status codes
+    VALID = 0
+    INVALID = 1
+    SKIPPED = 2
+    FAILED = 3
+
+    def __init__(self, reaches, status, elapsed=0.0, cache_hits=0,
+        cache_misses=0, reasons=None, staging=None):
+        self.reaches = reaches
+        self.status = np.asarray(status, dtype=np.uint8)
+        self.elapsed = elapsed
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.reasons = reasons if reasons is not None else {}
+        self.staging = staging if staging is not None else {}
+
+    def __getstate__(self):
+        """Pickle reach identifiers as a single string."""
+
+        state = self.__dict__.copy()
+        state["reaches"] = "\n".join(self.reaches)
+        return state
+
+    def __setstate__(self, state):
+        """Split reach identifiers back into a list."""
+
+        self.__dict__.update(state)
+        self.reaches = state["reaches"].split("\n") if state["reaches"] else []
+
+    @property
+    def valid_list(self):
+        """List of reaches with valid data."""
+
+        return self.select(self.VALID)
+
+    @property
+    def invalid_list(self):
+        """List of reaches with invalid data."""
+
+        return self.select(self.INVALID)
+
+    @property
+    def skipped_list(self):
+        """List of reaches skipped as already appended."""
+
+        return self.select(self.SKIPPED)
+
+    @property
+    def failed_list(self):
+        """List of reaches left unwritten to be retried."""
+
+        return self.select(self.FAILED)
+
+    def select(self, code):
+        """Returns list of reaches with status code."""
+
+        return [ self.reaches[i] for i in np.flatnonzero(self.status == code) ]
@@ -0,0 +1,179 @@
+# Standard imports
+from multiprocessing import get_context
+from os import sysconf
+from pathlib import Path
+from time import monotonic
+
+# Local imports
+from app.GeoBAM import get_engine
+from app.Output import create_prior_dict, extract_priors
+
+# Reason codes for reaches geoBAM did not produce priors for
+ERROR = "geobam_error"
+TIMEOUT = "timeout"
+MEMORY = "memory"
+CRASHED = "crashed"
+
+class Supervisor:
+    """Class that runs geoBAM in a supervised worker process with a time and
+    memory budget per reach.
+
+    The worker embeds its own R and returns extracted prior dictionaries. A
+    worker that runs over its time budget or whose resident memory goes over
+    its memory budget is killed and a new worker is started for the next
+    reach.
+
+    Attributes
+    ----------
+        timeout: float
+            Seconds a reach may run in geoBAM or 0 for no limit
+        memory_bytes: int
+            Resident memory the worker may use or 0 for no limit
+        solver: function
+            Function run in the worker that returns a prior dictionary for
+            validated input data
+        setup: function
+            Function run once when a worker starts (e.g. to start R) or None
+        startup_timeout: float
+            Seconds a worker may take to run setup or 0 for no limit
+        poll_interval: float
+            Seconds between checks on a running worker
+        process: multiprocessing.Process
+            Worker process or None if not started
+        connection: multiprocessing.connection.Connection
+            Connection to the worker process or None if not started
+        restarts: int
+            Number of workers killed and replaced
+    """
+
+    def __init__(self, timeout=0, memory_bytes=0, solver=None, setup=get_engine,
+        poll_interval=0.1, startup_timeout=300):
+        self.timeout = timeout
+        self.memory_bytes = memory_bytes
+        self.solver = solver if solver is not None else solve_priors
+        self.setup = setup
+        self.startup_timeout = startup_timeout
+        self.poll_interval = poll_interval
+        self.process = None
+        self.connection = None
+        self.restarts = 0
+
+    def start(self):
+        """Start a worker process and wait until it is ready.
+
+        Returns None once the worker is ready or the result of recycle if it
+        exits or is not ready within startup_timeout.
+        """
+
+        context = get_context("spawn")
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(target=serve, args=(worker_connection,
+            self.solver, self.setup), daemon=True)
+        self.process.start()
+        worker_connection.close()
+
+        deadline = monotonic() + self.startup_timeout if self.startup_timeout else None
+        while not self.connection.poll(self.poll_interval):
+            if not self.process.is_alive():
+                break
+            if deadline is not None and monotonic() > deadline:
+                return self.recycle(CRASHED, f"worker not ready after {self.startup_timeout} seconds")
+        try:
+            self.connection.recv()
+        except EOFError:
+            self.process.join()
+            return self.recycle(CRASHED, f"worker exited with code {self.process.exitcode} during startup")
+        return None
+
+    def solve(self, input_data):
+        """Run solver on input data in the worker within the budgets.
+
+        Returns prior dictionary or None, reason code or None and a message
+        describing any failure.
+        """
+
+        if self.process is None:
+            failure = self.start()
+            if failure is not None:
+                return failure
+        self.connection.send(input_data)
+
+        deadline = monotonic() + self.timeout if self.timeout else None
+        while not self.connection.poll(self.poll_interval):
+            if not self.process.is_alive():
+                return self.recycle(CRASHED, f"worker exited with code {self.process.exitcode}")
+            if deadline is not None and monotonic() > deadline:
+                return self.recycle(TIMEOUT, f"over {self.timeout} seconds")
+            if self.memory_bytes and resident_bytes(self.process.pid) > self.memory_bytes:
+                return self.recycle(MEMORY, f"over {self.memory_bytes} bytes")
+
+        try:
+            return self.connection.recv()
+        except EOFError:
+            return self.recycle(CRASHED, f"worker exited with code {self.process.exitcode}")
+
+    def recycle(self, reason, message):
+        """Kill the worker so a new one is started for the next reach.
+
+        Returns None prior dictionary, reason code and message.
+        """
+
+        self.kill()
+        self.restarts += 1
+        return None, reason, message
+
+    def kill(self):
+        """Kill the worker process."""
+
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.connection.close()
+            self.process = None
+            self.connection = None
+
+    def close(self):
+        """Ask the worker process to exit, killing it if it does not."""
+
+        if self.process is not None:
+            self.connection.send(None)
+            self.process.join(timeout=10)
+            self.kill()
+
+def serve(connection, solver, setup):
+    """Run solver on input data received on connection sending back results
+    until None is received."""
+
+    if setup is not None:
+        setup()
+    connection.send(True)
+    while True:
+        input_data = connection.recv()
+        if input_data is None:
+            break
+        try:
+            connection.send((solver(input_data), None, None))
+        except MemoryError as error:
+            connection.send((None, MEMORY, str(error)))
+        except Exception as error:
+            connection.send((None, ERROR, str(error)))
+
+def solve_priors(input_data):
+    """Returns prior dictionary extracted from a geoBAM run on validated input
+    data."""
+
+    engine = get_engine()
+    priors = engine.bam_priors(engine.bam_data(input_data))
+    prior_dict = create_prior_dict()
+    extract_priors(prior_dict, priors, input_data["invalid_indexes"])
+    return prior_dict
+
+def resident_bytes(pid):
+    """Returns resident memory of a process in bytes or 0 if it cannot be
+    read."""
+
+    try:
+        pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * sysconf("SC_PAGE_SIZE")
@@ -0,0 +1,190 @@
+# Standard imports
+from contextlib import nullcontext
+import json
+from pathlib import Path
+import resource
+from time import perf_counter, thread_time, time
+
+# Third party imports
+import numpy as np
+
+# Stage context returned when timing is off
+NULL_STAGE = nullcontext()
+
+# Ranks slower than this factor of the median rank are stragglers
+STRAGGLER_FACTOR = 1.5
+
+# Number of slowest reaches listed in the report
+SLOWEST = 10
+
+# Status of phase one records of valid reaches in triage mode, which are
+# finished again once geoBAM has run
+TRIAGED = "triaged"
+
+class Timer:
+    """Class that records wall and CPU time per stage for each reach and
+    writes one JSON line per reach when it finishes.
+
+    CPU time is measured for the calling thread so stages run on reader and
+    writer threads are timed separately. A stage timed over several reaches
+    (e.g. a batch) is shared evenly between them. When no path is given the
+    timer is off and stage returns a shared no-op context.
+
+    Attributes
+    ----------
+        path: Path
+            Path to JSON lines file or None if timing is off
+        rank: int
+            Rank recorded with each reach
+        stages: dict
+            Reach keys and dictionary values of stage keys and [wall, cpu]
+            values for reaches not yet finished
+        starts: dict
+            Reach keys and epoch seconds their first stage started
+        file: file
+            JSON lines file or None
+    """
+
+    SUFFIX = "_timing.jsonl"
+
+    def __init__(self, path=None, rank=0):
+        self.path = path
+        self.rank = rank
+        self.stages = {}
+        self.starts = {}
+        self.file = open(path, 'w') if path is not None else None
+
+    def stage(self, name, *reaches):
+        """Returns context manager that times stage name for reaches."""
+
+        if self.path is None:
+            return NULL_STAGE
+        return Stage(self, name, reaches)
+
+    def add(self, name, reaches, wall, cpu, start):
+        """Add wall and CPU seconds shared evenly over reaches to stage name."""
+
+        for reach in reaches:
+            self.starts.setdefault(reach, start)
+            times = self.stages.setdefault(reach, {}).setdefault(name, [0.0, 0.0])
+            times[0] += wall / len(reaches)
+            times[1] += cpu / len(reaches)
+
+    def finish(self, reach, status):
+        """Write stage times, status and peak RSS for reach."""
+
+        if self.path is None:
+            return
+        stages = self.stages.pop(reach, {})
+        record = {
+            "reach" : reach,
+            "rank" : self.rank,
+            "status" : status,
+            "start" : self.starts.pop(reach, time()),
+            "end" : time(),
+            "wall" : { name : times[0] for name, times in stages.items() },
+            "cpu" : { name : times[1] for name, times in stages.items() },
+            "peak_rss_kib" : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        }
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        """Close the JSON lines file."""
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class Stage:
+    """Class that represents one timed stage entered as a context manager.
+
+    Attributes
+    ----------
+        timer: Timer
+            Timer to add stage times to
+        name: str
+            Name of stage
+        reaches: tuple
+            Reaches the stage is timed for
+    """
+
+    def __init__(self, timer, name, reaches):
+        self.timer = timer
+        self.name = name
+        self.reaches = reaches
+
+    def __enter__(self):
+        self.start = time()
+        self.wall = perf_counter()
+        self.cpu = thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, self.reaches, perf_counter() - self.wall,
+            thread_time() - self.cpu, self.start)
+        return False
+
+def read_timing(paths):
+    """Returns list of reach timing records from JSON lines files ignoring a
+    partial last line."""
+
+    records = []
+    for path in paths:
+        if not Path(path).exists():
+            continue
+        with open(path) as file:
+            records.extend(json.loads(line) for line in file if line.endswith("\n"))
+    return records
+
+def aggregate_timing(records):
+    """Aggregate reach timing records into a report dictionary.
+
+    The report has wall time percentiles and CPU totals per stage, reaches
+    per second for each rank, ranks that took more than STRAGGLER_FACTOR
+    times the median rank and the SLOWEST reaches by total wall time. 
+    TRIAGED records add to stage times and rank seconds but are not counted
+    as reaches as the same reach is finished again after geoBAM.
+    """
+
+    stages = {}
+    for record in records:
+        for name, wall in record["wall"].items():
+            stages.setdefault(name, ([], []))[0].append(wall)
+            stages[name][1].append(record["cpu"][name])
+    stage_report = {}
+    for name, (walls, cpus) in stages.items():
+        p50, p90, p99 = np.percentile(walls, [50, 90, 99])
+        stage_report[name] = { "count" : len(walls), "p50" : p50, "p90" : p90,
+            "p99" : p99, "max" : max(walls), "wall_total" : sum(walls),
+            "cpu_total" : sum(cpus) }
+
+    rank_records = {}
+    for record in records:
+        rank_records.setdefault(record["rank"], []).append(record)
+    rank_report = {}
+    for rank, rank_list in sorted(rank_records.items()):
+        seconds = max(r["end"] for r in rank_list) - min(r["start"] for r in rank_list)
+        reaches = sum(r["status"] != TRIAGED for r in rank_list)
+        rank_report[rank] = { "reaches" : reaches, "seconds" : seconds,
+            "reaches_per_second" : reaches / seconds if seconds else 0.0,
+            "peak_rss_kib" : max(r["peak_rss_kib"] for r in rank_list) }
+
+    median = np.median([ r["seconds"] for r in rank_report.values() ]) \
+        if rank_report else 0.0
+    straggler_ranks = [ rank for rank, r in rank_report.items()
+        if r["seconds"] > STRAGGLER_FACTOR * median ]
+    finished = [ r for r in records if r["status"] != TRIAGED ]
+    slowest = sorted(finished, key=lambda r: sum(r["wall"].values()), reverse=True)
+    slowest_reaches = [ { "reach" : r["reach"], "rank" : r["rank"],
+        "status" : r["status"], "wall" : sum(r["wall"].values()) }
+        for r in slowest[:SLOWEST] ]
+
+    return { "reaches" : len(finished), "stages" : stage_report,
+        "ranks" : rank_report, "straggler_ranks" : straggler_ranks,
+        "slowest_reaches" : slowest_reaches }
+
+def write_report(report, path):
+    """Write timing report dictionary to a JSON file."""
+
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2, default=float)
@@ -1,4 +1,43 @@
 sos_config = {
     "logging_dir" : "",
-    "data_dir" : ""
-}
\ No newline at end of file
+    "data_dir" : "",
+    "manifest" : True,         # Index reaches in a persistent manifest
+    "manifest_path" : "",      # SQLite reach manifest (defaults to logging_dir)
+    "manifest_refresh" : False, # Rescan data_dir even if it is unchanged
+    "incremental" : False,     # Only append reaches whose SWOT changed since last run
+    "incremental_check" : "mtime", # "mtime" size and mtime or "checksum" SWOT contents
+    "backend" : "mpi",         # "mpi" ranks or "pool" of local processes
+    "workers" : 0,             # Pool worker processes (0 uses every CPU)
+    "scheduler" : "static",    # "static" slices or "dynamic" work queue
+    "chunk_size" : 1,          # Reaches handed out per request (dynamic and pool)
+    "partition" : "even",      # "even" slices or "cost" balanced (static)
+    "cost_model" : "dims",     # "dims" nx * nt or "size" SWOT file bytes
+    "triage" : False,          # Write invalid reaches first, then spread valid ones
+    "batch_size" : 1,          # Valid reaches per geoBAM R call
+    "rank_batch_size" : {},    # Rank keys and batch size values overriding batch_size
+    "pipeline" : False,        # Overlap NetCDF reads and writes with geoBAM
+    "read_depth" : 4,          # Validated reaches queued ahead of geoBAM
+    "write_depth" : 4,         # Prior results queued for writing
+    "checkpoint" : True,       # Journal completed reaches per rank
+    "checkpoint_dir" : "",     # Journal directory (defaults to logging_dir)
+    "resume" : False,          # Skip reaches appended by a previous run
+    "cache_path" : "",         # SQLite prior cache on node-local disk ("" disables)
+    "cache_max_bytes" : 2**30, # Cache size above which old priors are evicted
+    "geobam_version" : "",     # geoBAMr version for cache keys ("" asks R)
+    "single_open" : False,     # Open each SoS once for both reading and writing
+    "staging" : False,         # Copy each rank's files to node-local scratch
+    "staging_dir" : "",        # Scratch directory (defaults to $TMPDIR)
+    "staging_chunk" : 100,     # Reaches staged to scratch and copied back at once
+    "compact_priors" : False,  # Write reach priors as one vector variable
+    "reader" : "masked",       # "masked" arrays or "buffered" mask-free reads (faster reads, same memory in float64)
+    "float32" : False,         # Validate and run geoBAM on float32 observations (halves memory)
+    "output_mode" : "per_reach", # "per_reach" SoS files or "consolidated" NetCDF
+    "output_dir" : "",         # Consolidated NetCDF directory (defaults to logging_dir)
+    "flush_size" : 1000,       # Reaches buffered per consolidated write
+    "timing" : False,          # Write per-reach stage timings and a report
+    "timing_dir" : "",         # Timing directory (defaults to logging_dir)
+    "supervise" : False,       # Run geoBAM in a worker process with per-reach budgets
+    "reach_timeout" : 600,     # Seconds a supervised reach may run (0 for no limit)
+    "reach_memory" : 0,        # Supervised worker resident bytes (0 for no limit)
+    "worker_startup" : 300     # Seconds a supervised worker may take to start R (0 for no limit)
+}
@@ -0,0 +1,94 @@
+# Standard imports
+import argparse
+from time import perf_counter
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from app.Input import check_observations
+
+"""Benchmark of check_observations on large synthetic nx x nt arrays.
+
+Compares the vectorized check_observations with the previous per-axis 
+np.apply_along_axis and np.delete implementation. Run from the repository 
+root:
+
+    python -m benchmarks.bench_check_observations --nx 500 --nt 2000
+"""
+
+def legacy_is_valid(obs):
+    """Previous is_valid implementation using np.apply_along_axis."""
+
+    time = np.apply_along_axis(lambda obs: np.count_nonzero(~np.isnan(obs)),
+        axis = 0, arr = obs)
+    nodes = np.apply_along_axis(lambda obs: np.count_nonzero(~np.isnan(obs)),
+        axis = 1, arr = obs)
+    if time[time >= 5].size >= 5 and nodes[nodes >= 5].size >= 5:
+        return { "valid" : True, "invalid_nodes" : np.nonzero(nodes < 5),
+            "invalid_times" : np.nonzero(time < 5) }
+    return { "valid" : False }
+
+def legacy_check_observations(width, d_x_area, slope2, qhat):
+    """Previous check_observations implementation using np.delete."""
+
+    qhat[qhat < 0] = np.NaN
+    slope2[slope2 < 0] = np.NaN
+    width[width < 0] = np.NaN
+    if np.isnan(qhat[0]):
+        return {}
+    dicts = [ legacy_is_valid(obs) for obs in (slope2, width, d_x_area) ]
+    if not all(d["valid"] for d in dicts):
+        return {}
+    nodes = np.unique(np.concatenate([ d["invalid_nodes"][0] for d in dicts ]))
+    times = np.unique(np.concatenate([ d["invalid_times"][0] for d in dicts ]))
+    slope2 = np.delete(slope2, nodes, axis = 0)
+    width = np.delete(width, nodes, axis = 0)
+    d_x_area = np.delete(d_x_area, nodes, axis = 0)
+    slope2 = np.delete(slope2, times, axis = 1)
+    width = np.delete(width, times, axis = 1)
+    d_x_area = np.delete(d_x_area, times, axis = 1)
+    return { "slope2" : slope2, "width" : width, "d_x_area" : d_x_area,
+        "Qhat" : qhat, "invalid_indexes" : nodes }
+
+def create_observations(nx, nt, nan_fraction, seed=42):
+    """Create synthetic width, d_x_area, slope2 and Qhat arrays."""
+
+    rng = np.random.default_rng(seed)
+    obs = []
+    for _ in range(3):
+        array = rng.uniform(0, 100, (nx, nt))
+        array[rng.random((nx, nt)) < nan_fraction] = np.nan
+        obs.append(array)
+    return obs[0], obs[1], obs[2], np.repeat(50.0, nx)
+
+def time_function(func, nx, nt, nan_fraction, repeats):
+    """Returns mean seconds per call of func on fresh synthetic arrays."""
+
+    total = 0.0
+    for i in range(repeats):
+        obs = create_observations(nx, nt, nan_fraction, seed=i)
+        start = perf_counter()
+        func(*obs)
+        total += perf_counter() - start
+    return total / repeats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nx", type=int, default=500)
+    parser.add_argument("--nt", type=int, default=2000)
+    parser.add_argument("--nan-fraction", type=float, default=0.3)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    legacy = time_function(legacy_check_observations, args.nx, args.nt,
+        args.nan_fraction, args.repeats)
+    vectorized = time_function(check_observations, args.nx, args.nt,
+        args.nan_fraction, args.repeats)
+    print(f"nx={args.nx} nt={args.nt} nan_fraction={args.nan_fraction}")
+    print(f"legacy:     {legacy * 1e3:.2f} ms/reach")
+    print(f"vectorized: {vectorized * 1e3:.2f} ms/reach")
+    print(f"speedup:    {legacy / vectorized:.1f}x")
+
+if __name__ == "__main__":
+    main()
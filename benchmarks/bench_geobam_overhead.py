@@ -0,0 +1,82 @@
+# Standard imports
+import argparse
+from time import perf_counter
+
+# Third party imports
+import numpy as np
+import rpy2.robjects as robjects
+from rpy2.robjects import numpy2ri
+
+# Local imports
+from app.GeoBAM import get_engine, to_r_matrix, to_r_vector
+
+"""Microbenchmark of per-reach Python to R overhead for geoBAM input.
+
+Compares the previous per-reach numpy2ri activate/matrix/deactivate 
+conversion with the persistent GeoBAMEngine buffer copies. Run from the 
+repository root:
+
+    python -m benchmarks.bench_geobam_overhead --nx 50 --nt 100 --reaches 1000
+"""
+
+def create_input(nx, nt):
+    """Create a dictionary of synthetic formatted input data."""
+
+    rng = np.random.default_rng(42)
+    return {
+        "width" : rng.uniform(20, 200, (nx, nt)),
+        "slope2" : rng.uniform(1e-5, 1e-3, (nx, nt)),
+        "d_x_area" : rng.uniform(-100, 100, (nx, nt)),
+        "Qhat" : np.repeat(50.0, nx)
+    }
+
+def convert_before(input_data):
+    """Per-reach conversion as previously done in GeoBAM.bam_data."""
+
+    numpy2ri.activate()
+    nrows_node = input_data["width"].shape[0]
+    nrows_reach = input_data["slope2"].shape[0]
+    width = robjects.r['matrix'](input_data["width"], nrow = nrows_node)
+    slope = robjects.r['matrix'](input_data["slope2"], nrow = nrows_reach)
+    d_x_a = robjects.r['matrix'](input_data["d_x_area"], nrow = nrows_node)
+    qhat = robjects.FloatVector(input_data["Qhat"])
+    numpy2ri.deactivate()
+    return width, slope, d_x_a, qhat
+
+def convert_after(input_data):
+    """Per-reach conversion using buffer copies."""
+
+    return (to_r_matrix(input_data["width"]), to_r_matrix(input_data["slope2"]),
+        to_r_matrix(input_data["d_x_area"]), to_r_vector(input_data["Qhat"]))
+
+def time_per_reach(func, input_data, reaches):
+    """Returns mean seconds per call of func over reaches calls."""
+
+    start = perf_counter()
+    for _ in range(reaches):
+        func(input_data)
+    return (perf_counter() - start) / reaches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nx", type=int, default=50)
+    parser.add_argument("--nt", type=int, default=100)
+    parser.add_argument("--reaches", type=int, default=1000)
+    parser.add_argument("--full", action="store_true",
+        help="also time geoBAMr::bam_data through the engine")
+    args = parser.parse_args()
+
+    input_data = create_input(args.nx, args.nt)
+    before = time_per_reach(convert_before, input_data, args.reaches)
+    after = time_per_reach(convert_after, input_data, args.reaches)
+    print(f"nx={args.nx} nt={args.nt} reaches={args.reaches}")
+    print(f"before: {before * 1e6:.1f} us/reach")
+    print(f"after:  {after * 1e6:.1f} us/reach")
+
+    if args.full:
+        engine = get_engine()
+        full = time_per_reach(engine.bam_data, input_data, args.reaches)
+        print(f"bam_data: {full * 1e6:.1f} us/reach")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Standard imports
+import argparse
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from app.Output import Output, create_prior_dict
+
+"""Benchmark of write time and SoS file size for the per-variable and 
+compact prior layouts.
+
+Writes synthetic priors to copies of the test SoS file. Run from the 
+repository root:
+
+    python -m benchmarks.bench_prior_layout --reaches 500
+"""
+
+def create_priors(nx):
+    """Create a synthetic prior dictionary for a reach with nx nodes."""
+
+    prior_dict = create_prior_dict()
+    for i, name in enumerate(prior_dict):
+        prior_dict[name] = float(i)
+    prior_dict["river_type"] = np.full(nx, 7.0)
+    return prior_dict
+
+def write(sos_dir, reaches, nx, compact):
+    """Write priors to reaches copies of the test SoS.
+
+    Returns seconds per reach and mean file size in bytes.
+    """
+
+    sos_files = [ sos_dir / f"{i}_1_SOS.nc" for i in range(reaches) ]
+    for sos_file in sos_files:
+        copyfile("tests/test_data/001_1_SOS.nc", sos_file)
+
+    start = perf_counter()
+    for sos_file in sos_files:
+        output = Output(sos_file, None, [], create_priors(nx), compact=compact)
+        output.append_priors()
+    elapsed = perf_counter() - start
+    size = sum(sos_file.stat().st_size for sos_file in sos_files)
+    return elapsed / reaches, size / reaches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reaches", type=int, default=500)
+    parser.add_argument("--nx", type=int, default=50)
+    args = parser.parse_args()
+
+    for compact in (False, True):
+        with TemporaryDirectory() as sos_dir:
+            seconds, size = write(Path(sos_dir), args.reaches, args.nx, compact)
+        layout = "compact" if compact else "variables"
+        print(f"{layout}: {seconds * 1e3:.2f} ms/reach, {size / 1024:.1f} KiB/file")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Standard imports
+import argparse
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import tracemalloc
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from app.Input import Input, check_observations
+from app.Reader import Reader
+from benchmarks.synthetic import create_reach
+
+"""Benchmark of reading and validating a wide reach with each reader.
+
+    masked    masked arrays filled with NaN (the default)
+    buffered  auto-masking off with fill values set to NaN in place
+    float32   buffered reads converted into reusable float32 buffers
+
+Each reader reads and validates the same synthetic reach --repeats times and
+reports the median read and validation times and the peak memory allocated
+for one reach (traced with tracemalloc). Run from the repository root:
+
+    python -m benchmarks.bench_reader --nx 2000 --nt 1000
+"""
+
+READERS = {
+    "masked" : lambda: None,
+    "buffered" : lambda: Reader(),
+    "float32" : lambda: Reader(np.float32)
+}
+
+def time_reader(swot, sos, reader, repeats):
+    """Read and validate a reach repeats times.
+
+    Returns median read seconds, median validation seconds and peak traced
+    bytes of the last repeat.
+    """
+
+    read_seconds, validate_seconds = [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = perf_counter()
+        input = Input(swot, sos, reader=reader)
+        observations = input.read_data()
+        read_seconds.append(perf_counter() - start)
+        start = perf_counter()
+        input.data = check_observations(*observations)
+        validate_seconds.append(perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return median(read_seconds), median(validate_seconds), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nx", type=int, default=2000)
+    parser.add_argument("--nt", type=int, default=1000)
+    parser.add_argument("--nan-fraction", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as data_dir:
+        create_reach(data_dir, "wide_1", args.nx, args.nt, args.nan_fraction,
+            rng=np.random.default_rng(0))
+        swot = Path(data_dir) / "wide_1_SWOT.nc"
+        sos = Path(data_dir) / "wide_1_SOS.nc"
+        for name, create_reader in READERS.items():
+            read, validate, peak = time_reader(swot, sos, create_reader(), args.repeats)
+            print(f"{name}: read {read * 1e3:.1f} ms, validate {validate * 1e3:.1f} ms, "
+                f"peak {peak / 2**20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Standard imports
+import argparse
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+
+# Local imports
+from app.Input import Input
+from app.Output import Output, create_prior_dict
+
+"""Benchmark of SoS dataset opens and time per reach with and without 
+single_open.
+
+Copies the test reach into many small SWOT/SoS file pairs, then reads, 
+validates and writes priors for each reach without running geoBAM (priors 
+are synthetic). Run from the repository root:
+
+    python -m benchmarks.bench_single_open --reaches 500 --data-dir /scratch/bench
+"""
+
+class CountingDataset(nc.Dataset):
+    """netCDF4.Dataset that counts opens and closes."""
+
+    opens = 0
+    closes = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingDataset.opens += 1
+
+    def close(self):
+        CountingDataset.closes += 1
+        super().close()
+
+def create_reaches(data_dir, reaches):
+    """Copy the test reach into data_dir under reaches identifiers."""
+
+    for i in range(reaches):
+        copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{i}_1_SWOT.nc")
+        copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{i}_1_SOS.nc")
+
+def append(data_dir, reaches, single_open):
+    """Read, validate and write synthetic priors for each reach.
+    
+    Returns seconds per reach, opens and closes per reach.
+    """
+
+    CountingDataset.opens = 0
+    CountingDataset.closes = 0
+    start = perf_counter()
+    for i in range(reaches):
+        input = Input(data_dir / f"{i}_1_SWOT.nc", data_dir / f"{i}_1_SOS.nc",
+            single_open)
+        input.format_data()
+        prior_dict = create_prior_dict()
+        prior_dict["river_type"] = np.full(input.data["width"].shape[0], 7.0)
+        output = Output(input.sos_path, None, [], prior_dict, input.sos_dataset)
+        output.append_priors()
+    elapsed = perf_counter() - start
+    return (elapsed / reaches, CountingDataset.opens / reaches,
+        CountingDataset.closes / reaches)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reaches", type=int, default=500)
+    parser.add_argument("--data-dir", type=Path, default=None,
+        help="directory on the file system to test (default: temporary)")
+    args = parser.parse_args()
+
+    nc.Dataset = CountingDataset
+    for single_open in (False, True):
+        with TemporaryDirectory(dir=args.data_dir) as data_dir:
+            data_dir = Path(data_dir)
+            create_reaches(data_dir, args.reaches)
+            seconds, opens, closes = append(data_dir, args.reaches, single_open)
+        print(f"single_open={single_open}: {seconds * 1e3:.2f} ms/reach, "
+            f"{opens:.1f} opens/reach, {closes:.1f} closes/reach")
+
+if __name__ == "__main__":
+    main()
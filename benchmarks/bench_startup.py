@@ -0,0 +1,81 @@
+# Standard imports
+import argparse
+from statistics import median
+import subprocess
+import sys
+from time import perf_counter
+
+"""Benchmark of process startup for the CLI and for a validation-only run.
+
+Each case is timed in a fresh Python process:
+
+    cli       imports run_append as the CLI does before reading any data
+    validate  reads and validates the test reach and writes fill values for
+              it as an invalid reach, which never needs geoBAM
+
+With --eager each case first imports rpy2.robjects and geoBAMr the way
+app.GeoBAM did at import time before R startup was deferred. Each case also
+reports whether R was started. Run from the repository root:
+
+    python -m benchmarks.bench_startup --repeats 5
+"""
+
+EAGER = """
+import rpy2.robjects
+from rpy2.robjects.packages import importr
+importr("geoBAMr")
+"""
+
+CASES = {
+    "cli" : """
+import run_append
+""",
+    "validate" : """
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from app.Input import Input
+from app.Output import Output
+with TemporaryDirectory() as data_dir:
+    sos = Path(data_dir) / "001_1_SOS.nc"
+    copyfile("tests/test_data/001_1_SOS.nc", sos)
+    input = Input(Path("tests/test_data/001_1_SWOT.nc"), sos)
+    input.format_data()
+    Output(sos, None, []).append_priors()
+"""
+}
+
+REPORT = """
+print("rpy2.robjects" in sys.modules)
+"""
+
+def time_case(code, repeats):
+    """Run code in fresh processes.
+
+    Returns median seconds and whether R was started.
+    """
+
+    seconds = []
+    for _ in range(repeats):
+        start = perf_counter()
+        result = subprocess.run([sys.executable, "-c", "import sys\n" + code + REPORT],
+            check=True, capture_output=True, text=True)
+        seconds.append(perf_counter() - start)
+    return median(seconds), result.stdout.strip().splitlines()[-1] == "True"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--eager", action="store_true",
+        help="import rpy2 and geoBAMr first as before deferred startup")
+    args = parser.parse_args()
+
+    for name, code in CASES.items():
+        if args.eager:
+            code = EAGER + code
+        seconds, r_started = time_case(code, args.repeats)
+        print(f"{name}: {seconds * 1e3:.0f} ms, R started: {r_started}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Standard imports
+import argparse
+import logging
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep
+
+# Third party imports
+import numpy as np
+
+# Local imports
+import app.AppendSOS
+import app.Output
+from app.AppendSOS import AppendSOS
+from app.Output import PRIOR_VARIABLES, insert_invalid
+from app.Pipeline import Pipeline
+from app.Reader import Reader
+from app.Timing import Timer, aggregate_timing, read_timing
+from benchmarks.synthetic import add_arguments, create_from_arguments
+
+"""End-to-end throughput benchmark of read, validate, geoBAM and write.
+
+Generates synthetic reaches (see benchmarks.synthetic) and appends priors to
+all of them with AppendSOS, timing every stage. geoBAM is stubbed by default
+so the benchmark measures this program rather than R. The stub returns
+river type 7 for every valid node after --stub-seconds. Use --geobam real to
+run geoBAMr. Reports reaches/sec, per-stage wall time and peak RSS. Run from
+the repository root:
+
+    python -m benchmarks.bench_throughput --reaches 5000 --batch-size 10
+"""
+
+class StubGeoBAM:
+    """Stand-in for app.GeoBAM.GeoBAM whose priors are its input data."""
+
+    seconds = 0.0
+
+    def __init__(self, input_data):
+        self.input_data = input_data
+
+    def bam_data(self):
+        return self.input_data
+
+    def bam_priors(self, geobam_data):
+        sleep(self.seconds)
+        return geobam_data
+
+class StubEngine:
+    """Stand-in for app.GeoBAM.GeoBAMEngine batch runs."""
+
+    def bam_priors_batch(self, input_list):
+        sleep(StubGeoBAM.seconds * len(input_list))
+        return input_list
+
+def stub_extract(prior_dict, priors, invalid_indexes):
+    """Stand-in for app.Output.extract_priors on stub priors."""
+
+    valid_nodes = priors["width"].shape[0]
+    prior_dict["river_type"] = insert_invalid(np.full(valid_nodes, 7.0), invalid_indexes)
+    for name, _, _, _ in PRIOR_VARIABLES:
+        prior_dict[name] = 1.0
+
+def stub_geobam(seconds):
+    """Replace geoBAM with stubs taking seconds per reach."""
+
+    StubGeoBAM.seconds = seconds
+    app.AppendSOS.GeoBAM = StubGeoBAM
+    app.AppendSOS.get_engine = StubEngine
+    app.Output.extract_priors = stub_extract
+
+def run(data_dir, reach_list, timing_path, args):
+    """Append priors for reach_list in data_dir timing each stage.
+
+    Returns seconds taken.
+    """
+
+    logger = logging.getLogger("bench_throughput")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    timer = Timer(timing_path)
+    reader = None
+    if args.reader == "buffered" or args.float32:
+        reader = Reader(np.float32 if args.float32 else np.float64)
+    append_sos = AppendSOS(data_dir, logger, reach_list, args.batch_size,
+        single_open=args.single_open, compact=args.compact, timer=timer,
+        reader=reader)
+    start = perf_counter()
+    if args.pipeline:
+        Pipeline(append_sos).run(reach_list)
+    else:
+        append_sos.append()
+    elapsed = perf_counter() - start
+    timer.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--geobam", choices=("stub", "real"), default="stub")
+    parser.add_argument("--stub-seconds", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--pipeline", action="store_true")
+    parser.add_argument("--single-open", action="store_true")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--reader", choices=("masked", "buffered"), default="masked")
+    parser.add_argument("--float32", action="store_true")
+    parser.add_argument("--data-dir", type=Path, default=None,
+        help="directory on the file system to test (default: temporary)")
+    args = parser.parse_args()
+
+    if args.geobam == "stub":
+        stub_geobam(args.stub_seconds)
+
+    with TemporaryDirectory(dir=args.data_dir) as data_dir:
+        data_dir = Path(data_dir)
+        reach_list = create_from_arguments(data_dir, args)
+        timing_path = data_dir / f"0{Timer.SUFFIX}"
+        elapsed = run(data_dir, reach_list, timing_path, args)
+        report = aggregate_timing(read_timing([timing_path]))
+
+    statuses = [ reach["status"] for reach in report["slowest_reaches"] ]
+    print(f"{len(reach_list)} reaches in {elapsed:.2f} s: "
+        f"{len(reach_list) / elapsed:.1f} reaches/sec, "
+        f"peak RSS {report['ranks'][0]['peak_rss_kib'] / 1024:.0f} MiB")
+    print(f"{'stage':<12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'total s':>10}{'share':>8}")
+    total = sum(stage["wall_total"] for stage in report["stages"].values())
+    for name, stage in report["stages"].items():
+        print(f"{name:<12}{stage['p50'] * 1e3:>10.3f}{stage['p90'] * 1e3:>10.3f}"
+            f"{stage['p99'] * 1e3:>10.3f}{stage['wall_total']:>10.2f}"
+            f"{stage['wall_total'] / total:>8.1%}")
+    print(f"slowest reach: {report['slowest_reaches'][0]['wall'] * 1e3:.1f} ms "
+        f"({statuses[0]})")
+
+if __name__ == "__main__":
+    main()
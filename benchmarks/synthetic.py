@@ -0,0 +1,127 @@
+# Standard imports
+import argparse
+from pathlib import Path
+
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+
+"""Synthetic SWOT and SoS file pairs with the layout of tests/test_data.
+
+Each reach gets a <reach>_SWOT.nc with node/{width,d_x_area,slope2,wse} on
+(nx, nt) and reach/{width,d_x_area,slope2,wse} on (nt,), and a <reach>_SOS.nc
+with scalar reach/Qhat and reach/Qsd. A fraction of observations can be
+missing (written as the fill value) or negative, and a fraction of reaches
+can be invalid (Qhat missing). Run from the repository root:
+
+    python -m benchmarks.synthetic --reaches 1000 --nx 20 --nt 10 --data-dir /scratch/reaches
+"""
+
+FILL_VALUE = -9999.0
+
+# Variable long names and units shared by the node and reach groups
+SWOT_VARIABLES = {
+    "width" : ("width", "m"),
+    "d_x_area" : ("change in cross-sectional area", "m^2"),
+    "slope2" : ("enhanced water surface slope with respect to geoid", "m/m"),
+    "wse" : ("water surface elevation with respect to the geoid", "m")
+}
+
+def create_reach(data_dir, reach, nx=5, nt=5, nan_fraction=0.0,
+    negative_fraction=0.0, invalid=False, rng=None):
+    """Write a SWOT and SoS file pair for reach to data_dir."""
+
+    rng = rng if rng is not None else np.random.default_rng()
+
+    # Node observations vary around a per-node mean over time
+    node = {
+        "width" : rng.uniform(20, 200, (nx, 1)) * rng.uniform(0.8, 1.2, (nx, nt)),
+        "d_x_area" : rng.normal(0, 100, (nx, nt)),
+        "slope2" : rng.uniform(1e-4, 1e-2, (nx, 1)) * rng.uniform(0.8, 1.2, (nx, nt)),
+        "wse" : rng.uniform(10, 100, (nx, 1)) + rng.normal(0, 1, (nx, nt))
+    }
+    for name in ("width", "slope2"):
+        node[name][rng.random((nx, nt)) < negative_fraction] *= -1
+    for values in node.values():
+        values[rng.random((nx, nt)) < nan_fraction] = FILL_VALUE
+
+    with nc.Dataset(Path(data_dir) / f"{reach}_SWOT.nc", 'w') as swot:
+        swot.title = f"SWOT data for reach ID: {reach}"
+        swot.createDimension("nx", nx)
+        swot.createDimension("nt", nt)
+        for group_name, dims in (("reach", ("nt",)), ("node", ("nx", "nt"))):
+            group = swot.createGroup(group_name)
+            for name, (long_name, units) in SWOT_VARIABLES.items():
+                var = group.createVariable(name, "f8", dims, fill_value=FILL_VALUE)
+                var.long_name = long_name
+                var.units = units
+                values = node[name]
+                var[:] = values if group_name == "node" else np.where(
+                    (values == FILL_VALUE).all(axis=0), FILL_VALUE,
+                    np.ma.masked_equal(values, FILL_VALUE).mean(axis=0).filled(FILL_VALUE))
+
+    with nc.Dataset(Path(data_dir) / f"{reach}_SOS.nc", 'w') as sos:
+        sos.title = f"SoS of Science data for reach ID: {reach}"
+        reach_grp = sos.createGroup("reach")
+        sos.createGroup("node")
+        qhat = reach_grp.createVariable("Qhat", "f8", fill_value=FILL_VALUE)
+        qhat.long_name = "Mean_Q"
+        qhat.units = "m^3/s"
+        qhat.assignValue(FILL_VALUE if invalid else rng.uniform(5, 5000))
+        qsd = reach_grp.createVariable("Qsd", "f8", fill_value=FILL_VALUE)
+        qsd.long_name = "sd_Q"
+        qsd.units = "m^3/s"
+        qsd.assignValue(FILL_VALUE if invalid else rng.uniform(1, 500))
+
+def create_reaches(data_dir, reaches, nx=5, nt=5, nx_max=None, nan_fraction=0.0,
+    negative_fraction=0.0, invalid_fraction=0.0, seed=0):
+    """Write reaches file pairs to data_dir with nx drawn between nx and
+    nx_max.
+
+    Returns list of reach identifiers.
+    """
+
+    rng = np.random.default_rng(seed)
+    reach_list = [ f"{i:08d}_1" for i in range(reaches) ]
+    for reach in reach_list:
+        reach_nx = int(rng.integers(nx, nx_max + 1)) if nx_max else nx
+        create_reach(data_dir, reach, reach_nx, nt, nan_fraction,
+            negative_fraction, rng.random() < invalid_fraction, rng)
+    return reach_list
+
+def add_arguments(parser):
+    """Add synthetic reach arguments to an argparse parser."""
+
+    parser.add_argument("--reaches", type=int, default=1000)
+    parser.add_argument("--nx", type=int, default=20)
+    parser.add_argument("--nx-max", type=int, default=None,
+        help="draw nx uniformly between --nx and this (default: fixed nx)")
+    parser.add_argument("--nt", type=int, default=10)
+    parser.add_argument("--nan-fraction", type=float, default=0.05)
+    parser.add_argument("--negative-fraction", type=float, default=0.01)
+    parser.add_argument("--invalid-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+
+def create_from_arguments(data_dir, args):
+    """Write reaches to data_dir from parsed add_arguments arguments.
+
+    Returns list of reach identifiers.
+    """
+
+    return create_reaches(data_dir, args.reaches, args.nx, args.nt, args.nx_max,
+        args.nan_fraction, args.negative_fraction, args.invalid_fraction,
+        args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--data-dir", type=Path, required=True)
+    args = parser.parse_args()
+
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    reach_list = create_from_arguments(args.data_dir, args)
+    print(f"Wrote {len(reach_list)} reaches to {args.data_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,484 @@
 # Standard imports
+from concurrent.futures import ProcessPoolExecutor
 import logging
-from os import scandir
+from multiprocessing import get_context
+from os import cpu_count
 from pathlib import Path
-
-# Third party imports
-from mpi4py import MPI
+from queue import Empty
 
 # Local Imports
 from app.config import sos_config
 from app.AppendSOS import AppendSOS
+from app.Checkpoint import Checkpoint, clear_journals, load_completed
+from app.ConsolidatedOutput import ConsolidatedOutput, merge_consolidated
+from app.GeoBAM import geobam_version
+from app.Manifest import Manifest, scan_reaches
+from app.Pipeline import Pipeline
+from app.PriorCache import PriorCache
+from app.Reader import Reader
+from app.Staging import Staging
+from app.Supervisor import Supervisor
+from app.Timing import Timer, aggregate_timing, read_timing, write_report
+from app.Partition import estimate_costs, partition_lpt
 
 """Runs append sos program using data directory argument."""
 
-COMM = MPI.COMM_WORLD
+# Message tags for dynamic scheduling
+REQUEST_TAG = 1
+WORK_TAG = 2
+STOP_TAG = 3
 
 def run(data_dir):
-    """Main method run append method."""
+    """Main method run append method on the configured backend."""
+
+    if sos_config["backend"] == "pool":
+        run_pool(data_dir)
+    else:
+        run_mpi(data_dir)
 
-    rank = COMM.Get_rank()
+def run_mpi(data_dir):
+    """Run append over MPI ranks with rank 0 reporting results."""
+
+    comm = get_comm()
+    rank = comm.Get_rank()
     rank_logger = create_rank_logger(rank)
     main_logger = create_main_logger()
 
+    # Start fresh journals unless resuming a previous run
+    if rank == 0:
+        clear_checkpoints()
+
+    # Hand out reaches on demand or broadcast static slices
+    manifest = open_manifest(data_dir) if rank == 0 else None
+    load_dict = {}
+    if sos_config["triage"]:
+        append_sos, load_dict = run_triage(comm, data_dir, rank_logger, 
+            main_logger, manifest)
+    elif sos_config["scheduler"] == "dynamic" and comm.Get_size() > 1:
+        append_sos = run_dynamic(comm, data_dir, rank_logger, main_logger, manifest)
+    else:
+        append_sos, load_dict = run_static(comm, data_dir, rank_logger, 
+            main_logger, manifest)
+    comm.barrier()
+    
+    # Gather and log results of run
+    results = comm.gather(append_sos.summary(), root = 0)
+    if rank == 0:
+        report_results(main_logger, results, load_dict, manifest)
+
+def run_pool(data_dir):
+    """Run append on a single node with a process pool.
+
+    Each worker process embeds its own R and pulls chunks of reaches from a
+    shared queue until it is empty. Workers take the place of ranks for log,
+    journal, timing and consolidated output files and the results are 
+    reported as for MPI. When triaging, workers first validate chunks from a
+    triage queue and only the valid reaches are queued for geoBAM.
+    """
+
+    main_logger = create_main_logger()
+    clear_checkpoints()
+    manifest = open_manifest(data_dir)
+    reach_list = get_reach_list(data_dir, manifest)
+    workers = sos_config["workers"] or cpu_count()
+
+    # Spawn workers so none inherits an R session from this process
+    context = get_context("spawn")
+    with context.Manager() as manager:
+        queue = manager.Queue()
+        triage_queue, valid_queue = None, None
+        if sos_config["triage"]:
+            triage_queue, valid_queue = manager.Queue(), manager.Queue()
+            put_chunks(triage_queue, reach_list, workers)
+        else:
+            put_chunks(queue, order_by_cost(data_dir, reach_list, manifest), 
+                workers)
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            futures = [ pool.submit(run_worker, data_dir, rank, queue, 
+                dict(sos_config), triage_queue, valid_queue) 
+                for rank in range(workers) ]
+            if sos_config["triage"]:
+                try:
+                    valid_list = collect_valid(valid_queue, futures)
+                except BaseException:
+                    # Stop workers waiting for work so the pool can shut down
+                    put_chunks(queue, [], workers)
+                    raise
+                main_logger.info(f"triage valid: {len(valid_list)} of {len(reach_list)}")
+                put_chunks(queue, order_by_cost(data_dir, valid_list, manifest), 
+                    workers)
+            results = [ future.result() for future in futures ]
+
+    log_reaches(main_logger, { rank : summary.reaches 
+        for rank, summary in enumerate(results) })
+    report_results(main_logger, results, {}, manifest)
+
+def run_worker(data_dir, rank, queue, config, triage_queue=None, 
+    valid_queue=None):
+    """Append chunks of reaches from queue in a pool worker process until a 
+    None chunk is received.
+
+    If a triage_queue is given, chunks from it are triaged first until a None
+    chunk is received and the valid reaches are put on valid_queue.
+    
+    Returns Summary of the worker's results.
+    """
+
+    sos_config.update(config)
+    rank_logger = create_rank_logger(rank)
+    append_sos = create_append_sos(data_dir, rank, rank_logger, [])
+    if triage_queue is not None:
+        valid = []
+        while True:
+            chunk = triage_queue.get()
+            if chunk is None:
+                break
+            append_sos.reach_list.extend(chunk)
+            valid.extend(append_sos.triage(chunk))
+        valid_queue.put(valid)
+    while True:
+        chunk = queue.get()
+        if chunk is None:
+            break
+        append_sos.reach_list.extend(chunk)
+        append_reaches(append_sos, chunk)
+    close_append_sos(append_sos)
+    return append_sos.summary()
+
+def put_chunks(queue, reach_list, workers):
+    """Put chunks of chunk_size reaches on queue followed by a None chunk for
+    each worker."""
+
+    chunk_size = sos_config["chunk_size"]
+    for i in range(0, len(reach_list), chunk_size):
+        queue.put(reach_list[i:i + chunk_size])
+    for _ in range(workers):
+        queue.put(None)
+
+def order_by_cost(data_dir, reach_list, manifest=None):
+    """Returns reach_list with the most expensive reaches first when 
+    balancing by cost so they are handed out first."""
+
+    if sos_config["partition"] != "cost":
+        return reach_list
+    cost_dict = get_costs(data_dir, reach_list, manifest)
+    return sorted(reach_list, key=lambda reach: cost_dict[reach], reverse=True)
+
+def collect_valid(valid_queue, futures):
+    """Wait for the valid reaches triaged by each pool worker.
+
+    Raises the error of a worker that fails before triage is done.
+
+    Returns sorted list of valid reaches.
+    """
+
+    valid_list = []
+    for _ in futures:
+        while True:
+            try:
+                valid_list.extend(valid_queue.get(timeout=1))
+                break
+            except Empty:
+                for future in futures:
+                    if future.done():
+                        future.result()
+    return sorted(valid_list)
+
+def report_results(main_logger, results, load_dict, manifest):
+    """Log, merge and record results from a list of rank Summary objects."""
+
+    log_results(main_logger, results)
+    if load_dict:
+        log_load(main_logger, load_dict, results)
+    if sos_config["output_mode"] == "consolidated":
+        merge_consolidated([ get_consolidated_path(i) for i in range(len(results)) ],
+            get_consolidated_path())
+    if sos_config["incremental"]:
+        record_run(main_logger, manifest, results)
+    if sos_config["timing"]:
+        report = aggregate_timing(read_timing([ get_timing_dir() / 
+            f"{i}{Timer.SUFFIX}" for i in range(len(results)) ]))
+        if sos_config["staging"]:
+            report["staging"] = { rank : summary.staging 
+                for rank, summary in enumerate(results) }
+        write_report(report, get_timing_dir() / "timing_report.json")
+        log_timing(main_logger, report)
+    close_manifest(manifest)
+
+def get_comm():
+    """Returns MPI world communicator importing mpi4py only when needed."""
+
+    from mpi4py import MPI
+    return MPI.COMM_WORLD
+
+def clear_checkpoints():
+    """Remove journals so a run starts fresh unless it resumes."""
+
+    if sos_config["checkpoint"] and not sos_config["resume"]:
+        clear_journals(get_checkpoint_dir())
+
+def run_static(comm, data_dir, rank_logger, main_logger, manifest=None):
+    """Run append on a fixed slice of reaches broadcast from rank 0.
+    
+    Returns AppendSOS object and dictionary of predicted load per rank which 
+    is only populated on rank 0 for cost partitioning.
+    """
+
     # Create a dictionary of ranks assigned to reaches
+    rank = comm.Get_rank()
     reach_dict = {}
+    load_dict = {}
     if rank == 0:
-        reach_dict = get_reach_dict(data_dir)
+        if sos_config["partition"] == "cost":
+            reach_dict, load_dict = get_cost_reach_dict(data_dir, comm.Get_size(),
+                manifest)
+        else:
+            reach_dict = get_reach_dict(data_dir, comm.Get_size(), manifest)
         log_reaches(main_logger, reach_dict)
 
     # Run append for each rank broadcasting reach list to each rank
-    reach_dict = COMM.bcast(reach_dict, root=0)
-    append_sos = AppendSOS(Path(data_dir), rank_logger, reach_dict[rank])
-    append_sos.append()
-    COMM.barrier()
-    
-    # Gather and log results of run
-    results = COMM.gather(append_sos, root = 0)
+    reach_dict = comm.bcast(reach_dict, root=0)
+    append_sos = create_append_sos(data_dir, rank, rank_logger, reach_dict[rank])
+    append_reaches(append_sos, append_sos.reach_list)
+    close_append_sos(append_sos)
+    return append_sos, load_dict
+
+def run_triage(comm, data_dir, rank_logger, main_logger, manifest=None):
+    """Run append in two phases with every rank first validating an even 
+    slice of reaches and writing fill values for the invalid ones without R.
+    The valid reaches are then gathered on rank 0 and spread over the ranks
+    for geoBAM on demand or in static slices.
+
+    Returns AppendSOS object and dictionary of predicted load per rank for
+    the valid reaches which is only populated on rank 0 for cost 
+    partitioning.
+    """
+
+    # Triage even slices of all reaches
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    reach_dict = {}
+    if rank == 0:
+        reach_dict = get_reach_dict(data_dir, size, manifest)
+        log_reaches(main_logger, reach_dict)
+    reach_dict = comm.bcast(reach_dict, root=0)
+    append_sos = create_append_sos(data_dir, rank, rank_logger, reach_dict[rank])
+    valid_lists = comm.gather(append_sos.triage(append_sos.reach_list), root=0)
+
+    # Spread only the valid reaches
+    dynamic = sos_config["scheduler"] == "dynamic" and size > 1
+    valid_dict = {}
+    load_dict = {}
     if rank == 0:
-        log_results(main_logger, results)
+        valid_list = sorted(reach for valid in valid_lists for reach in valid)
+        main_logger.info(f"triage valid: {len(valid_list)} of "
+            f"{sum(len(reaches) for reaches in reach_dict.values())}")
+        if dynamic:
+            valid_dict = distribute_reaches(comm, valid_list, sos_config["chunk_size"])
+        elif sos_config["partition"] == "cost":
+            valid_dict, load_dict = partition_lpt(valid_list, 
+                get_costs(data_dir, valid_list, manifest), size)
+        else:
+            valid_dict = split_reaches(valid_list, size)
+        log_reaches(main_logger, valid_dict)
+    if dynamic:
+        if rank != 0:
+            request_reaches(comm, append_sos)
+    else:
+        valid_dict = comm.bcast(valid_dict, root=0)
+        append_reaches(append_sos, valid_dict[rank])
+    close_append_sos(append_sos)
+    return append_sos, load_dict
 
-def get_reach_dict(data_dir):
-    """Creates a dictionary of rank keys and reach values."""
+def run_dynamic(comm, data_dir, rank_logger, main_logger, manifest=None):
+    """Run append with rank 0 as coordinator handing out chunks of reaches 
+    to worker ranks as they request them."""
 
-    size = COMM.Get_size()
+    rank = comm.Get_rank()
+    append_sos = create_append_sos(data_dir, rank, rank_logger, [])
+    if rank == 0:
+        reach_list = get_reach_list(data_dir, manifest)
+        reach_dict = distribute_reaches(comm, reach_list, sos_config["chunk_size"])
+        log_reaches(main_logger, reach_dict)
+    else:
+        request_reaches(comm, append_sos)
+    close_append_sos(append_sos)
+    return append_sos
 
-    with scandir(data_dir) as entries:
-        reach_list = [ entry.name.split('_')[0] + '_' + entry.name.split('_')[1] for entry in entries ]
+def distribute_reaches(comm, reach_list, chunk_size):
+    """Send chunks of reaches to worker ranks on request until none remain.
+    
+    Returns a dictionary of rank keys and the reaches sent to them.
+    """
+
+    from mpi4py import MPI
+    reach_dict = { i : [] for i in range(1, comm.Get_size()) }
+    status = MPI.Status()
+    next_reach = 0
+    active_workers = comm.Get_size() - 1
+    while active_workers > 0:
+        comm.recv(source=MPI.ANY_SOURCE, tag=REQUEST_TAG, status=status)
+        worker = status.Get_source()
+        if next_reach < len(reach_list):
+            chunk = reach_list[next_reach:next_reach + chunk_size]
+            next_reach += chunk_size
+            reach_dict[worker].extend(chunk)
+            comm.send(chunk, dest=worker, tag=WORK_TAG)
+        else:
+            comm.send([], dest=worker, tag=STOP_TAG)
+            active_workers -= 1
+    return reach_dict
+
+def request_reaches(comm, append_sos):
+    """Request chunks of reaches from rank 0 and append them until told to 
+    stop."""
+
+    from mpi4py import MPI
+    status = MPI.Status()
+    while True:
+        comm.send(None, dest=0, tag=REQUEST_TAG)
+        chunk = comm.recv(source=0, tag=MPI.ANY_TAG, status=status)
+        if status.Get_tag() == STOP_TAG:
+            break
+        append_sos.reach_list.extend(chunk)
+        append_reaches(append_sos, chunk)
+
+def create_append_sos(data_dir, rank, rank_logger, reach_list):
+    """Creates AppendSOS object for a rank from configuration."""
+
+    checkpoint = None
+    if sos_config["checkpoint"]:
+        checkpoint = Checkpoint(get_checkpoint_dir(), rank)
+    cache = None
+    if sos_config["cache_path"]:
+        version = sos_config["geobam_version"] or geobam_version
+        cache = PriorCache(sos_config["cache_path"], sos_config["cache_max_bytes"],
+            version)
+    consolidated = None
+    if sos_config["output_mode"] == "consolidated":
+        consolidated = ConsolidatedOutput(get_consolidated_path(rank),
+            sos_config["flush_size"], sos_config["resume"])
+    timer = None
+    if sos_config["timing"]:
+        timer = Timer(get_timing_dir() / f"{rank}{Timer.SUFFIX}", rank)
+    supervisor = None
+    if sos_config["supervise"]:
+        supervisor = Supervisor(sos_config["reach_timeout"], 
+            sos_config["reach_memory"], startup_timeout=sos_config["worker_startup"])
+    reader = None
+    if sos_config["reader"] == "buffered" or sos_config["float32"]:
+        reader = Reader("float32" if sos_config["float32"] else "float64")
+    staging = None
+    if sos_config["staging"]:
+        staging = Staging(data_dir, sos_config["staging_dir"], rank,
+            sos_config["staging_chunk"])
+    return AppendSOS(Path(data_dir), rank_logger, reach_list, 
+        get_batch_size(rank), checkpoint, sos_config["resume"], cache,
+        sos_config["single_open"], sos_config["compact_priors"], consolidated,
+        timer, supervisor, reader, staging, sos_config["incremental"])
+
+def append_reaches(append_sos, reaches):
+    """Append priors for reaches through the pipeline or directly."""
+
+    if sos_config["pipeline"]:
+        pipeline = Pipeline(append_sos, sos_config["read_depth"], 
+            sos_config["write_depth"])
+        pipeline.run(reaches)
+    else:
+        append_sos.append_reaches(reaches)
+
+def close_append_sos(append_sos):
+    """Close consolidated output, checkpoint journal, cache, timer, 
+    supervised geoBAM worker and scratch directory."""
+
+    append_sos.close_consolidated()
+    append_sos.timer.close()
+    if append_sos.supervisor is not None:
+        append_sos.supervisor.close()
+    if append_sos.checkpoint is not None:
+        append_sos.checkpoint.close()
+    if append_sos.cache is not None:
+        append_sos.cache.close()
+    if append_sos.staging is not None:
+        append_sos.staging.close()
+
+def get_checkpoint_dir():
+    """Returns directory checkpoint journals are kept in."""
+
+    return sos_config["checkpoint_dir"] or sos_config["logging_dir"]
+
+def get_timing_dir():
+    """Returns directory stage timing files and report are kept in."""
+
+    return Path(sos_config["timing_dir"] or sos_config["logging_dir"])
+
+def get_consolidated_path(rank=None):
+    """Returns path to a rank's consolidated NetCDF or the merged NetCDF if no
+    rank is given."""
+
+    output_dir = Path(sos_config["output_dir"] or sos_config["logging_dir"])
+    if rank is None:
+        return output_dir / "priors.nc"
+    return output_dir / f"priors_{rank}.nc"
+
+def get_batch_size(rank):
+    """Returns the number of reaches per geoBAM call for a rank."""
+
+    return sos_config["rank_batch_size"].get(rank, sos_config["batch_size"])
+
+def open_manifest(data_dir):
+    """Returns reach manifest brought up to date with the data directory or
+    None if the manifest is disabled.
+    
+    Incremental runs always use a manifest and restat every file so SWOT 
+    files overwritten in place are noticed.
+    """
+
+    if not sos_config["manifest"] and not sos_config["incremental"]:
+        return None
+    path = sos_config["manifest_path"] \
+        or Path(sos_config["logging_dir"]) / "manifest.sqlite"
+    manifest = Manifest(path, Path(data_dir).resolve())
+    manifest.update(sos_config["manifest_refresh"] or sos_config["incremental"])
+    return manifest
+
+def close_manifest(manifest):
+    """Close reach manifest if there is one."""
+
+    if manifest is not None:
+        manifest.close()
+
+def get_reach_list(data_dir, manifest=None):
+    """Creates a sorted list of reach identifiers with SWOT and SoS files.
+    
+    Reaches are read from the manifest if one is given and otherwise found 
+    by scanning the data directory. Reaches recorded in checkpoint journals 
+    are left out when resuming and reaches whose SWOT is unchanged since 
+    they were last appended are left out of incremental runs.
+    """
+
+    if manifest is not None:
+        reach_list = manifest.reaches()
+    else:
+        reach_list = scan_reaches(data_dir)
+    if sos_config["incremental"]:
+        reach_list = manifest.stale(reach_list, 
+            sos_config["incremental_check"] == "checksum")
+    if sos_config["resume"]:
+        completed = load_completed(get_checkpoint_dir())
+        reach_list = [ reach for reach in reach_list if reach not in completed ]
+    return reach_list
+
+def get_reach_dict(data_dir, size, manifest=None):
+    """Creates a dictionary of rank keys and reach values for size ranks."""
+
+    return split_reaches(get_reach_list(data_dir, manifest), size)
+
+def split_reaches(reach_list, size):
+    """Creates a dictionary of rank keys and even slices of reach_list for 
+    size ranks."""
 
     # Divide list up evenly amongst ranks and handle any overflow
-    reach_list = list(set(reach_list))
     total_reaches = len(reach_list)
     reach_per_rank = total_reaches // size
 
@@ -71,6 +502,25 @@ def get_reach_dict(data_dir):
     
     return reach_dict
 
+def get_cost_reach_dict(data_dir, size, manifest=None):
+    """Creates a dictionary of rank keys and reach values balanced by 
+    estimated geoBAM cost.
+    
+    Returns reach dictionary and dictionary of predicted load per rank.
+    """
+
+    reach_list = get_reach_list(data_dir, manifest)
+    cost_dict = get_costs(data_dir, reach_list, manifest)
+    return partition_lpt(reach_list, cost_dict, size)
+
+def get_costs(data_dir, reach_list, manifest=None):
+    """Returns dictionary of reach keys and estimated cost values from the 
+    manifest or the SWOT files."""
+
+    if manifest is not None:
+        return manifest.costs(reach_list, sos_config["cost_model"])
+    return estimate_costs(Path(data_dir), reach_list, sos_config["cost_model"])
+
 def create_rank_logger(rank):
     """Creates a file logger for each rank to log to."""
 
@@ -128,16 +578,30 @@ def log_reaches(logger, reach_dict):
     logger.info(f"Total reach count: {total_reaches}")
 
 def log_results(logger, results):
-    """Log results of append SoS run."""
+    """Log results of append SoS run from a list of rank Summary objects."""
 
     total_valid_list = []
     total_invalid_list = []
-    for append_sos in results:
-        total_valid_list.extend(append_sos.valid_list)
-        total_invalid_list.extend(append_sos.invalid_list)
+    total_skipped = 0
+    total_failed = 0
+    cache_hits = 0
+    cache_misses = 0
+    reasons = {}
+    for summary in results:
+        total_valid_list.extend(summary.valid_list)
+        total_invalid_list.extend(summary.invalid_list)
+        total_skipped += len(summary.skipped_list)
+        total_failed += len(summary.failed_list)
+        cache_hits += summary.cache_hits
+        cache_misses += summary.cache_misses
+        reasons.update(summary.reasons)
 
     logger.info("total valid: " + str(len(total_valid_list)))
     logger.info("total invalid: " + str(len(total_invalid_list)))
+    logger.info("total skipped: " + str(total_skipped))
+    logger.info("total failed: " + str(total_failed))
+    logger.info("cache hits: " + str(cache_hits))
+    logger.info("cache misses: " + str(cache_misses))
     logger.info('')
     logger.info("valid reaches:")
     logger.info(', '.join(total_valid_list))
@@ -145,6 +609,84 @@ def log_results(logger, results):
     logger.info("invalid reaches:")
     logger.info(', '.join(total_invalid_list))
     logger.info('')
+    if reasons:
+        logger.info("failed reaches:")
+        for reach, reason in reasons.items():
+            logger.info(f"{reach}   {reason}")
+        logger.info('')
+    if any(summary.staging for summary in results):
+        log_staging(logger, results)
+
+def log_staging(logger, results):
+    """Log seconds and bytes each rank copied to and from scratch."""
+
+    logger.info("rank   stage in seconds   stage in MiB   stage out seconds   stage out MiB")
+    for rank, summary in enumerate(results):
+        staging = summary.staging
+        if not staging:
+            continue
+        logger.info(f"{rank}   {staging['in_seconds']:.2f}   "
+            f"{staging['in_bytes'] / 2**20:.1f}   {staging['out_seconds']:.2f}   "
+            f"{staging['out_bytes'] / 2**20:.1f}")
+    total_seconds = sum(summary.staging.get("in_seconds", 0.0) 
+        + summary.staging.get("out_seconds", 0.0) for summary in results)
+    logger.info(f"total staging seconds: {total_seconds:.2f}")
+    logger.info('')
+
+def record_run(logger, manifest, results):
+    """Record reaches appended by this run or journaled by the interrupted 
+    run it resumes in the run record and log how many reaches were unchanged
+    versus recomputed.
+    
+    Reaches are only skipped in incremental runs when journaled so a reach 
+    appended by an earlier campaign is never recorded with its new SWOT.
+    """
+
+    recomputed = []
+    for summary in results:
+        recomputed.extend(summary.valid_list)
+        recomputed.extend(summary.invalid_list)
+    journaled = []
+    if sos_config["resume"]:
+        journaled = list(load_completed(get_checkpoint_dir()))
+    manifest.record_appended(recomputed + journaled)
+    logger.info("incremental unchanged: " + str(manifest.unchanged))
+    logger.info("incremental recomputed: " + str(len(recomputed)))
+    logger.info('')
+
+def log_load(logger, load_dict, results):
+    """Log predicted load next to actual elapsed time for each rank."""
+
+    total_load = sum(load_dict.values())
+    total_elapsed = sum(summary.elapsed for summary in results)
+    logger.info("rank   predicted share   actual share   actual seconds")
+    for rank, summary in enumerate(results):
+        predicted = load_dict[rank] / total_load if total_load else 0.0
+        actual = summary.elapsed / total_elapsed if total_elapsed else 0.0
+        logger.info(f"{rank}   {predicted:.3f}   {actual:.3f}   {summary.elapsed:.2f}")
+    logger.info('')
+
+def log_timing(logger, report):
+    """Log stage percentiles, rank throughput and stragglers from a timing 
+    report."""
+
+    logger.info("stage   count   p50   p90   p99   max   wall total   cpu total")
+    for name, stage in report["stages"].items():
+        logger.info(f"{name}   {stage['count']}   {stage['p50']:.3f}   "
+            f"{stage['p90']:.3f}   {stage['p99']:.3f}   {stage['max']:.3f}   "
+            f"{stage['wall_total']:.2f}   {stage['cpu_total']:.2f}")
+    logger.info('')
+    logger.info("rank   reaches   seconds   reaches/sec   peak RSS KiB")
+    for rank, rank_report in report["ranks"].items():
+        logger.info(f"{rank}   {rank_report['reaches']}   {rank_report['seconds']:.2f}   "
+            f"{rank_report['reaches_per_second']:.3f}   {rank_report['peak_rss_kib']}")
+    logger.info('')
+    logger.info("straggler ranks: " + ', '.join(str(rank) for rank in report["straggler_ranks"]))
+    logger.info("slowest reaches:")
+    for reach in report["slowest_reaches"]:
+        logger.info(f"{reach['reach']}   rank {reach['rank']}   {reach['status']}   "
+            f"{reach['wall']:.3f}")
+    logger.info('')
 
 if __name__ == "__main__":
     run(sos_config["data_dir"])
\ No newline at end of file
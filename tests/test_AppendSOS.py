@@ -0,0 +1,157 @@
+# Standard library imports
+import logging
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+import unittest
+
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+
+# Local imports
+from app.AppendSOS import AppendSOS
+from app.Checkpoint import Checkpoint
+from app.ConsolidatedOutput import ConsolidatedOutput, read_consolidated
+from app.Output import Output, append_state, create_prior_dict
+from app.Staging import Staging
+from app.Supervisor import CRASHED, ERROR, TIMEOUT
+
+class FakeSupervisor:
+    """Stand-in for Supervisor returning a list of results in turn."""
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    def solve(self, input_data):
+        return self.results.pop(0)
+
+class TestAppendSOS(unittest.TestCase):
+    """Tests methods from AppendSOS class."""
+
+    def test_triage(self):
+        """Tests triage writes invalid reaches and returns valid reaches."""
+
+        with TemporaryDirectory() as data_dir:
+            data_dir = Path(data_dir)
+            for reach in ("001_1", "002_1"):
+                copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{reach}_SWOT.nc")
+                copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{reach}_SOS.nc")
+            with nc.Dataset(data_dir / "002_1_SOS.nc", 'a') as dataset:
+                dataset["reach/Qhat"][:] = -9999.0
+
+            append_sos = AppendSOS(data_dir, logging.getLogger("test_triage"),
+                ["001_1", "002_1"])
+            valid = append_sos.triage(append_sos.reach_list)
+
+            self.assertEqual(["001_1"], valid)
+            self.assertEqual([], append_sos.valid_list)
+            self.assertEqual(["002_1"], append_sos.invalid_list)
+            self.assertEqual(Output.NEW, append_state(data_dir / "001_1_SOS.nc"))
+            self.assertEqual(Output.COMPLETE, append_state(data_dir / "002_1_SOS.nc"))
+            with nc.Dataset(data_dir / "002_1_SOS.nc") as dataset:
+                self.assertEqual(0, dataset.valid)
+
+    def test_triage_staging(self):
+        """Tests triage writes invalid reaches on scratch and copies them 
+        back."""
+
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as scratch_dir:
+            data_dir = Path(data_dir)
+            for reach in ("001_1", "002_1"):
+                copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{reach}_SWOT.nc")
+                copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{reach}_SOS.nc")
+            with nc.Dataset(data_dir / "002_1_SOS.nc", 'a') as dataset:
+                dataset["reach/Qhat"][:] = -9999.0
+
+            # Stage one reach at a time counting files on scratch
+            staging = Staging(data_dir, scratch_dir, chunk_size=1)
+            staged = []
+            stage_in = staging.stage_in
+            def count_stage_in(reaches):
+                stage_in(reaches)
+                staged.append(len(list(staging.path.iterdir())))
+            staging.stage_in = count_stage_in
+            append_sos = AppendSOS(data_dir, logging.getLogger("test_triage"),
+                ["001_1", "002_1"], staging=staging)
+            valid = append_sos.triage(append_sos.reach_list)
+
+            self.assertEqual(["001_1"], valid)
+            self.assertEqual([2, 2], staged)
+            self.assertEqual([], list(staging.path.iterdir()))
+            self.assertEqual(Output.NEW, append_state(data_dir / "001_1_SOS.nc"))
+            self.assertEqual(Output.COMPLETE, append_state(data_dir / "002_1_SOS.nc"))
+            self.assertGreater(append_sos.summary().staging["out_bytes"], 0)
+            staging.close()
+
+    def test_supervised_failures(self):
+        """Tests only geoBAM errors are written as invalid and reaches over
+        budget or crashed are left unwritten and unrecorded."""
+
+        reaches = ["001_1", "002_1", "003_1", "004_1"]
+        prior_dict = dict(create_prior_dict(), river_type=np.full(5, 7.0))
+        supervisor = FakeSupervisor([(prior_dict, None, None), 
+            (None, TIMEOUT, "over 1 seconds"), (None, ERROR, "bad input"),
+            (None, CRASHED, "worker exited with code 9")])
+
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as scratch_dir, \
+            TemporaryDirectory() as checkpoint_dir:
+            data_dir = Path(data_dir)
+            for reach in reaches:
+                copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{reach}_SWOT.nc")
+                copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{reach}_SOS.nc")
+
+            staging = Staging(data_dir, scratch_dir, chunk_size=2)
+            checkpoint = Checkpoint(checkpoint_dir, 0)
+            append_sos = AppendSOS(data_dir, logging.getLogger("test_supervised"),
+                reaches, checkpoint=checkpoint, single_open=True, 
+                supervisor=supervisor, staging=staging)
+            append_sos.append()
+            checkpoint.close()
+            staging.close()
+
+            summary = append_sos.summary()
+            self.assertEqual(["001_1"], summary.valid_list)
+            self.assertEqual(["003_1"], summary.invalid_list)
+            self.assertEqual(["002_1", "004_1"], summary.failed_list)
+            self.assertEqual({ "002_1" : TIMEOUT, "003_1" : ERROR, "004_1" : CRASHED },
+                summary.reasons)
+            self.assertEqual({ "001_1", "003_1" }, Checkpoint(checkpoint_dir, 0).completed)
+            self.assertEqual(Output.COMPLETE, append_state(data_dir / "003_1_SOS.nc"))
+            for reach in ("002_1", "004_1"):
+                self.assertEqual(Output.NEW, append_state(data_dir / f"{reach}_SOS.nc"))
+                with nc.Dataset(data_dir / f"{reach}_SOS.nc") as dataset:
+                    self.assertFalse(np.ma.is_masked(dataset["reach/Qhat"][...]))
+
+    def test_resume_consolidated(self):
+        """Tests resuming consolidated output rewrites reaches whose SoS was 
+        appended by an earlier per-reach run and skips journaled reaches."""
+
+        reaches = ["001_1", "002_1", "003_1"]
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as checkpoint_dir:
+            data_dir = Path(data_dir)
+            for reach in reaches:
+                copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{reach}_SWOT.nc")
+                copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{reach}_SOS.nc")
+                with nc.Dataset(data_dir / f"{reach}_SOS.nc", 'a') as dataset:
+                    dataset["reach/Qhat"][:] = -9999.0
+                Output(data_dir / f"{reach}_SOS.nc", None, []).append_priors()
+            checkpoint = Checkpoint(checkpoint_dir, 0)
+            checkpoint.record("003_1")
+
+            consolidated = ConsolidatedOutput(data_dir / "priors_0.nc", resume=True)
+            append_sos = AppendSOS(data_dir, logging.getLogger("test_resume"),
+                reaches, checkpoint=checkpoint, resume=True, 
+                consolidated=consolidated)
+            append_sos.append()
+            append_sos.close_consolidated()
+            checkpoint.close()
+
+            self.assertEqual(["001_1", "002_1"], append_sos.invalid_list)
+            self.assertEqual(["003_1"], append_sos.skipped_list)
+            for reach in ("001_1", "002_1"):
+                self.assertIsNotNone(read_consolidated(data_dir / "priors_0.nc", reach))
+            self.assertEqual(set(reaches), Checkpoint(checkpoint_dir, 0).completed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# Standard library imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+# Local imports
+from app.Checkpoint import Checkpoint, clear_journals, load_completed
+
+class TestCheckpoint(unittest.TestCase):
+    """Tests methods from Checkpoint class."""
+
+    def test_record(self):
+        """Tests recorded reaches are read back by a new Checkpoint."""
+
+        with TemporaryDirectory() as checkpoint_dir:
+            checkpoint = Checkpoint(checkpoint_dir, 3)
+            checkpoint.record("001_1")
+            checkpoint.record("001_2")
+            checkpoint.close()
+
+            self.assertEqual(Path(checkpoint_dir) / "3_checkpoint.txt", checkpoint.path)
+            self.assertEqual({ "001_1", "001_2" }, Checkpoint(checkpoint_dir, 3).completed)
+            self.assertEqual(set(), Checkpoint(checkpoint_dir, 4).completed)
+
+    def test_partial_line(self):
+        """Tests a reach cut off mid-write is not considered completed."""
+
+        with TemporaryDirectory() as checkpoint_dir:
+            with open(Path(checkpoint_dir) / "0_checkpoint.txt", 'w') as journal:
+                journal.write("001_1\n001_")
+            self.assertEqual({ "001_1" }, Checkpoint(checkpoint_dir, 0).completed)
+
+    def test_load_and_clear(self):
+        """Tests loading completed reaches over ranks and clearing journals."""
+
+        with TemporaryDirectory() as checkpoint_dir:
+            for rank, reach in enumerate(["001_1", "001_2", "001_3"]):
+                checkpoint = Checkpoint(checkpoint_dir, rank)
+                checkpoint.record(reach)
+                checkpoint.close()
+
+            self.assertEqual({ "001_1", "001_2", "001_3" }, load_completed(checkpoint_dir))
+            clear_journals(checkpoint_dir)
+            self.assertEqual(set(), load_completed(checkpoint_dir))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# Standard library imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+# Third party imports
+from netCDF4 import Dataset
+import numpy as np
+from numpy.testing import assert_almost_equal
+
+# Local imports
+from app.ConsolidatedOutput import ConsolidatedOutput, merge_consolidated, read_consolidated
+from app.Output import Output, PRIOR_VARIABLES, create_prior_dict
+
+class TestConsolidatedOutput(unittest.TestCase):
+    """Tests methods and functions from ConsolidatedOutput module."""
+
+    def create_output(self, offset, river_type):
+        """Returns valid Output object with priors offset from their index."""
+
+        prior_dict = create_prior_dict()
+        for i, (name, _, _, _) in enumerate(PRIOR_VARIABLES):
+            prior_dict[name] = float(i + offset)
+        prior_dict["river_type"] = np.array(river_type, dtype=float)
+        return Output("unused_SOS.nc", None, [], prior_dict)
+
+    def test_write(self):
+        """Tests buffered writes with ragged river types and invalid reaches."""
+
+        with TemporaryDirectory() as output_dir:
+            path = Path(output_dir) / "priors_0.nc"
+            consolidated = ConsolidatedOutput(path, flush_size=2)
+            self.assertEqual([], consolidated.write("001_1",
+                self.create_output(0, [7, 10, 11])))
+            self.assertEqual(["001_1", "002_1"], consolidated.write("002_1",
+                Output("unused_SOS.nc", None, [])))
+            self.assertEqual([], consolidated.write("003_1",
+                self.create_output(100, [Output.FILL_VALUE, 7])))
+            self.assertEqual(["003_1"], consolidated.close())
+
+            sos = Dataset(path)
+            self.assertEqual(3, sos.dimensions["reach"].size)
+            self.assertEqual(5, sos.dimensions["node"].size)
+            assert_almost_equal([3, 0, 2], sos["node_count"][:])
+            assert_almost_equal([1, 0, 1], sos["valid"][:])
+            sos.close()
+
+            priors = read_consolidated(path, "003_1")
+            self.assertEqual(101.0, priors["upperbound_A0"])
+            assert_almost_equal([Output.FILL_VALUE, 7], priors["river_type"])
+            priors = read_consolidated(path, "002_1")
+            self.assertEqual(Output.FILL_VALUE, priors["river_type"])
+            self.assertEqual(Output.FILL_VALUE, priors["lowerbound_A0"])
+
+    def test_merge(self):
+        """Tests merging per-rank files keeps every reach's priors."""
+
+        with TemporaryDirectory() as output_dir:
+            paths = [ Path(output_dir) / f"priors_{rank}.nc" for rank in range(3) ]
+            for rank, path in enumerate(paths):
+                consolidated = ConsolidatedOutput(path)
+                if rank != 1:
+                    consolidated.write(f"00{rank}_1", self.create_output(rank,
+                        [7] * (rank + 1)))
+                consolidated.close()
+            merged = Path(output_dir) / "priors.nc"
+            merge_consolidated(paths, merged)
+
+            sos = Dataset(merged)
+            self.assertEqual(["000_1", "002_1"], list(sos["reach_id"][:]))
+            sos.close()
+            priors = read_consolidated(merged, "002_1")
+            self.assertEqual(2.0, priors["lowerbound_A0"])
+            assert_almost_equal([7, 7, 7], priors["river_type"])
+
+    def test_resume(self):
+        """Tests resuming appends to an existing consolidated file."""
+
+        with TemporaryDirectory() as output_dir:
+            path = Path(output_dir) / "priors_0.nc"
+            consolidated = ConsolidatedOutput(path)
+            consolidated.write("001_1", self.create_output(0, [7]))
+            consolidated.close()
+            consolidated = ConsolidatedOutput(path, resume=True)
+            consolidated.write("002_1", self.create_output(1, [10, 11]))
+            consolidated.close()
+
+            sos = Dataset(path)
+            self.assertEqual(["001_1", "002_1"], list(sos["reach_id"][:]))
+            sos.close()
+            assert_almost_equal([10, 11], read_consolidated(path, "002_1")["river_type"])
@@ -0,0 +1,41 @@
+# Standard library imports
+from pathlib import Path
+from shutil import copyfile
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import unittest
+
+# Third party imports
+import netCDF4 as nc
+
+class TestGeoBAM(unittest.TestCase):
+    """Tests R startup is deferred until geoBAM is needed."""
+
+    def test_lazy_startup(self):
+        """Tests importing the program and writing an invalid reach does not
+        import rpy2."""
+
+        code = "\n".join([
+            "import logging, sys",
+            "from pathlib import Path",
+            "import run_append",
+            "from app.AppendSOS import AppendSOS",
+            "from app.GeoBAM import engine_started",
+            "append_sos = AppendSOS(Path(sys.argv[1]), logging.getLogger('test'), ['001_1'])",
+            "append_sos.append()",
+            "print(append_sos.invalid_list, engine_started(), "
+                "any(name.startswith('rpy2') for name in sys.modules))"
+        ])
+        with TemporaryDirectory() as data_dir:
+            data_dir = Path(data_dir)
+            copyfile("tests/test_data/001_1_SWOT.nc", data_dir / "001_1_SWOT.nc")
+            copyfile("tests/test_data/001_1_SOS.nc", data_dir / "001_1_SOS.nc")
+            with nc.Dataset(data_dir / "001_1_SOS.nc", 'a') as dataset:
+                dataset["reach/Qhat"][:] = -9999.0
+
+            result = subprocess.run([sys.executable, "-c", code, str(data_dir)], 
+                check=True, capture_output=True, text=True)
+            self.assertEqual("['001_1'] False False", result.stdout.strip())
+            with nc.Dataset(data_dir / "001_1_SOS.nc") as dataset:
+                self.assertEqual(0, dataset.valid)
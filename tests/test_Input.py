@@ -1,12 +1,15 @@
 # Standard library imports
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
 import unittest
 
 # Third party imports
 import numpy as np
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 
 # Local imports
-from app.Input import Input, check_observations
+from app.Input import Input, check_observations, check_observations_batch, validate_batch
 
 class TestInput(unittest.TestCase):
     """Tests methods from Input class."""
@@ -117,5 +120,115 @@ class TestInput(unittest.TestCase):
         assert_allclose(width, input.data["width"])
         self.assertAlmostEqual(12.90476190, input.data["Qhat"][0])
 
+    def test_format_data_single_open(self):
+        """Tests single_open reads the same data and leaves the SoS open."""
+
+        input = Input("tests/test_data/001_1_SWOT.nc", "tests/test_data/001_1_SOS.nc")
+        input.format_data()
+        self.assertIsNone(input.sos_dataset)
+
+        with TemporaryDirectory() as sos_dir:
+            sos_path = Path(sos_dir) / "001_1_SOS.nc"
+            copyfile("tests/test_data/001_1_SOS.nc", sos_path)
+            single = Input("tests/test_data/001_1_SWOT.nc", sos_path, single_open=True)
+            single.format_data()
+            self.assertTrue(single.sos_dataset.isopen())
+            single.sos_dataset.close()
+
+        for key in input.data:
+            assert_array_equal(input.data[key], single.data[key])
+
+    def test_check_observations_parity(self):
+        """Tests check_observations matches the np.apply_along_axis and 
+        np.delete implementation on random data."""
+
+        rng = np.random.default_rng(7)
+        for nan_fraction in (0.0, 0.2, 0.5, 0.8):
+            for _ in range(25):
+                nx, nt = rng.integers(4, 30, size=2)
+                obs = []
+                for _ in range(3):
+                    array = rng.uniform(-0.2, 1, (nx, nt))
+                    array[rng.random((nx, nt)) < nan_fraction] = np.NaN
+                    obs.append(array)
+                qhat = np.repeat(rng.uniform(-0.1, 1), nx)
+
+                expected = reference_check_observations(*[ o.copy() for o in obs ], qhat.copy())
+                actual = check_observations(*obs, qhat)
+
+                self.assertEqual(expected.keys(), actual.keys())
+                for key in expected:
+                    assert_array_equal(expected[key], actual[key])
+
+    def test_check_observations_batch(self):
+        """Tests check_observations_batch matches check_observations for 
+        reaches of different shapes."""
+
+        rng = np.random.default_rng(11)
+        reaches = []
+        for nan_fraction in (0.0, 0.2, 0.5, 0.8):
+            for _ in range(10):
+                nx, nt = rng.integers(4, 30, size=2)
+                obs = []
+                for _ in range(3):
+                    array = rng.uniform(-0.2, 1, (nx, nt))
+                    array[rng.random((nx, nt)) < nan_fraction] = np.NaN
+                    obs.append(array)
+                obs.append(np.repeat(rng.uniform(-0.1, 1), nx))
+                reaches.append(obs)
+
+        expected = [ check_observations(*[ o.copy() for o in obs ]) for obs in reaches ]
+        actual = check_observations_batch(*zip(*reaches))
+
+        self.assertEqual(len(expected), len(actual))
+        self.assertTrue(any(expected))
+        for expected_dict, actual_dict in zip(expected, actual):
+            self.assertEqual(expected_dict.keys(), actual_dict.keys())
+            for key in expected_dict:
+                assert_array_equal(expected_dict[key], actual_dict[key])
+
+    def test_validate_batch(self):
+        """Tests validate_batch sets the same data as format_data."""
+
+        input = Input("tests/test_data/001_1_SWOT.nc", "tests/test_data/001_1_SOS.nc")
+        input.format_data()
+        batch = [ Input("tests/test_data/001_1_SWOT.nc", "tests/test_data/001_1_SOS.nc")
+            for _ in range(2) ]
+        validate_batch(batch, [ batch_input.read_data() for batch_input in batch ])
+        for batch_input in batch:
+            for key in input.data:
+                assert_array_equal(input.data[key], batch_input.data[key])
+
+def reference_check_observations(width, d_x_area, slope2, qhat):
+    """Original per-axis np.apply_along_axis and np.delete implementation of 
+    check_observations."""
+
+    qhat[qhat < 0] = np.NaN
+    slope2[slope2 < 0] = np.NaN
+    width[width < 0] = np.NaN
+    if np.isnan(qhat[0]):
+        return {}
+
+    dicts = []
+    for obs in (slope2, width, d_x_area):
+        count = lambda obs: np.count_nonzero(~np.isnan(obs))
+        time = np.apply_along_axis(count, axis = 0, arr = obs)
+        nodes = np.apply_along_axis(count, axis = 1, arr = obs)
+        if time[time >= 5].size < 5 or nodes[nodes >= 5].size < 5:
+            return {}
+        dicts.append((np.nonzero(nodes < 5)[0], np.nonzero(time < 5)[0]))
+
+    invalid_nodes = np.unique(np.concatenate([ d[0] for d in dicts ]))
+    invalid_times = np.unique(np.concatenate([ d[1] for d in dicts ]))
+    slope2, width, d_x_area = [ np.delete(np.delete(obs, invalid_nodes, axis = 0),
+        invalid_times, axis = 1) for obs in (slope2, width, d_x_area) ]
+    return {
+        "slope2" : slope2,
+        "width" : width,
+        "d_x_area" : d_x_area,
+        "Qhat" : qhat,
+        "invalid_indexes" : invalid_nodes
+    }
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+# Standard library imports
+import os
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+import unittest
+
+# Local imports
+from app.Manifest import Manifest, scan_reaches
+
+class TestManifest(unittest.TestCase):
+    """Tests methods and functions from Manifest module."""
+
+    def create_reach(self, data_dir, reach, sos=True):
+        """Copy test SWOT and optionally SoS files to data_dir for reach."""
+
+        copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{reach}_SWOT.nc")
+        if sos:
+            copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{reach}_SOS.nc")
+
+    def test_scan_reaches(self):
+        """Tests only reaches with both files are found ignoring stray files."""
+
+        with TemporaryDirectory() as data_dir:
+            data_dir = Path(data_dir)
+            self.create_reach(data_dir, "002_1")
+            self.create_reach(data_dir, "001_1")
+            self.create_reach(data_dir, "003_1", sos=False)
+            (data_dir / "notes.txt").touch()
+            (data_dir / "001_1_SOS_append.nc").touch()
+            self.assertEqual(["001_1", "002_1"], scan_reaches(data_dir))
+
+    def test_update(self):
+        """Tests manifest is built once and updated incrementally."""
+
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as index_dir:
+            data_dir = Path(data_dir)
+            path = Path(index_dir) / "manifest.sqlite"
+            self.create_reach(data_dir, "001_1")
+            self.create_reach(data_dir, "002_1", sos=False)
+
+            manifest = Manifest(path, data_dir)
+            self.assertTrue(manifest.update())
+            self.assertEqual(5, manifest.scanned)
+            self.assertEqual(["001_1"], manifest.reaches())
+            self.assertEqual({ "001_1" : 25.0 }, manifest.costs(["001_1"], "dims"))
+            swot_size = (data_dir / "001_1_SWOT.nc").stat().st_size
+            self.assertEqual({ "001_1" : float(swot_size) },
+                manifest.costs(["001_1"], "size"))
+            manifest.close()
+
+            # Unchanged directory is not scanned again
+            manifest = Manifest(path, data_dir)
+            self.assertFalse(manifest.update())
+            self.assertEqual(0, manifest.scanned)
+
+            # Adding a file rescans without reopening unchanged SWOT files
+            copyfile("tests/test_data/001_1_SOS.nc", data_dir / "002_1_SOS.nc")
+            self.assertTrue(manifest.update())
+            self.assertEqual(4, manifest.scanned)
+            self.assertEqual(["001_1", "002_1"], manifest.reaches())
+            manifest.close()
+
+    def test_stale(self):
+        """Tests only reaches with changed SWOT files are stale."""
+
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as index_dir:
+            data_dir = Path(data_dir)
+            path = Path(index_dir) / "manifest.sqlite"
+            self.create_reach(data_dir, "001_1")
+            self.create_reach(data_dir, "002_1")
+            manifest = Manifest(path, data_dir)
+            manifest.update()
+
+            # Nothing has been appended yet
+            self.assertEqual(["001_1", "002_1"], manifest.stale(manifest.reaches()))
+            manifest.record_appended(["001_1", "002_1"])
+            self.assertEqual([], manifest.stale(manifest.reaches()))
+            self.assertEqual(2, manifest.unchanged)
+
+            # Touching a file is only a change when comparing modification times
+            swot = data_dir / "001_1_SWOT.nc"
+            stat = swot.stat()
+            os.utime(swot, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            manifest.update(refresh=True)
+            self.assertEqual(["001_1"], manifest.stale(manifest.reaches()))
+            self.assertEqual(["001_1"], manifest.stale(manifest.reaches(), checksum=True))
+            manifest.record_appended(["001_1"])
+            os.utime(swot, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+            manifest.update(refresh=True)
+            self.assertEqual([], manifest.stale(manifest.reaches(), checksum=True))
+            self.assertEqual([], manifest.stale(manifest.reaches()))
+
+            # Changed contents are stale either way
+            with open(swot, "ab") as file:
+                file.write(b"\0")
+            manifest.update(refresh=True)
+            self.assertEqual(["001_1"], manifest.stale(manifest.reaches(), checksum=True))
+            manifest.close()
@@ -1,5 +1,7 @@
 # Standard library imports
+from pathlib import Path
 from shutil import copyfile
+from tempfile import TemporaryDirectory
 import unittest
 
 # Third party imports
@@ -11,7 +13,7 @@ from numpy.testing import assert_almost_equal
 # Local imports
 from app.Input import Input
 from app.GeoBAM import GeoBAM
-from app.Output import Output, insert_invalid
+from app.Output import Output, append_state, create_prior_dict, insert_invalid, read_priors
 
 class TestOutput(unittest.TestCase):
     """Tests methods from Output class."""
@@ -83,6 +85,101 @@ class TestOutput(unittest.TestCase):
         self.assertTrue(isinstance(sos["reach/sigma_man"], nc._netCDF4.Variable))
         self.assertTrue(isinstance(sos["reach/sigma_amhg"], nc._netCDF4.Variable))
 
+    def test_append_state(self):
+        """Tests append state detection and rewriting a partial append."""
+
+        copyfile("tests/test_data/001_1_SOS.nc", "tests/test_data/001_1_SOS_append.nc")
+        self.assertEqual(Output.NEW, append_state("tests/test_data/001_1_SOS_append.nc"))
+
+        # Simulate a write interrupted before the valid attribute
+        sos = Dataset("tests/test_data/001_1_SOS_append.nc", 'a')
+        sos["reach"].createVariable("lowerbound_A0", "f8", fill_value = Output.FILL_VALUE)
+        sos.close()
+        self.assertEqual(Output.PARTIAL, append_state("tests/test_data/001_1_SOS_append.nc"))
+
+        # Appending again replaces the partial variables
+        output = Output("tests/test_data/001_1_SOS_append.nc", None, [])
+        output.append_priors()
+        self.assertEqual(Output.COMPLETE, append_state("tests/test_data/001_1_SOS_append.nc"))
+        output.append_priors()
+        sos = Dataset("tests/test_data/001_1_SOS_append.nc")
+        self.assertEqual(0, getattr(sos, "valid"))
+        self.assertTrue(np.ma.is_masked(sos["reach/lowerbound_A0"][:]))
+        sos.close()
+
+    def test_compact(self):
+        """Tests compact layout reads back the same priors as variables."""
+
+        prior_dict = create_prior_dict()
+        for i, name in enumerate(prior_dict):
+            prior_dict[name] = float(i)
+        prior_dict["upperbound_A0"] = np.nan
+        prior_dict["river_type"] = np.array([7.0, Output.FILL_VALUE, 11.0, 10.0, 7.0])
+
+        with TemporaryDirectory() as sos_dir:
+            sos_files = [ Path(sos_dir) / "variables.nc", Path(sos_dir) / "compact.nc" ]
+            for sos_file, compact in zip(sos_files, (False, True)):
+                copyfile("tests/test_data/001_1_SOS.nc", sos_file)
+                output = Output(sos_file, None, [], dict(prior_dict), compact=compact)
+                output.append_priors()
+            variables = read_priors(sos_files[0])
+            compact = read_priors(sos_files[1])
+
+            sos = Dataset(sos_files[1])
+            self.assertEqual(40, sos["reach/priors"].size)
+            self.assertEqual("lowerbound_A0", sos["reach/prior_name"][0])
+            self.assertEqual("m^2", sos["reach/prior_units"][0])
+            self.assertNotIn("lowerbound_A0", sos["reach"].variables)
+            sos.close()
+
+        self.assertEqual(variables.keys(), compact.keys())
+        self.assertEqual(Output.FILL_VALUE, compact["upperbound_A0"])
+        for name in variables:
+            assert_almost_equal(variables[name], compact[name])
+
+    def test_rewrite(self):
+        """Tests rewriting a reach valid, invalid then valid with a different
+        number of nodes and layout keeps its original Qhat and Qsd."""
+
+        prior_dict = create_prior_dict()
+        for i, name in enumerate(prior_dict):
+            prior_dict[name] = float(i)
+
+        with TemporaryDirectory() as sos_dir:
+            sos_file = Path(sos_dir) / "001_1_SOS.nc"
+            copyfile("tests/test_data/001_1_SOS.nc", sos_file)
+            with Dataset(sos_file) as sos:
+                qhat, qsd = sos["reach/Qhat"][...], sos["reach/Qsd"][...]
+
+            # Valid with three nodes
+            Output(sos_file, None, [], dict(prior_dict, 
+                river_type=np.array([7.0, 11.0, 10.0]))).append_priors()
+
+            # Invalid keeps Qhat for the next run
+            Output(sos_file, None, []).append_priors()
+            with Dataset(sos_file) as sos:
+                self.assertEqual(0, sos.valid)
+                self.assertNotIn("nx", sos.dimensions)
+                self.assertTrue(np.ma.is_masked(sos["reach/Qhat"][...]))
+                self.assertTrue(np.ma.is_masked(sos["reach/Qsd"][...]))
+            input = Input("tests/test_data/001_1_SWOT.nc", sos_file, single_open=True)
+            self.assertEqual(qhat, input.read_data()[3][0])
+
+            # Valid with five nodes in the compact layout
+            river_type = np.array([7.0, Output.FILL_VALUE, 11.0, 10.0, 7.0])
+            Output(sos_file, None, [], dict(prior_dict, river_type=river_type),
+                input.sos_dataset, compact=True).append_priors()
+            with Dataset(sos_file) as sos:
+                self.assertEqual(1, sos.valid)
+                self.assertEqual(5, sos.dimensions["nx"].size)
+                self.assertEqual(qhat, sos["reach/Qhat"][...])
+                self.assertEqual(qsd, sos["reach/Qsd"][...])
+                self.assertNotIn("Qhat_original", sos["reach"].variables)
+                self.assertNotIn("lowerbound_A0", sos["reach"].variables)
+                self.assertEqual("SoS of Science data for reach ID: 001_1", sos.title)
+            assert_almost_equal(river_type, read_priors(sos_file)["river_type"])
+            self.assertEqual(Output.COMPLETE, append_state(sos_file))
+
     def test_concatenate_invalid(self):
         
         # Create river type array
@@ -123,4 +220,39 @@ class TestOutput(unittest.TestCase):
 
         # Execute function and assert result
         actual = insert_invalid(river_types, invalid_indexes)
-        assert_almost_equal(expected, actual)
\ No newline at end of file
+        assert_almost_equal(expected, actual)
+
+    def test_insert_invalid_parity(self):
+        """Test insert_invalid matches inserting fill values one at a time."""
+
+        def insert_loop(river_types, invalid_indexes):
+            river_types = river_types.copy()
+            river_types[river_types == -2147483648] = Output.FILL_VALUE
+            river_types[np.isnan(river_types)] = Output.FILL_VALUE
+            for index in invalid_indexes:
+                river_types = np.insert(river_types, index, Output.FILL_VALUE)
+            return river_types
+
+        cases = {
+            "none" : [],
+            "leading" : [0, 1, 2],
+            "trailing" : [7, 8, 9],
+            "consecutive" : [3, 4, 5, 6],
+            "scattered" : [0, 2, 5, 9],
+            "all" : list(range(10))
+        }
+        for name, invalid_indexes in cases.items():
+            for dtype in (np.int32, np.float64):
+                with self.subTest(case=name, dtype=dtype.__name__):
+                    river_types = np.array([7, 10, 11, -2147483648, 7, 11, 10,
+                        7, 11, 10][:10 - len(invalid_indexes)], dtype=dtype)
+                    expected = insert_loop(river_types, invalid_indexes)
+                    actual = insert_invalid(river_types, invalid_indexes)
+                    self.assertEqual(expected.dtype, actual.dtype)
+                    assert_almost_equal(expected, actual)
+
+        # Order of invalid indexes does not matter and input is not modified
+        river_types = np.array([7.0, np.nan, 11.0])
+        actual = insert_invalid(river_types, np.array([4, 0]))
+        assert_almost_equal([-9999, 7, -9999, 11, -9999], actual)
+        assert_almost_equal([7.0, np.nan, 11.0], river_types)
\ No newline at end of file
@@ -0,0 +1,48 @@
+# Standard library imports
+from pathlib import Path
+import unittest
+
+# Local imports
+from app.Partition import estimate_cost, estimate_costs, partition_lpt
+
+class TestPartition(unittest.TestCase):
+    """Tests functions from Partition module."""
+
+    def test_estimate_cost(self):
+        """Tests estimate_cost function on both cost models."""
+
+        swot = Path("tests/test_data/001_1_SWOT.nc")
+        self.assertEqual(25.0, estimate_cost(swot, "dims"))
+        self.assertEqual(float(swot.stat().st_size), estimate_cost(swot, "size"))
+
+        cost_dict = estimate_costs(Path("tests/test_data"), ["001_1"])
+        self.assertEqual({ "001_1" : 25.0 }, cost_dict)
+
+    def test_partition_lpt(self):
+        """Tests partition_lpt function balances predicted load."""
+
+        cost_dict = { "a" : 10.0, "b" : 7.0, "c" : 5.0, "d" : 4.0, "e" : 2.0,
+            "f" : 2.0 }
+        reach_dict, load_dict = partition_lpt(list(cost_dict.keys()), cost_dict, 2)
+
+        # Every reach is assigned exactly once
+        assigned = reach_dict[0] + reach_dict[1]
+        self.assertCountEqual(cost_dict.keys(), assigned)
+
+        # Loads match assignments and largest reaches are spread first
+        for rank, reaches in reach_dict.items():
+            self.assertEqual(sum(cost_dict[r] for r in reaches), load_dict[rank])
+        self.assertEqual(["a", "d", "f"], reach_dict[0])
+        self.assertEqual(["b", "c", "e"], reach_dict[1])
+        self.assertEqual({ 0 : 16.0, 1 : 14.0 }, load_dict)
+
+    def test_partition_lpt_more_ranks(self):
+        """Tests partition_lpt function with more ranks than reaches."""
+
+        reach_dict, load_dict = partition_lpt(["a"], { "a" : 3.0 }, 3)
+        self.assertEqual(["a"], reach_dict[0])
+        self.assertEqual([], reach_dict[1])
+        self.assertEqual(0.0, load_dict[2])
+
+if __name__ == "__main__":
+    unittest.main()
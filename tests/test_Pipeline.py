@@ -0,0 +1,233 @@
+# Standard library imports
+import logging
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from threading import Lock, Thread
+from time import sleep
+import unittest
+from unittest.mock import patch
+
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+from numpy.testing import assert_array_equal
+
+# Local imports
+from app.AppendSOS import AppendSOS
+from app.Output import PRIOR_VARIABLES, insert_invalid, read_priors
+from app.Pipeline import Pipeline
+
+class StubGeoBAM:
+    """Stand-in for GeoBAM whose priors are its input data."""
+
+    def __init__(self, input_data):
+        self.input_data = input_data
+
+    def bam_data(self):
+        return self.input_data
+
+    def bam_priors(self, geobam_data):
+        return geobam_data
+
+def stub_extract(prior_dict, priors, invalid_indexes):
+    """Stand-in for extract_priors on StubGeoBAM priors."""
+
+    prior_dict["river_type"] = insert_invalid(np.full(priors["width"].shape[0], 7.0),
+        invalid_indexes)
+    for i, (name, _, _, _) in enumerate(PRIOR_VARIABLES):
+        prior_dict[name] = float(i)
+
+class FakeAppendSOS:
+    """Stand-in for AppendSOS that records the order of pipeline calls and
+    can fail in one stage."""
+
+    def __init__(self, fail_stage=None, fail_reach=None, solve_seconds=0.0,
+        write_seconds=0.0, chunk_size=None):
+        self.fail_stage = fail_stage
+        self.fail_reach = fail_reach
+        self.solve_seconds = solve_seconds
+        self.write_seconds = write_seconds
+        self.chunk_size = chunk_size
+        self.events = []
+        self.logger = logging.getLogger("test_pipeline")
+        self.elapsed = 0.0
+        self.lock = Lock()
+        self.read = 0
+        self.solving = 0
+        self.solved = 0
+        self.written = []
+        self.max_read_ahead = 0
+        self.max_solved_ahead = 0
+        self.in_io = 0
+        self.max_in_io = 0
+
+    def filter_completed(self, reaches):
+        return reaches
+
+    def staged_chunks(self, reaches):
+        size = self.chunk_size or len(reaches)
+        return [ reaches[i:i + size] for i in range(0, len(reaches), size) ]
+
+    def stage_in(self, reaches):
+        with self.lock:
+            self.events.append(("in", tuple(reaches)))
+
+    def stage_out(self, reaches):
+        with self.lock:
+            self.events.append(("out", tuple(reaches)))
+
+    def fail(self, stage, reach):
+        if stage == self.fail_stage and reach == self.fail_reach:
+            raise RuntimeError(f"{stage} failed for {reach}")
+
+    def netcdf_call(self):
+        """Count reads and writes running at once as NetCDF calls would."""
+
+        with self.lock:
+            self.in_io += 1
+            self.max_in_io = max(self.max_in_io, self.in_io)
+        sleep(0.0005)
+        with self.lock:
+            self.in_io -= 1
+
+    def read_input(self, reach, io_lock):
+        with io_lock:
+            self.netcdf_call()
+        self.fail("read", reach)
+        with self.lock:
+            self.events.append(("read", reach))
+            self.read += 1
+            self.max_read_ahead = max(self.max_read_ahead, self.read - self.solving)
+        return reach
+
+    def solve(self, reach, input):
+        with self.lock:
+            self.solving += 1
+        sleep(self.solve_seconds)
+        self.fail("solve", reach)
+        with self.lock:
+            self.solved += 1
+            self.max_solved_ahead = max(self.max_solved_ahead,
+                self.solved - len(self.written))
+        return f"output {input}", None
+
+    def write(self, reach, output, key=None):
+        self.netcdf_call()
+        sleep(self.write_seconds)
+        self.fail("write", reach)
+        with self.lock:
+            self.events.append(("write", reach))
+            self.written.append((reach, output))
+
+class TestPipeline(unittest.TestCase):
+    """Tests methods from Pipeline class."""
+
+    REACHES = [ f"{i:03d}_1" for i in range(20) ]
+
+    def run_pipeline(self, pipeline, reaches):
+        """Run pipeline in a thread failing the test if it does not finish.
+
+        Returns exception raised by the pipeline or None.
+        """
+
+        errors = []
+        def run():
+            try:
+                pipeline.run(reaches)
+            except Exception as error:
+                errors.append(error)
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "pipeline did not finish")
+        return errors[0] if errors else None
+
+    def test_parity(self):
+        """Tests pipelined output matches the sequential path."""
+
+        with TemporaryDirectory() as sequential_dir, TemporaryDirectory() as pipeline_dir:
+            reaches = ["001_1", "002_1", "003_1", "004_1"]
+            for data_dir in (sequential_dir, pipeline_dir):
+                for reach in reaches:
+                    copyfile("tests/test_data/001_1_SWOT.nc", Path(data_dir) / f"{reach}_SWOT.nc")
+                    copyfile("tests/test_data/001_1_SOS.nc", Path(data_dir) / f"{reach}_SOS.nc")
+                with nc.Dataset(Path(data_dir) / "002_1_SOS.nc", 'a') as dataset:
+                    dataset["reach/Qhat"][:] = -9999.0
+
+            with patch("app.AppendSOS.GeoBAM", StubGeoBAM), \
+                patch("app.Output.extract_priors", stub_extract):
+                sequential = AppendSOS(Path(sequential_dir),
+                    logging.getLogger("test_pipeline"), reaches)
+                sequential.append()
+                pipelined = AppendSOS(Path(pipeline_dir),
+                    logging.getLogger("test_pipeline"), reaches)
+                self.assertIsNone(self.run_pipeline(Pipeline(pipelined, 2, 2), reaches))
+
+            self.assertEqual(sequential.valid_list, pipelined.valid_list)
+            self.assertEqual(sequential.invalid_list, pipelined.invalid_list)
+            self.assertEqual(["002_1"], pipelined.invalid_list)
+            for reach in reaches:
+                expected = read_priors(Path(sequential_dir) / f"{reach}_SOS.nc")
+                actual = read_priors(Path(pipeline_dir) / f"{reach}_SOS.nc")
+                for name in expected:
+                    assert_array_equal(expected[name], actual[name])
+
+    def test_order(self):
+        """Tests every reach is written once in order and io_lock keeps
+        reads and writes apart."""
+
+        append_sos = FakeAppendSOS()
+        self.assertIsNone(self.run_pipeline(Pipeline(append_sos), self.REACHES))
+        self.assertEqual([ (reach, f"output {reach}") for reach in self.REACHES ],
+            append_sos.written)
+        self.assertEqual(1, append_sos.max_in_io)
+
+    def test_errors(self):
+        """Tests reader, solve and writer errors are raised without hanging."""
+
+        for stage in ("read", "solve", "write"):
+            with self.subTest(stage=stage):
+                append_sos = FakeAppendSOS(stage, "005_1", write_seconds=0.001)
+                error = self.run_pipeline(Pipeline(append_sos, 2, 2), self.REACHES)
+                self.assertIsInstance(error, RuntimeError)
+                self.assertEqual(f"{stage} failed for 005_1", str(error))
+                self.assertLess(len(append_sos.written), len(self.REACHES))
+
+    def test_backpressure(self):
+        """Tests reaches held between stages stay within the queue depths."""
+
+        # A slow solve fills the read queue
+        append_sos = FakeAppendSOS(solve_seconds=0.005)
+        self.assertIsNone(self.run_pipeline(Pipeline(append_sos, 3, 2), self.REACHES))
+        self.assertGreaterEqual(append_sos.max_read_ahead, 3)
+        self.assertLessEqual(append_sos.max_read_ahead, 3 + 1)
+
+        # A slow writer fills the write queue
+        append_sos = FakeAppendSOS(write_seconds=0.005)
+        self.assertIsNone(self.run_pipeline(Pipeline(append_sos, 2, 3), self.REACHES))
+        self.assertGreaterEqual(append_sos.max_solved_ahead, 3)
+        self.assertLessEqual(append_sos.max_solved_ahead, 3 + 2)
+
+    def test_staged_chunks(self):
+        """Tests each chunk is staged in before its reads and staged out after
+        its writes."""
+
+        append_sos = FakeAppendSOS(solve_seconds=0.001, chunk_size=6)
+        self.assertIsNone(self.run_pipeline(Pipeline(append_sos, 2, 2), self.REACHES))
+
+        events = append_sos.events
+        chunks = append_sos.staged_chunks(self.REACHES)
+        self.assertEqual([ ("in", tuple(chunk)) for chunk in chunks ],
+            [ event for event in events if event[0] == "in" ])
+        self.assertEqual([ ("out", tuple(chunk)) for chunk in chunks ],
+            [ event for event in events if event[0] == "out" ])
+        for chunk in chunks:
+            staged_in = events.index(("in", tuple(chunk)))
+            staged_out = events.index(("out", tuple(chunk)))
+            for reach in chunk:
+                self.assertLess(staged_in, events.index(("read", reach)))
+                self.assertLess(events.index(("write", reach)), staged_out)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# Standard library imports
+from pathlib import Path
+import pickle
+from tempfile import TemporaryDirectory
+import unittest
+
+# Third party imports
+import numpy as np
+from numpy.testing import assert_array_equal
+
+# Local imports
+from app.PriorCache import PriorCache
+
+class TestPriorCache(unittest.TestCase):
+    """Tests methods from PriorCache class."""
+
+    DATA = {
+        "width" : np.full((5, 5), 30.0),
+        "slope2" : np.full((5, 5), 0.01),
+        "d_x_area" : np.arange(25, dtype=float).reshape(5, 5),
+        "Qhat" : np.repeat(12.9, 5),
+        "invalid_indexes" : np.array([], dtype=int)
+    }
+
+    PRIORS = {
+        "river_type" : np.array([7.0, -9999.0, 11.0]),
+        "lowerbound_A0" : 1.5,
+        "sigma_man" : np.float64(0.25)
+    }
+
+    def test_key(self):
+        """Tests key depends on input data and geoBAMr version."""
+
+        with TemporaryDirectory() as cache_dir:
+            cache = PriorCache(Path(cache_dir) / "priors.db", 2**20, "1.0")
+            key = cache.key(self.DATA)
+            self.assertEqual(key, cache.key({ k : v.copy() for k, v in self.DATA.items() }))
+
+            changed = dict(self.DATA, Qhat=np.repeat(13.0, 5))
+            self.assertNotEqual(key, cache.key(changed))
+
+            other_version = PriorCache(Path(cache_dir) / "priors.db", 2**20, "1.1")
+            self.assertNotEqual(key, other_version.key(self.DATA))
+            cache.close()
+            other_version.close()
+
+    def test_get_put(self):
+        """Tests stored priors are returned and hits and misses counted."""
+
+        with TemporaryDirectory() as cache_dir:
+            cache = PriorCache(Path(cache_dir) / "priors.db", 2**20, "1.0")
+            key = cache.key(self.DATA)
+            self.assertIsNone(cache.get(key))
+            cache.put(key, self.PRIORS)
+
+            # Shared by another connection e.g. another rank
+            other = PriorCache(Path(cache_dir) / "priors.db", 2**20, "1.0")
+            priors = other.get(key)
+            assert_array_equal(self.PRIORS["river_type"], priors["river_type"])
+            self.assertEqual(1.5, priors["lowerbound_A0"])
+            self.assertEqual(0.25, priors["sigma_man"])
+            self.assertEqual((0, 1), (cache.hits, cache.misses))
+            self.assertEqual((1, 0), (other.hits, other.misses))
+            cache.close()
+            other.close()
+
+    def test_evict(self):
+        """Tests least recently used priors are evicted over max_bytes."""
+
+        with TemporaryDirectory() as cache_dir:
+            cache = PriorCache(Path(cache_dir) / "priors.db", 150, "1.0")
+            cache.put("a", self.PRIORS)
+            cache.put("b", self.PRIORS)
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("b"))
+            cache.close()
+
+    def test_total_size(self):
+        """Tests the stored total follows replaced and evicted priors and is
+        counted once for caches without a total."""
+
+        with TemporaryDirectory() as cache_dir:
+            path = Path(cache_dir) / "priors.db"
+            cache = PriorCache(path, 300, "1.0")
+            for key in ("a", "b", "a", "c", "d"):
+                cache.put(key, self.PRIORS)
+            total = lambda: cache.connection.execute("SELECT value FROM meta "
+                "WHERE name = 'total_size'").fetchone()[0]
+            summed = lambda: cache.connection.execute(
+                "SELECT SUM(size) FROM priors").fetchone()[0]
+            self.assertEqual(summed(), total())
+            self.assertLessEqual(total(), 300)
+            self.assertIsNotNone(cache.get("d"))
+
+            cache.connection.execute("DROP TABLE meta")
+            cache.close()
+            cache = PriorCache(path, 300, "1.0")
+            self.assertEqual(summed(), total())
+            cache.close()
+
+    def test_pickle(self):
+        """Tests counters survive pickling without the connection."""
+
+        with TemporaryDirectory() as cache_dir:
+            cache = PriorCache(Path(cache_dir) / "priors.db", 2**20, "1.0")
+            cache.get("missing")
+            cache.close()
+            unpickled = pickle.loads(pickle.dumps(cache))
+            self.assertEqual(1, unpickled.misses)
+            self.assertIsNone(unpickled.connection)
+
+if __name__ == "__main__":
+    unittest.main()
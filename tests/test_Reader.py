@@ -0,0 +1,86 @@
+# Standard library imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+# Third party imports
+import netCDF4 as nc
+import numpy as np
+from numpy.testing import assert_array_equal
+
+# Local imports
+from app.Input import Input
+from app.Reader import Reader
+
+class TestReader(unittest.TestCase):
+    """Tests methods from Reader class."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "values.nc"
+        with nc.Dataset(self.path, 'w') as dataset:
+            dataset.createDimension("nx", 3)
+            dataset.createDimension("nt", 4)
+            values = np.array([[1.0, -9999.0, 3.0, 4.0],
+                [-1.0, 2.0, 500.0, -5.0], [7.0, 8.0, 9.0, 10.0]])
+            fill = dataset.createVariable("fill", "f8", ("nx", "nt"), fill_value=-9999.0)
+            fill[:] = values
+            valid = dataset.createVariable("valid", "f8", ("nx", "nt"), fill_value=-9999.0)
+            valid.valid_min = 0.0
+            valid.valid_max = 100.0
+            valid.missing_value = 8.0
+            valid[:] = values
+            count = dataset.createVariable("count", "i4", ("nx", "nt"), fill_value=-1)
+            count[:] = np.where(values < 0, -1, values).astype(int)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_parity(self):
+        """Tests reads match masked arrays filled with NaN."""
+
+        reader = Reader()
+        with nc.Dataset(self.path) as dataset:
+            for name in ("fill", "valid", "count"):
+                expected = dataset[name][:].astype(float).filled(np.nan)
+                actual = reader.read(dataset[name])
+                self.assertEqual(np.float64, actual.dtype)
+                assert_array_equal(expected, actual)
+
+    def test_read_float32(self):
+        """Tests float32 reads reuse a buffer per variable name."""
+
+        reader = Reader(np.float32)
+        with nc.Dataset(self.path) as dataset:
+            first = reader.read(dataset["valid"])
+            self.assertEqual(np.float32, first.dtype)
+            assert_array_equal(dataset["valid"][:].filled(np.nan).astype(np.float32), first)
+            second = reader.read(dataset["valid"])
+            self.assertTrue(np.shares_memory(first, second))
+            self.assertFalse(np.shares_memory(first, reader.read(dataset["fill"])))
+
+        reader = Reader(np.float32, reuse=False)
+        with nc.Dataset(self.path) as dataset:
+            first = reader.read(dataset["valid"])
+            self.assertFalse(np.shares_memory(first, reader.read(dataset["valid"])))
+        self.assertEqual({}, reader.buffers)
+
+    def test_format_data(self):
+        """Tests Input reads the same data with and without a reader."""
+
+        input = Input("tests/test_data/001_1_SWOT.nc", "tests/test_data/001_1_SOS.nc")
+        input.format_data()
+        buffered = Input("tests/test_data/001_1_SWOT.nc", "tests/test_data/001_1_SOS.nc",
+            reader=Reader())
+        buffered.format_data()
+        single = Input("tests/test_data/001_1_SWOT.nc", "tests/test_data/001_1_SOS.nc",
+            reader=Reader(np.float32))
+        single.format_data()
+
+        for key in input.data:
+            assert_array_equal(input.data[key], buffered.data[key])
+            np.testing.assert_allclose(input.data[key], single.data[key], rtol=1e-6)
+        self.assertEqual(np.float32, single.data["width"].dtype)
+
+if __name__ == "__main__":
+    unittest.main()
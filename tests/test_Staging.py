@@ -0,0 +1,59 @@
+# Standard library imports
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+import unittest
+
+# Third party imports
+import netCDF4 as nc
+
+# Local imports
+from app.Staging import Staging
+
+class TestStaging(unittest.TestCase):
+    """Tests methods from Staging class."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / "data"
+        self.scratch_dir = Path(self.tmp.name) / "scratch"
+        self.data_dir.mkdir()
+        self.scratch_dir.mkdir()
+        for reach in ("001_1", "002_1"):
+            copyfile("tests/test_data/001_1_SWOT.nc", self.data_dir / f"{reach}_SWOT.nc")
+            copyfile("tests/test_data/001_1_SOS.nc", self.data_dir / f"{reach}_SOS.nc")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stage(self):
+        """Tests files are staged in and finished SoS files copied back."""
+
+        staging = Staging(self.data_dir, self.scratch_dir, 3)
+        self.assertEqual(self.scratch_dir, staging.path.parent)
+        self.assertTrue(staging.path.name.startswith("sos_stage_3_"))
+
+        staging.stage_in(["001_1", "002_1"])
+        self.assertEqual(4, len(list(staging.path.iterdir())))
+        for reach in ("001_1", "002_1"):
+            with nc.Dataset(staging.path / f"{reach}_SOS.nc", 'a') as dataset:
+                dataset.valid = 1
+
+        copied = staging.stage_out(["001_1"])
+        staging.stage_out(["002_1"], copy=False)
+        self.assertEqual(["001_1"], copied)
+        self.assertEqual([], list(staging.path.iterdir()))
+        self.assertEqual(4, len(list(self.data_dir.iterdir())))
+        with nc.Dataset(self.data_dir / "001_1_SOS.nc") as dataset:
+            self.assertEqual(1, dataset.valid)
+        with nc.Dataset(self.data_dir / "002_1_SOS.nc") as dataset:
+            self.assertNotIn("valid", dataset.ncattrs())
+
+        report = staging.report()
+        self.assertGreater(report["in_bytes"], report["out_bytes"])
+        self.assertGreater(report["out_bytes"], 0)
+        staging.close()
+        self.assertFalse(staging.path.exists())
+
+if __name__ == "__main__":
+    unittest.main()
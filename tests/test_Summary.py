@@ -0,0 +1,32 @@
+# Standard library imports
+import pickle
+import unittest
+
+# Local imports
+from app.Summary import Summary
+
+class TestSummary(unittest.TestCase):
+    """Tests methods from Summary class."""
+
+    def test_summary(self):
+        """Tests reaches are selected by status and survive pickling."""
+
+        summary = Summary(["001_1", "002_1", "003_1", "004_1", "005_1"],
+            [Summary.VALID, Summary.INVALID, Summary.VALID, Summary.SKIPPED,
+            Summary.FAILED], 2.5, 3, 1, { "002_1" : "geobam_error", "005_1" : "timeout" })
+        summary = pickle.loads(pickle.dumps(summary))
+
+        self.assertEqual(["001_1", "003_1"], summary.valid_list)
+        self.assertEqual(["002_1"], summary.invalid_list)
+        self.assertEqual(["004_1"], summary.skipped_list)
+        self.assertEqual(["005_1"], summary.failed_list)
+        self.assertEqual(2.5, summary.elapsed)
+        self.assertEqual((3, 1), (summary.cache_hits, summary.cache_misses))
+        self.assertEqual({ "002_1" : "geobam_error", "005_1" : "timeout" }, summary.reasons)
+
+    def test_empty(self):
+        """Tests a rank without reaches pickles to an empty summary."""
+
+        summary = pickle.loads(pickle.dumps(Summary([], [])))
+        self.assertEqual([], summary.reaches)
+        self.assertEqual([], summary.valid_list)
@@ -0,0 +1,77 @@
+# Standard library imports
+from time import sleep
+import unittest
+
+# Local imports
+from app.Supervisor import CRASHED, ERROR, MEMORY, TIMEOUT, Supervisor
+
+def solve(input_data):
+    """Test solver that misbehaves according to input data."""
+
+    if input_data["action"] == "sleep":
+        sleep(60)
+    if input_data["action"] == "allocate":
+        blocks = []
+        while True:
+            blocks.append(bytearray(50 * 2**20))
+            sleep(0.01)
+    if input_data["action"] == "raise":
+        raise ValueError("bad input")
+    if input_data["action"] == "exit":
+        raise SystemExit(3)
+    return { "river_type" : input_data["value"] }
+
+def exit_setup():
+    """Test setup that exits before the worker is ready."""
+
+    raise SystemExit(4)
+
+def hang_setup():
+    """Test setup that never finishes."""
+
+    sleep(60)
+
+class TestSupervisor(unittest.TestCase):
+    """Tests methods from Supervisor class."""
+
+    def test_solve(self):
+        """Tests results, failures and recycling of the worker process."""
+
+        supervisor = Supervisor(timeout=1, memory_bytes=500 * 2**20, 
+            solver=solve, setup=None, poll_interval=0.05)
+        try:
+            self.assertEqual(({ "river_type" : 7 }, None, None),
+                supervisor.solve({ "action" : "solve", "value" : 7 }))
+            pid = supervisor.process.pid
+
+            prior_dict, reason, message = supervisor.solve({ "action" : "raise" })
+            self.assertEqual((None, ERROR, "bad input"), (prior_dict, reason, message))
+            self.assertEqual(pid, supervisor.process.pid)
+
+            self.assertEqual(TIMEOUT, supervisor.solve({ "action" : "sleep" })[1])
+            self.assertIsNone(supervisor.process)
+            self.assertEqual(MEMORY, supervisor.solve({ "action" : "allocate" })[1])
+            self.assertEqual(CRASHED, supervisor.solve({ "action" : "exit" })[1])
+            self.assertEqual(3, supervisor.restarts)
+
+            # A new worker is started for the next reach
+            self.assertEqual(8, supervisor.solve({ "action" : "solve", "value" : 8 })[0]["river_type"])
+        finally:
+            supervisor.close()
+        self.assertIsNone(supervisor.process)
+
+    def test_startup(self):
+        """Tests a worker that exits or hangs in setup is reported as crashed."""
+
+        for setup, message in ((exit_setup, "worker exited with code 4 during startup"),
+            (hang_setup, "worker not ready after 1 seconds")):
+            with self.subTest(setup=setup.__name__):
+                supervisor = Supervisor(solver=solve, setup=setup, 
+                    poll_interval=0.05, startup_timeout=1)
+                try:
+                    self.assertEqual((None, CRASHED, message),
+                        supervisor.solve({ "action" : "solve", "value" : 7 }))
+                    self.assertIsNone(supervisor.process)
+                    self.assertEqual(1, supervisor.restarts)
+                finally:
+                    supervisor.close()
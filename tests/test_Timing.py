@@ -0,0 +1,92 @@
+# Standard library imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+# Local imports
+from app.Timing import NULL_STAGE, Timer, aggregate_timing, read_timing
+
+class TestTiming(unittest.TestCase):
+    """Tests methods and functions from Timing module."""
+
+    def test_timer_off(self):
+        """Tests a timer without a path does nothing."""
+
+        timer = Timer()
+        self.assertIs(NULL_STAGE, timer.stage("read", "001_1"))
+        with timer.stage("read", "001_1"):
+            pass
+        timer.finish("001_1", "valid")
+        timer.close()
+        self.assertEqual({}, timer.stages)
+
+    def test_timer(self):
+        """Tests stage times are recorded per reach and shared over batches."""
+
+        with TemporaryDirectory() as timing_dir:
+            path = Path(timing_dir) / f"3{Timer.SUFFIX}"
+            timer = Timer(path, 3)
+            with timer.stage("read", "001_1", "002_1"):
+                sum(range(100000))
+            with timer.stage("bam_priors", "001_1"):
+                pass
+            with timer.stage("bam_priors", "001_1"):
+                pass
+            shared = timer.stages["001_1"]["read"][0]
+            self.assertEqual(shared, timer.stages["002_1"]["read"][0])
+            timer.finish("001_1", "valid")
+            timer.finish("002_1", "invalid")
+            timer.close()
+
+            records = read_timing([path, Path(timing_dir) / "missing.jsonl"])
+        self.assertEqual(["001_1", "002_1"], [ r["reach"] for r in records ])
+        self.assertEqual(3, records[0]["rank"])
+        self.assertEqual({ "read", "bam_priors" }, set(records[0]["wall"]))
+        self.assertEqual({ "read" }, set(records[1]["cpu"]))
+        self.assertEqual("invalid", records[1]["status"])
+        self.assertGreater(records[0]["peak_rss_kib"], 0)
+        self.assertEqual({}, timer.stages)
+
+    def test_aggregate_timing(self):
+        """Tests percentiles, rank throughput and straggler detection."""
+
+        records = []
+        for rank, seconds in ((0, 1.0), (1, 1.0), (2, 4.0)):
+            for i in range(4):
+                records.append({ "reach" : f"{rank}{i}_1", "rank" : rank,
+                    "status" : "valid", "start" : i * seconds,
+                    "end" : (i + 1) * seconds, "peak_rss_kib" : 100 + i,
+                    "wall" : { "read" : 0.1, "bam_priors" : seconds },
+                    "cpu" : { "read" : 0.05, "bam_priors" : seconds } })
+        report = aggregate_timing(records)
+
+        self.assertEqual(12, report["reaches"])
+        self.assertEqual(12, report["stages"]["read"]["count"])
+        self.assertAlmostEqual(1.0, report["stages"]["bam_priors"]["p50"])
+        self.assertAlmostEqual(4.0, report["stages"]["bam_priors"]["max"])
+        self.assertAlmostEqual(24.0, report["stages"]["bam_priors"]["cpu_total"])
+        self.assertAlmostEqual(1.0, report["ranks"][0]["reaches_per_second"])
+        self.assertAlmostEqual(0.25, report["ranks"][2]["reaches_per_second"])
+        self.assertEqual(103, report["ranks"][1]["peak_rss_kib"])
+        self.assertEqual([2], report["straggler_ranks"])
+        self.assertEqual(10, len(report["slowest_reaches"]))
+        self.assertEqual(2, report["slowest_reaches"][0]["rank"])
+
+    def test_aggregate_triaged(self):
+        """Tests triaged records are timed but not counted as reaches."""
+
+        records = []
+        for status, start in (("triaged", 0.0), ("invalid", 1.0), ("valid", 2.0)):
+            records.append({ "reach" : f"{status}_1", "rank" : 0,
+                "status" : status, "start" : start, "end" : start + 1.0,
+                "peak_rss_kib" : 100, "wall" : { "read" : 1.0 },
+                "cpu" : { "read" : 1.0 } })
+        records[2]["reach"] = "triaged_1"
+        report = aggregate_timing(records)
+
+        self.assertEqual(2, report["reaches"])
+        self.assertEqual(3, report["stages"]["read"]["count"])
+        self.assertEqual(2, report["ranks"][0]["reaches"])
+        self.assertAlmostEqual(3.0, report["ranks"][0]["seconds"])
+        self.assertAlmostEqual(2.0 / 3.0, report["ranks"][0]["reaches_per_second"])
+        self.assertNotIn("triaged", [ r["status"] for r in report["slowest_reaches"] ])
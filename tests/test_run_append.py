@@ -0,0 +1,345 @@
+# Standard library imports
+import logging
+import os
+from pathlib import Path
+from queue import Queue
+from shutil import copyfile
+import sys
+from tempfile import TemporaryDirectory
+from threading import Thread
+from types import SimpleNamespace
+import unittest
+from unittest.mock import patch
+
+# Third party imports
+import netCDF4 as nc
+from numpy.testing import assert_array_equal
+
+# Local imports
+from app.AppendSOS import AppendSOS
+from app.Checkpoint import Checkpoint
+from app.config import sos_config
+from app.Output import Output, append_state, read_priors
+from run_append import STOP_TAG, WORK_TAG, distribute_reaches, get_reach_list, \
+    log_results, request_reaches, run_mpi, run_pool, split_reaches
+
+class FakeStatus:
+    """Stand-in for mpi4py.MPI.Status."""
+
+    def Get_source(self):
+        return self.source
+
+    def Get_tag(self):
+        return self.tag
+
+# Stand-in for the mpi4py.MPI module
+FAKE_MPI = SimpleNamespace(ANY_SOURCE=-1, ANY_TAG=-1, Status=FakeStatus)
+
+class FakeComm:
+    """Stand-in for an MPI communicator passing messages between ranks run
+    as threads through one queue per rank.
+
+    Every message rank 0 sends is kept in sent. Collective calls only 
+    support a single rank.
+    """
+
+    def __init__(self, queues, rank, sent):
+        self.queues = queues
+        self.rank = rank
+        self.sent = sent
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return len(self.queues)
+
+    def send(self, obj, dest, tag):
+        if self.rank == 0:
+            self.sent.append((dest, tag, obj))
+        self.queues[dest].put((self.rank, tag, obj))
+
+    def bcast(self, obj, root=0):
+        return obj
+
+    def gather(self, obj, root=0):
+        return [obj]
+
+    def barrier(self):
+        pass
+
+    def recv(self, source, tag, status):
+        message_source, message_tag, obj = self.queues[self.rank].get(timeout=10)
+        assert source in (FAKE_MPI.ANY_SOURCE, message_source)
+        assert tag in (FAKE_MPI.ANY_TAG, message_tag)
+        status.source, status.tag = message_source, message_tag
+        return obj
+
+class FakeAppendSOS:
+    """Stand-in for AppendSOS recording the chunks it is asked to append."""
+
+    def __init__(self):
+        self.reach_list = []
+        self.chunks = []
+
+    def append_reaches(self, reaches):
+        self.chunks.append(list(reaches))
+
+class TestRunAppend(unittest.TestCase):
+    """Tests functions from run_append module."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / "data"
+        self.logging_dir = Path(self.tmp.name) / "logs"
+        self.data_dir.mkdir()
+        self.logging_dir.mkdir()
+        self.config = patch.dict(sos_config, { "logging_dir" : str(self.logging_dir),
+            "checkpoint_dir" : "", "manifest" : False, "incremental" : False,
+            "resume" : False })
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        for name in ("main_logger", "rank_logger"):
+            for handler in logging.getLogger(name).handlers[:]:
+                handler.close()
+                logging.getLogger(name).removeHandler(handler)
+        self.tmp.cleanup()
+
+    def create_reaches(self, reaches, invalid=False, data_dir=None):
+        """Copy test SWOT and SoS files for each reach to data_dir.
+
+        Qhat is set to the fill value for invalid reaches so they fail
+        validation without running geoBAM.
+        """
+
+        data_dir = data_dir if data_dir is not None else self.data_dir
+        for reach in reaches:
+            copyfile("tests/test_data/001_1_SWOT.nc", data_dir / f"{reach}_SWOT.nc")
+            copyfile("tests/test_data/001_1_SOS.nc", data_dir / f"{reach}_SOS.nc")
+            if invalid:
+                with nc.Dataset(data_dir / f"{reach}_SOS.nc", 'a') as dataset:
+                    dataset["reach/Qhat"][:] = Output.FILL_VALUE
+
+    def run_pool(self, **config):
+        """Run the pool backend with config capturing worker Summary objects.
+
+        Returns list of Summary objects.
+        """
+
+        sos_config.update(backend="pool", **config)
+        with patch("run_append.report_results") as report_results:
+            run_pool(self.data_dir)
+        return report_results.call_args[0][1]
+
+    def run_mpi(self, **config):
+        """Run the mpi backend with config on a single fake rank capturing its
+        Summary objects.
+
+        Returns list of Summary objects.
+        """
+
+        sos_config.update(backend="mpi", scheduler="static", triage=False, **config)
+        with patch("run_append.get_comm", return_value=FakeComm([Queue()], 0, [])), \
+            patch("run_append.log_results", wraps=log_results) as logged:
+            run_mpi(self.data_dir)
+        return logged.call_args[0][1]
+
+    def test_split_reaches(self):
+        """Tests every reach is assigned once and slices differ by at most one
+        reach."""
+
+        reach_list = [ f"{i:03d}_1" for i in range(11) ]
+        for size in (1, 3, 4, 11, 15):
+            with self.subTest(size=size):
+                reach_dict = split_reaches(reach_list, size)
+                self.assertEqual(list(range(size)), sorted(reach_dict))
+                assigned = [ reach for reaches in reach_dict.values() for reach in reaches ]
+                self.assertEqual(sorted(reach_list), sorted(assigned))
+                lengths = [ len(reaches) for reaches in reach_dict.values() ]
+                self.assertLessEqual(max(lengths) - min(lengths), 1)
+
+        self.assertEqual({ 0 : ["000_1", "003_1"], 1 : ["001_1"], 2 : ["002_1"] },
+            split_reaches(["000_1", "001_1", "002_1", "003_1"], 3))
+        self.assertEqual({ 0 : [], 1 : [] }, split_reaches([], 2))
+
+    def test_get_reach_list(self):
+        """Tests reaches need both files and checkpointed reaches are left out
+        when resuming."""
+
+        self.create_reaches(["003_1", "001_1", "002_1"])
+        copyfile("tests/test_data/001_1_SWOT.nc", self.data_dir / "004_1_SWOT.nc")
+        self.assertEqual(["001_1", "002_1", "003_1"], get_reach_list(self.data_dir))
+
+        checkpoint = Checkpoint(self.logging_dir, 0)
+        checkpoint.record("002_1")
+        checkpoint.close()
+        self.assertEqual(["001_1", "002_1", "003_1"], get_reach_list(self.data_dir))
+        sos_config["resume"] = True
+        self.assertEqual(["001_1", "003_1"], get_reach_list(self.data_dir))
+
+    def test_pool_triage(self):
+        """Tests pool workers triage invalid reaches and write fill values
+        without geoBAM."""
+
+        reaches = [ f"{i:03d}_1" for i in range(7) ]
+        self.create_reaches(reaches, invalid=True)
+        results = self.run_pool(workers=2, chunk_size=2, triage=True,
+            checkpoint=True)
+
+        self.assertEqual(2, len(results))
+        self.assertEqual(reaches, sorted(reach for summary in results 
+            for reach in summary.invalid_list))
+        self.assertEqual([], [ reach for summary in results 
+            for reach in summary.valid_list ])
+        for reach in reaches:
+            self.assertEqual(Output.COMPLETE, append_state(self.data_dir / f"{reach}_SOS.nc"))
+            with nc.Dataset(self.data_dir / f"{reach}_SOS.nc") as dataset:
+                self.assertEqual(0, dataset.valid)
+        completed = Checkpoint(self.logging_dir, 0).completed \
+            | Checkpoint(self.logging_dir, 1).completed
+        self.assertEqual(set(reaches), completed)
+        with open(self.logging_dir / "main.log") as main_log:
+            self.assertIn("triage valid: 0 of 7", main_log.read())
+
+    def test_pool_triage_error(self):
+        """Tests a worker failing during triage raises its error instead of
+        leaving the other workers waiting for work."""
+
+        reaches = [ f"{i:03d}_1" for i in range(4) ]
+        self.create_reaches(reaches, invalid=True)
+        (self.data_dir / "002_1_SWOT.nc").write_bytes(b"not a NetCDF file")
+
+        errors = []
+        def run():
+            try:
+                self.run_pool(workers=2, chunk_size=1, triage=True)
+            except Exception as error:
+                errors.append(error)
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=60)
+        self.assertFalse(thread.is_alive(), "pool did not shut down")
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], OSError)
+
+    def test_pool_parity(self):
+        """Tests pool results and output match the sequential path."""
+
+        reaches = [ f"{i:03d}_1" for i in range(6) ]
+        sequential_dir = Path(self.tmp.name) / "sequential"
+        sequential_dir.mkdir()
+        for data_dir in (self.data_dir, sequential_dir):
+            self.create_reaches(reaches, invalid=True, data_dir=data_dir)
+            Output(data_dir / "005_1_SOS.nc", None, []).append_priors()
+        sos_config["resume"] = True
+
+        results = self.run_pool(workers=3, chunk_size=1, triage=False)
+        sequential = AppendSOS(sequential_dir, logging.getLogger("test_run_append"),
+            reaches, resume=True)
+        sequential.append()
+        summary = sequential.summary()
+
+        for status in ("valid_list", "invalid_list", "skipped_list", "failed_list"):
+            pooled = sorted(reach for result in results 
+                for reach in getattr(result, status))
+            self.assertEqual(getattr(summary, status), pooled)
+        self.assertEqual(["005_1"], summary.skipped_list)
+        for reach in reaches:
+            expected = read_priors(sequential_dir / f"{reach}_SOS.nc")
+            actual = read_priors(self.data_dir / f"{reach}_SOS.nc")
+            self.assertEqual(expected.keys(), actual.keys())
+            for name in expected:
+                assert_array_equal(expected[name], actual[name])
+            for data_dir in (self.data_dir, sequential_dir):
+                with nc.Dataset(data_dir / f"{reach}_SOS.nc") as dataset:
+                    self.assertEqual(0, dataset.valid)
+
+    def run_dynamic(self, reach_list, size, chunk_size):
+        """Run distribute_reaches on rank 0 and request_reaches on size - 1
+        worker ranks as threads.
+
+        Returns rank 0 reach dictionary, messages sent by rank 0 and 
+        dictionary of worker rank keys and FakeAppendSOS values.
+        """
+
+        queues = [ Queue() for _ in range(size) ]
+        sent = []
+        workers = { rank : FakeAppendSOS() for rank in range(1, size) }
+        sos_config["pipeline"] = False
+        with patch.dict(sys.modules, { "mpi4py" : SimpleNamespace(MPI=FAKE_MPI),
+            "mpi4py.MPI" : FAKE_MPI }):
+            threads = [ Thread(target=request_reaches, daemon=True,
+                args=(FakeComm(queues, rank, sent), append_sos))
+                for rank, append_sos in workers.items() ]
+            for thread in threads:
+                thread.start()
+            reach_dict = distribute_reaches(FakeComm(queues, 0, sent), 
+                reach_list, chunk_size)
+            for thread in threads:
+                thread.join(timeout=10)
+                self.assertFalse(thread.is_alive(), "worker did not stop")
+        return reach_dict, sent, workers
+
+    def test_dynamic(self):
+        """Tests chunks are handed out once each and every worker is told to
+        stop once."""
+
+        reach_list = [ f"{i:03d}_1" for i in range(10) ]
+        reach_dict, sent, workers = self.run_dynamic(reach_list, 4, 3)
+
+        chunks = [ obj for _, tag, obj in sent if tag == WORK_TAG ]
+        self.assertEqual(4, len(chunks))
+        self.assertTrue(all(0 < len(chunk) <= 3 for chunk in chunks))
+        self.assertEqual(reach_list, sorted(reach for chunk in chunks for reach in chunk))
+        self.assertEqual([1, 2, 3], sorted(dest for dest, tag, _ in sent if tag == STOP_TAG))
+        self.assertEqual(STOP_TAG, sent[-1][1])
+        for rank, append_sos in workers.items():
+            self.assertEqual(reach_dict[rank], append_sos.reach_list)
+            self.assertEqual(reach_dict[rank], 
+                [ reach for chunk in append_sos.chunks for reach in chunk ])
+
+    def test_dynamic_empty(self):
+        """Tests workers stop straight away when there are no reaches."""
+
+        reach_dict, sent, workers = self.run_dynamic([], 3, 2)
+
+        self.assertEqual({ 1 : [], 2 : [] }, reach_dict)
+        self.assertEqual([(1, STOP_TAG), (2, STOP_TAG)], 
+            sorted((dest, tag) for dest, tag, _ in sent))
+        self.assertTrue(all(not append_sos.chunks for append_sos in workers.values()))
+
+    def test_incremental_resume(self):
+        """Tests resuming a preempted incremental run rewrites every stale 
+        reach and leaves nothing for the next incremental run."""
+
+        reaches = [ f"{i:03d}_1" for i in range(5) ]
+        self.create_reaches(reaches, invalid=True)
+        sos_config.update(manifest=True, incremental=True, checkpoint=True)
+        self.assertEqual(reaches, self.run_mpi()[0].invalid_list)
+
+        # New SWOT data for every reach
+        for reach in reaches:
+            swot_file = self.data_dir / f"{reach}_SWOT.nc"
+            mtime = swot_file.stat().st_mtime_ns + 10**9
+            os.utime(swot_file, ns=(mtime, mtime))
+
+        # Preempted after two reaches
+        def preempted(append_sos, reach_list):
+            append_sos.append_reaches(reach_list[:2])
+            raise RuntimeError("preempted")
+        with patch("run_append.append_reaches", preempted):
+            self.assertRaises(RuntimeError, self.run_mpi)
+
+        # Reaches appended by the earlier run are rewritten when resuming
+        sos_config["resume"] = True
+        summary = self.run_mpi()[0]
+        self.assertEqual(reaches[2:], summary.invalid_list)
+        self.assertEqual([], summary.skipped_list)
+
+        sos_config["resume"] = False
+        self.assertEqual([], self.run_mpi()[0].reaches)
+
+if __name__ == "__main__":
+    unittest.main()